@@ -6,4 +6,11 @@ Configuration file.
 answer_filepath = 'wordlist/full_answer_list.txt'
 guess_filepath = 'wordlist/full_guess_list.txt'
 
+# Where precomputed tables are kept between runs.
+cache_directory = 'wordlist/cache'
+
+# How many decisions deterministic strategies keep cached, and how many guesses deep.
+decision_cache_entries = 1000000
+decision_cache_depth = 12
+
 analysis_error_checking = False
@@ -2,6 +2,11 @@
 The Wordle simulator class.
 """
 from core.WordleGlobals import *
+from core.WordleFeedback import *
+from core.WordleDictionary import *
+from core.WordleGameState import *
+from core.WordleProfiler import *
+from time import perf_counter
 from typing import Callable
 import random
 
@@ -11,8 +16,7 @@ class Wordle:
     A mock interface of a Wordle game.
     """
 
-    __slots__ = '_word', '_word_length', '_state', '_guesses', '_guessed_words', \
-                '_wrong_characters', '_misplaced_characters', '_correct_characters'
+    __slots__ = '__word', '__word_length', '__dictionary', '__state', '__snapshot'
 
     char_check = 'C'
     char_quest = '?'
@@ -22,20 +26,42 @@ class Wordle:
 
     reveals_word = False
 
-    def __init__(self, word: str = None) -> None:
+    # If every guess has to use the hints shown so far.
+    hard_mode = False
+
+    # If the game picks its feedback to leave the most words, instead of having a word from the start.
+    adversarial = False
+
+    def __init__(self, word: str = None, dictionary: WordleDictionary = None, snapshot: GameState = None) -> None:
         """
         Initiates a Wordle game.
         :param word: A __word to set as the __word.
+        :param dictionary: The words to play with. The config's word lists if not given.
+        :param snapshot: Carry on from this point of another game with the same __word.
         """
-        self.__word = word if word else random.choice(answer_list)
+        self.__dictionary = dictionary if dictionary is not None else get_default_dictionary()
+        self.__word = word if word else self.__dictionary.random_answer()
         self.__word_length = len(self.__word)
         self.__state = WordleState.Ready
-        self.__guesses = 0
+        # Everything the game has shown so far; replaced, never changed, with every guess.
+        self.__snapshot = GameState.start(self.__dictionary.get_feedback_table())
+        if snapshot is not None:
+            self.__resume(snapshot)
 
-        self.__guessed_words: List[str] = []
-        self.__wrong_characters: List[str] = []
-        self.__misplaced_characters: Dict[str, List[int]] = {}
-        self.__correct_characters: Dict[str, List[int]] = {}
+    def __resume(self, snapshot: GameState) -> None:
+        """
+        Picks up the game from a snapshot.
+        :param snapshot: The snapshot, which has to fit this game's __word.
+        """
+        if not self.fits_snapshot(snapshot):
+            raise ValueError("The snapshot doesn't come from a game with this word.")
+        self.__snapshot = snapshot
+        if snapshot.is_won():
+            self.__state = WordleState.Win
+        elif snapshot.get_guesses() >= self.max_guesses:
+            self.__state = WordleState.Lose
+        elif snapshot.get_guesses():
+            self.__state = WordleState.Playing
 
     def play(self, word: str = None) -> WordleResponse:
         """
@@ -73,24 +99,33 @@ class Wordle:
         The game's response during a playing condition.
         :return:
         """
-        if word not in guess_list:
+        timed = instrumentation.enabled
+        if timed:
+            start = perf_counter()
+        valid = self.is_valid_guess(word)
+        if timed:
+            instrumentation.add_time('validation', perf_counter() - start)
+        if not valid:
             return self.__get_wordle_response(callback_state=WordleState.InvalidGuess)
 
         # Do the round logic.
-        word_response = []
-        for i in range(len(word)):
-            word_response.append(self.__compare_word(word, i))
-
-        self.__guessed_words.append(word)
-        self.__guesses += 1
+        if timed:
+            start = perf_counter()
+        table = self.__dictionary.get_feedback_table()
+        pattern = self.score_guess(word)
+        word_response = list(decode_pattern(pattern, self.__word_length))
+        self.__snapshot = self.__snapshot.after(table, table.guess_index[word], pattern)
+        if timed:
+            instrumentation.add_time('feedback', perf_counter() - start)
+            instrumentation.count('turns')
 
         # Did we get the right __word?
-        if not any([state for state in word_response if state != WordleState.Correct]):
+        if pattern == winning_pattern(self.__word_length):
             self.__state = WordleState.Win
             return self.__get_wordle_response(callback_state=WordleState.GameWon, word_response=word_response)
 
         # Did we lose?
-        elif self.__guesses >= self.max_guesses:
+        elif self.get_guesses() >= self.max_guesses:
             self.__state = WordleState.Lose
             return self.__get_wordle_response(callback_state=WordleState.GameLost, word_response=word_response)
 
@@ -112,75 +147,62 @@ class Wordle:
         :param word_response: A list of WordleStates to show as a response to input.
         :return: The generated WordleResponse.
         """
+        if instrumentation.enabled:
+            start = perf_counter()
+            response = self.__make_wordle_response(callback_state, word_response)
+            instrumentation.add_time('response', perf_counter() - start)
+            return response
+        return self.__make_wordle_response(callback_state, word_response)
+
+    def __make_wordle_response(self, callback_state: WordleState,
+                               word_response: List[WordleState] = None) -> WordleResponse:
         if word_response is None:
             word_response = []
         return WordleResponse(
             game_state=callback_state,
             word_response=word_response,
-            wrong_characters=self.__wrong_characters,
-            misplaced_characters=self.__misplaced_characters,
-            correct_characters=self.__correct_characters,
-            guessed_words=self.__guessed_words,
-            guesses=self.__guesses,
+            wrong_characters=self.get_wrong_characters(),
+            misplaced_characters=self.get_misplaced_characters(),
+            correct_characters=self.get_correct_characters(),
+            guessed_words=self.get_guessed_words(),
+            guesses=self.get_guesses(),
             final_word=self.get_word(),
+            min_letter_counts=self.get_min_letter_counts(),
+            max_letter_counts=self.get_max_letter_counts(),
+            snapshot=self.__snapshot,
         )
 
     """
-    Manipulation with character lists
+    Rules
     """
 
-    def __compare_word(self, word: str, position: int) -> WordleState:
+    def is_valid_guess(self, word: str) -> bool:
         """
-        Compares the __word given to the game __word.
-        :param word: The __word to test.
-        :param position: The position of the __word to examine.
-        :return: A character __state, representing how right it was.
+        :param word: The guess.
+        :return: If the game takes it.
         """
-        if word[position] == self.__word[position]:
-            # This letter is in the correct position.
-            self.__add_correct_character(word[position], position)
-            return WordleState.Correct
-        elif word[position] in self.__word:
-            # This letter is in the __word, in the wrong position.
-            self.__add_misplaced_character(word[position], position)
-            return WordleState.Misplaced
-        else:
-            # This letter is not in the __word.
-            self.__add_wrong_character(word[position])
-            return WordleState.Wrong
+        return word in self.__dictionary.get_guess_lookup()
 
-    def __add_wrong_character(self, char: str) -> None:
+    def score_guess(self, word: str) -> int:
         """
-        Marks a character for being in the wrong place.
-        :param char: The character to mark.
+        :param word: A valid guess.
+        :return: Its feedback pattern.
         """
-        if char in self.__wrong_characters:
-            return
-        self.__wrong_characters.append(char)
+        return self.__dictionary.get_feedback_table().score(word, self.__word)
 
-    def __add_misplaced_character(self, char: str, position: int) -> None:
+    def fits_snapshot(self, snapshot: GameState) -> bool:
         """
-        Marks a character for being in the __word, and in the correct place.
-        :param char: The character to mark.
-        :param position: The position where the character is misplaced.
+        :param snapshot: A snapshot of a game with the same dictionary.
+        :return: If this game would have given the same feedback.
         """
-        if char not in self.__misplaced_characters:
-            self.__misplaced_characters[char] = [position]
-        else:
-            if position not in self.__misplaced_characters[char]:
-                self.__misplaced_characters[char].append(position)
-
-    def __add_correct_character(self, char: str, position: int) -> None:
-        """
-        Marks a character for being in the __word, but in the wrong place.
-        :param char: The character to mark.
-        :param position: The position where the character is misplaced.
-        """
-        if char not in self.__correct_characters:
-            self.__correct_characters[char] = [position]
-        else:
-            if position not in self.__correct_characters[char]:
-                self.__correct_characters[char].append(position)
+        table = self.__dictionary.get_feedback_table()
+        answer = table.answer_index.get(self.__word)
+        for guess, pattern in snapshot.get_history():
+            expected = table.pattern(guess, answer) if answer is not None \
+                else score_word(table.guesses[guess], self.__word)
+            if pattern != expected:
+                return False
+        return True
 
     """
     Class Methods
@@ -205,12 +227,24 @@ class Wordle:
                 retString += ' '
         return retString
 
+    @classmethod
+    def characters_to_response(cls, characters: str) -> List[WordleState]:
+        """
+        Reads a character response back into WordleStates.
+        :param characters: A response, as made by response_to_characters.
+        :return: The WordleState of each character.
+        """
+        states = {cls.char_check: WordleState.Correct,
+                  cls.char_quest: WordleState.Misplaced,
+                  cls.char_wrong: WordleState.Wrong}
+        return [states[char] for char in characters]
+
     """
     Public Attributes
     """
 
     def get_guesses(self) -> int:
-        return self.__guesses
+        return self.__snapshot.get_guesses()
 
     def get_state(self) -> WordleState:
         return self.__state
@@ -221,17 +255,29 @@ class Wordle:
             return ""
         return self.__word
 
+    def get_dictionary(self) -> WordleDictionary:
+        return self.__dictionary
+
+    def get_snapshot(self) -> GameState:
+        return self.__snapshot
+
     def get_guessed_words(self) -> List[str]:
-        return self.__guessed_words
+        return self.__snapshot.get_words(self.__dictionary.get_feedback_table())
 
     def get_wrong_characters(self) -> List[str]:
-        return self.__wrong_characters
+        return self.__snapshot.get_wrong_characters(self.__dictionary.get_feedback_table().alphabet)
 
     def get_misplaced_characters(self) -> Dict[str, List[int]]:
-        return self.__misplaced_characters
+        return self.__snapshot.get_misplaced_characters(self.__dictionary.get_feedback_table().alphabet)
 
     def get_correct_characters(self) -> Dict[str, List[int]]:
-        return self.__correct_characters
+        return self.__snapshot.get_correct_characters(self.__dictionary.get_feedback_table().alphabet)
+
+    def get_min_letter_counts(self) -> Dict[str, int]:
+        return self.__snapshot.get_min_letter_counts(self.__dictionary.get_feedback_table().alphabet)
+
+    def get_max_letter_counts(self) -> Dict[str, int]:
+        return self.__snapshot.get_max_letter_counts(self.__dictionary.get_feedback_table().alphabet)
 
 
 if __name__ == '__main__':
@@ -252,7 +298,14 @@ if __name__ == '__main__':
 
         # Make sure the response was valid.
         if response.game_state == WordleState.InvalidGuess:
-            print("Invalid guess.\n")
+            print("Invalid guess.")
+            lookup = wordle.get_dictionary().get_guess_lookup()
+            prefix = guess
+            while prefix and not lookup.has_prefix(prefix):
+                prefix = prefix[:-1]
+            if prefix:
+                print(f"Did you mean: {', '.join(lookup.with_prefix(prefix, limit=5))}")
+            print('')
         else:
             guessed_word_string += guess + '\n'
             guessed_word_string += Wordle.response_to_characters(response.word_response) + '\n'
@@ -7,12 +7,27 @@ Keeps up with:
 Guessing algorithms (with elimination):
     - Random (guess list)
     - Random (answer list)
-    - Best Pick
+    - Best Pick (entropy / expected size)
+    - Decision Tree (replays a solved strategy)
 """
+from array import array
 from copy import copy
-from time import time
+from multiprocessing import Pool
+from operator import itemgetter
+from statistics import NormalDist
+from time import perf_counter, time
+from typing import Iterable, Optional, Sequence, Set, Tuple, Union
+import cProfile
+import json
+import os
+import pstats
 
 from core.WordleSubclasses import *
+from core.WordleIndex import *
+from core.WordleDictionary import *
+from core.WordleDecisions import *
+from core.WordleStudyLog import *
+from core.WordleStats import *
 from core.Wordle import *
 from collections import defaultdict
 
@@ -24,12 +39,33 @@ class WordleAnalyzer:
 
     wordle_class = WordleEndless
 
+    # If studies can play this analyzer through WordleHeadless and get_next_guess.
+    use_headless = False
+
+    # If the same game always gets the same guesses, so decisions can be cached.
+    deterministic = False
+
+    # The words this analyzer plays with. The config's word lists if not set.
+    # Subclass with another dictionary to study several variants side by side.
+    wordle_dictionary: Optional[WordleDictionary] = None
+
     def __init__(self, index):
         self.index = index
-        self.dictionary = {}
+        self.dictionary = None
 
     @classmethod
-    def get_dictionary(cls) -> dict:
+    def get_wordle_dictionary(cls) -> WordleDictionary:
+        return cls.wordle_dictionary if cls.wordle_dictionary is not None else get_default_dictionary()
+
+    @classmethod
+    def get_table(cls) -> FeedbackTable:
+        """
+        :return: The feedback table of this analyzer's words.
+        """
+        return cls.get_wordle_dictionary().get_feedback_table()
+
+    @classmethod
+    def get_dictionary(cls) -> WordIndex:
         raise NotImplementedError
 
     def set_dictionary(self, dictionary) -> None:
@@ -38,208 +74,836 @@ class WordleAnalyzer:
     def get_best_guess(self, useResponse: WordleResponse = None):
         raise NotImplementedError
 
+    def get_next_guess(self, guess: Optional[str], pattern: int) -> str:
+        """
+        The fast path of get_best_guess, used with WordleHeadless.
+        :param guess: The last guess, or None if nothing was guessed since the last call.
+        :param pattern: The feedback pattern of the last guess.
+        :return: The word to guess next.
+        """
+        raise NotImplementedError
+
+    def set_state(self, state: GameState) -> None:
+        """
+        Picks up a game from a snapshot, such as one branch of a lookahead.
+        get_next_guess(None, 0) gives the guess to make from there.
+        :param state: The snapshot, from a game with this analyzer's words.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def get_guess_for_state(cls, state: GameState, index: int = 0, dictionary=None) -> str:
+        """
+        :param state: The snapshot of a game with this analyzer's words.
+        :param index: The index of the game, used for the first pick.
+        :param dictionary: The shared dictionary from get_dictionary. Looked up if not given.
+        :return: The word this strategy guesses from the snapshot.
+        """
+        analyzer = cls(index)
+        analyzer.set_dictionary(dictionary if dictionary is not None else cls.get_dictionary())
+        analyzer.set_state(state)
+        return analyzer.get_next_guess(None, 0)
+
+    @classmethod
+    def get_strategy_name(cls) -> str:
+        """
+        :return: A name for this strategy and its settings.
+        """
+        return cls.__name__
+
+    @classmethod
+    def get_cache_name(cls) -> str:
+        """
+        :return: The strategy name, with the dictionary's name unless it's the default one.
+        """
+        name = cls.get_wordle_dictionary().name
+        return cls.get_strategy_name() + ('' if name == default_dictionary_name else f'-{name}')
+
+    @classmethod
+    def get_decision_cache(cls) -> DecisionCache:
+        """
+        The decisions this strategy made so far, shared by every game in the process.
+        Loaded from disk the first time.
+        :return: The cache.
+        """
+        name = cls.get_cache_name()
+        if name not in _decision_caches:
+            cache = DecisionCache()
+            cache.load(cls.get_decision_cache_path(), cls.get_table().get_fingerprint())
+            _decision_caches[name] = cache
+        return _decision_caches[name]
+
+    @classmethod
+    def get_decision_cache_path(cls) -> str:
+        return get_path(os.path.join(cache_directory, 'decisions', cls.get_cache_name() + '.bin'))
+
+    @classmethod
+    def save_decision_cache(cls) -> None:
+        """
+        Writes this strategy's decisions to disk.
+        """
+        cls.get_decision_cache().save(cls.get_decision_cache_path(), cls.get_table().get_fingerprint())
+
+    @classmethod
+    def run_game(cls, word: str, index: int, dictionary) -> WordleResponse:
+        """
+        Runs a game of Wordle.
+        :param word: The word to guess.
+        :param index: The index of this game, used for the first pick.
+        :param dictionary: The shared dictionary from get_dictionary.
+        :return: The final WordleResponse.
+        """
+        analyzer = cls(index)
+        analyzer.set_dictionary(dictionary)
+        wordle = cls.wordle_class(word=word, dictionary=cls.get_wordle_dictionary())
+        response = wordle.play()
+        while response.game_state not in (WordleState.GameWon, WordleState.GameLost):
+            if response.game_state == WordleState.InvalidGuess:
+                # Guessing the same word again would never end.
+                raise ValueError(f"{cls.__name__} made a guess {cls.wordle_class.__name__} doesn't take.")
+            if not analysis_error_checking:
+                response = wordle.play(analyzer.get_best_guess(response))
+            else:
+                try:
+                    response = wordle.play(analyzer.get_best_guess(response))
+                except IndexError as e:
+                    print(e)
+                    print("\nAn exception was caught during analysis.\n")
+                    print("Exception results:")
+                    print(f"WORD: {wordle.get_word()}\n"
+                          f"GUESSES: {response.guesses}\n"
+                          f"GUESSED WORDS: {response.guessed_words}\n"
+                          f"CORRECT: {response.correct_characters}\n"
+                          f"MISPLACED: {response.misplaced_characters}\n"
+                          f"WRONG: {response.wrong_characters}\n")
+                    raise e
+        if instrumentation.enabled:
+            instrumentation.count('games')
+        return response
+
+    @classmethod
+    def study_target(cls, word: str, game_count: int, dictionary,
+                     seed: Optional[int] = None, target_index: int = 0) -> List[Tuple[str, int]]:
+        """
+        Plays every game of a study against one target word.
+        :param word: The word to guess.
+        :param game_count: How many games to play.
+        :param dictionary: The shared dictionary from get_dictionary.
+        :param seed: If given, the RNG is reseeded from (seed, target_index),
+                     so results don't depend on which process plays them.
+        :param target_index: The position of this target in the study.
+        :return: The start word and guess count of every game.
+        """
+        if seed is not None:
+            random.seed(f'{seed}:{target_index}')
+        if cls.use_headless:
+            table = cls.get_table()
+
+            def new_player(game_index):
+                analyzer = cls(game_index)
+                analyzer.set_dictionary(dictionary)
+                return analyzer
+
+            guess_counts, first_guesses = WordleHeadless.play_batch(
+                [word] * game_count, new_player, table=table, max_guesses=cls.wordle_class.max_guesses,
+                hard_mode=cls.wordle_class.hard_mode, adversarial=cls.wordle_class.adversarial
+            )
+            return [(table.guesses[first], guesses) for first, guesses in zip(first_guesses, guess_counts)]
+
+        results = []
+        for game_index in range(game_count):
+            final_response = cls.run_game(word=word, index=game_index, dictionary=dictionary)
+            results.append((final_response.guessed_words[0], final_response.guesses))
+        return results
+
+    def clone(self) -> 'WordleAnalyzer':
+        """
+        Copies this analyzer mid-game, so the copy can take in different feedback.
+        Needed by deterministic analyzers for the batch engine.
+        :return: The copy.
+        """
+        raise NotImplementedError
+
     @classmethod
-    def print_study(cls, games: int = 1, result_count: int = 20) -> None:
+    def simulate_batch(cls, targets: Sequence[str], game_index: int, dictionary) -> Tuple[array, array]:
+        """
+        Plays game number game_index against every target at once.
+        Deterministic analyzers play all targets as one tree: each guess is
+        decided once for every target sharing a history, and the targets are
+        split up by the feedback table. Adversarial games don't have targets to
+        split up, so they're played one at a time.
+        :param targets: The words to guess.
+        :param game_index: The index of the game, used for the first pick.
+        :param dictionary: The shared dictionary from get_dictionary.
+        :return: The guess count and first guess (as a feedback table index) of every target.
+        """
+        table = cls.get_table()
+        if cls.deterministic and not cls.wordle_class.adversarial:
+            return cls.simulate_tree(targets, game_index, dictionary)
+        if cls.use_headless:
+            def new_player(_):
+                analyzer = cls(game_index)
+                analyzer.set_dictionary(dictionary)
+                return analyzer
+
+            return WordleHeadless.play_batch(targets, new_player, table=table,
+                                             max_guesses=cls.wordle_class.max_guesses,
+                                             hard_mode=cls.wordle_class.hard_mode,
+                                             adversarial=cls.wordle_class.adversarial)
+
+        guess_counts = array('L')
+        first_guesses = array('L')
+        for word in targets:
+            final_response = cls.run_game(word=word, index=game_index, dictionary=dictionary)
+            guess_counts.append(final_response.guesses)
+            first_guesses.append(table.guess_index[final_response.guessed_words[0]])
+        return guess_counts, first_guesses
+
+    @classmethod
+    def simulate_tree(cls, targets: Sequence[str], game_index: int, dictionary) -> Tuple[array, array]:
+        """
+        The batch engine of deterministic analyzers.
+        In hard mode, every branch keeps a bitset of the guesses that use its hints, to check the analyzer's guesses.
+        :param targets: The words to guess.
+        :param game_index: The index of the game, used for the first pick.
+        :param dictionary: The shared dictionary from get_dictionary.
+        :return: The guess count and first guess (as a feedback table index) of every target.
+        """
+        table = cls.get_table()
+        max_guesses = cls.wordle_class.max_guesses
+        win = winning_pattern(table.word_length)
+        answers = [table.answer_index[word] for word in targets]
+        guess_counts = array('L', [0]) * len(targets)
+        first_guesses = array('L', [0]) * len(targets)
+
+        hard_mode = cls.wordle_class.hard_mode
+        guess_index = cls.get_wordle_dictionary().get_guess_index()
+
+        root = cls(game_index)
+        root.set_dictionary(dictionary)
+        # Every branch is (analyzer, last guess, last pattern, targets on this branch, guesses allowed in hard mode).
+        branches = [(root, None, 0, list(range(len(targets))), guess_index.all)]
+        while branches:
+            analyzer, last_guess, last_pattern, members, allowed = branches.pop()
+            if hard_mode and last_guess is not None:
+                allowed = guess_index.narrow_hints(allowed, last_guess, decode_pattern(last_pattern, len(last_guess)))
+            guess = table.guess_index[analyzer.get_next_guess(last_guess, last_pattern)]
+            if hard_mode and not allowed >> guess & 1:
+                raise ValueError(f"{cls.__name__} guessed '{table.guesses[guess]}', which doesn't use every hint.")
+            row = table.row(guess)
+            splits = defaultdict(list)
+            for member in members:
+                guess_counts[member] += 1
+                if last_guess is None:
+                    first_guesses[member] = guess
+                pattern = row[answers[member]]
+                if pattern != win and guess_counts[member] < max_guesses:
+                    splits[pattern].append(member)
+            for i, (pattern, split) in enumerate(splits.items()):
+                # The last branch can keep the analyzer itself.
+                child = analyzer if i == len(splits) - 1 else analyzer.clone()
+                branches.append((child, table.guesses[guess], pattern, split, allowed))
+        if instrumentation.enabled:
+            instrumentation.count('games', len(targets))
+        return guess_counts, first_guesses
+
+    @classmethod
+    def study_game_index(cls, targets: Sequence[str], game_index: int, dictionary,
+                         seed: Optional[int] = None, unit: Optional[int] = None) -> List[Tuple[str, str, int]]:
+        """
+        Plays one game against every target with the batch engine.
+        :param targets: The words to guess.
+        :param game_index: The index of the game, used for the first pick.
+        :param dictionary: The shared dictionary from get_dictionary.
+        :param seed: If given, the RNG is reseeded from (seed, game_index).
+        :param unit: If given, the RNG is reseeded from (seed, unit) instead,
+                     for studies that play the same game index more than once.
+        :return: The target word, start word and guess count of every game.
+        """
+        if seed is not None:
+            random.seed(f'{seed}:batch:{game_index}' if unit is None else f'{seed}:sample:{unit}')
+        table = cls.get_table()
+        guess_counts, first_guesses = cls.simulate_batch(targets, game_index, dictionary)
+        return [(word, table.guesses[first], guesses)
+                for word, first, guesses in zip(targets, first_guesses, guess_counts)]
+
+    @classmethod
+    def print_study(cls, games: int = 1, result_count: int = 20,
+                    processes: int = 1, seed: Optional[int] = None, engine: str = 'game',
+                    instrument: bool = False, cprofile_chunk: int = 0, trace_path: Optional[str] = None,
+                    log_directory: Optional[str] = None, resume: bool = False) -> None:
         """
         Does a lot of simulations with this Wordle class.
         Prints the results of such.
+        :param games: How many times to play every (target, start word) pair.
+        :param result_count: How many words to show in each table.
+        :param processes: How many processes to split the work over.
+        :param seed: A seed to make the study reproducible.
+        :param engine: 'game' plays every target's games in turn,
+                       'batch' plays each game index against every target at once.
+        :param instrument: Time each phase of the games and count what they do,
+                           then print a summary at the end.
+        :param cprofile_chunk: If set, cProfile every chunk of this many units of work
+                               (only in this process, so workers aren't profiled).
+        :param trace_path: Where to write the instrumentation as JSON.
+        :param log_directory: If set, every game is logged there as it finishes,
+                              with a checkpoint after every unit of work.
+        :param resume: Carry on from the last checkpoint in log_directory.
         :return:
         """
-        def run_game(word, index, dictionary) -> WordleResponse:
-            """
-            Runs a game of Wordle.
-            :return: The final WordleResponse.
-            """
-            analyzer = cls(index)
-            analyzer.set_dictionary(dictionary)
-            wordle = cls.wordle_class(word=word)
-            response = wordle.play()
-            while response.game_state not in (WordleState.GameWon, WordleState.GameLost):
-                if not analysis_error_checking:
-                    response = wordle.play(analyzer.get_best_guess(response))
-                else:
-                    try:
-                        response = wordle.play(analyzer.get_best_guess(response))
-                    except IndexError as e:
-                        print(e)
-                        print("\nAn exception was caught during analysis.\n")
-                        print("Exception results:")
-                        print(f"WORD: {wordle.get_word()}\n"
-                              f"GUESSES: {response.guesses}\n"
-                              f"GUESSED WORDS: {response.guessed_words}\n"
-                              f"CORRECT: {response.correct_characters}\n"
-                              f"MISPLACED: {response.misplaced_characters}\n"
-                              f"WRONG: {response.wrong_characters}\n")
-                        raise e
-            return response
-
-        # Init variables for study
-        guesses_per_target_word = {}
-        guesses_per_start_word = {}
+        if instrument or cprofile_chunk:
+            instrumentation.reset()
+            instrumentation.enabled = True
 
         # Iterate over the games
         print("=== BEGIN WORDLE ANALYSIS ===")
         print("Entering game analysis phase.")
         print(f"Wordle class: {cls.__name__}")
-        review_list = answer_list * games
-        dictionary = cls.get_dictionary()
-        time_durations = []
-        for i, word in enumerate(review_list):
-            a = time()
-            print(f"Analyzing '{word}' - {i + 1} / {len(review_list)} ({round(((i + 1) / len(review_list)) * 100, 2)}%)")
-            for game_count in range(len(review_list)):
-                final_response = run_game(word=word, index=game_count, dictionary=dictionary)
-                start_word = final_response.guessed_words[0]
-
-                # Append target's result to guess dict
-                if word not in guesses_per_target_word:
-                    guesses_per_target_word[word] = [final_response.guesses]
-                else:
-                    guesses_per_target_word[word].append(final_response.guesses)
-                if start_word not in guesses_per_start_word:
-                    guesses_per_start_word[start_word] = [final_response.guesses]
-                else:
-                    guesses_per_start_word[start_word].append(final_response.guesses)
-            b = time()
-            time_durations.append(b - a)
-            seconds_to_go = (sum(time_durations) / len(time_durations)) * (len(review_list) - (i + 1))
-            time_word = 'seconds'
-            if seconds_to_go > 3600:
-                seconds_to_go /= 3600
-                time_word = 'hours'
-            elif seconds_to_go > 60:
-                seconds_to_go /= 60
-                time_word = 'minutes'
-            print(f"Finished analyzing '{word}' in {round(b - a, 2)} seconds. "
-                  f"Estimating {round(seconds_to_go, 2)} {time_word} to go.")
+        answers = cls.get_wordle_dictionary().answers
+        review_list = answers * games
+        table = cls.get_table()
+        stats = StudyStats(table.answers, table.guesses)
+        # Every target is played once per start index, so every (target, start) pair comes up once per pass.
+        start_count = len(answers)
+        if engine == 'batch':
+            # Every unit of work is a game index, played against every target.
+            labels = [f"game {game_index + 1}" for game_index in range(len(review_list))]
+        else:
+            # Every unit of work is a target word, played once per start index.
+            labels = review_list
+
+        # Pick up where a logged study left off
+        log = None
+        first_unit = 0
+        if log_directory:
+            log = StudyLog(log_directory)
+            parameters = {'analyzer': cls.get_cache_name(), 'games': games, 'engine': engine,
+                          'seed': seed, 'table': table.get_fingerprint().hex()}
+            first_unit = log.open(parameters, resume=resume)
+            if first_unit:
+                print(f"Resuming from '{labels[first_unit - 1]}' ({first_unit} / {len(labels)} done).")
+                for target, start, guesses in log.read():
+                    stats.add(target, start, guesses)
+
+        pool = None
+        if engine == 'batch':
+            print("Engine: batch")
+            if cls.deterministic:
+                # The game index doesn't change the games, so one pass is enough.
+                results = cls.study_game_index(answers, 0, cls.get_dictionary(), seed=seed)
+                study_results = ((results, [], None) for _ in labels[first_unit:])
+            elif processes > 1:
+                pool = Pool(processes, initializer=_init_study_worker,
+                            initargs=(cls, instrumentation.enabled, cls.wordle_dictionary))
+                tasks = [(cls, game_index, answers, seed) for game_index in range(first_unit, len(labels))]
+                study_results = pool.imap(_study_game_index_worker, tasks)
+            else:
+                dictionary = cls.get_dictionary()
+                study_results = (
+                    (cls.study_game_index(answers, game_index, dictionary, seed=seed), [], None)
+                    for game_index in range(first_unit, len(labels))
+                )
+        else:
+            if processes > 1:
+                pool = Pool(processes, initializer=_init_study_worker,
+                            initargs=(cls, instrumentation.enabled, cls.wordle_dictionary))
+                tasks = [(cls, i, review_list[i], start_count, seed) for i in range(first_unit, len(labels))]
+                study_results = pool.imap(_study_target_worker, tasks)
+            else:
+                dictionary = cls.get_dictionary()
+                study_results = (
+                    ([(review_list[i], start_word, guesses) for start_word, guesses in
+                      cls.study_target(review_list[i], start_count, dictionary, seed=seed, target_index=i)],
+                     [], None)
+                    for i in range(first_unit, len(labels))
+                )
+        if processes > 1:
+            print(f"Processes: {processes}")
+
+        study_start = time()
+        a = study_start
+        chunk_start = first_unit
+        profiler = cProfile.Profile() if cprofile_chunk else None
+        if profiler is not None:
+            profiler.enable()
+        try:
+            for i, (label, (results, new_decisions, metrics)) in enumerate(
+                    zip(labels[first_unit:], study_results), start=first_unit):
+                print(f"Analyzing '{label}' - {i + 1} / {len(labels)} ({round(((i + 1) / len(labels)) * 100, 2)}%)")
+                records = [(table.answer_index[word], table.guess_index[start_word], guesses)
+                           for word, start_word, guesses in results]
+                for target, start, guesses in records:
+                    stats.add(target, start, guesses)
+                if log is not None:
+                    log.append(records)
+                    log.checkpoint(i + 1)
+                b = time()
+                seconds_to_go = ((b - study_start) / (i + 1 - first_unit)) * (len(labels) - (i + 1))
+                time_word = 'seconds'
+                if seconds_to_go > 3600:
+                    seconds_to_go /= 3600
+                    time_word = 'hours'
+                elif seconds_to_go > 60:
+                    seconds_to_go /= 60
+                    time_word = 'minutes'
+                print(f"Finished analyzing '{label}' in {round(b - a, 2)} seconds. "
+                      f"Estimating {round(seconds_to_go, 2)} {time_word} to go.")
+                a = b
+                if new_decisions:
+                    cls.get_decision_cache().merge(new_decisions)
+                instrumentation.merge(metrics)
+                if profiler is not None and ((i + 1) % cprofile_chunk == 0 or i + 1 == len(labels)):
+                    profiler.disable()
+                    instrumentation.add_chunk(_get_profile_chunk(profiler, labels[chunk_start:i + 1]))
+                    chunk_start = i + 1
+                    profiler = cProfile.Profile()
+                    profiler.enable()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            if log is not None:
+                log.close()
+            if cls.deterministic:
+                cls.save_decision_cache()
         print("Game results obtained.")
         print("=== END WORDLE ANALYSIS ===")
         print('')
 
-        # Compute results
-        print("Computing results...")
+        if instrumentation.enabled:
+            instrumentation.enabled = False
+            print("Instrumentation:")
+            instrumentation.print_summary()
+            if trace_path:
+                instrumentation.write_trace(trace_path)
+                print(f"Trace written to {trace_path}.")
+            print('')
+
+        cls.print_results(stats, result_count)
+
+    @classmethod
+    def estimate_study(cls, result_count: int = 20, confidence: float = 0.95, tolerance: float = 0.1,
+                       games_per_word: int = 8, min_games: int = 30, max_games: Optional[int] = None,
+                       processes: int = 1, seed: Optional[int] = None) -> Tuple[StudyStats, bool]:
+        """
+        Estimates a study by sampling (target, start word) pairs instead of playing all of them.
+        Every round plays each start index against random targets, until every word has min_games games.
+        After that, rounds only play the words whose place in the rankings could still change:
+        unsettled start words against random targets, and unsettled targets from random start indices,
+        so each side's games stay a fair sample of the other side.
+        The sampling stops once the best and worst result_count words of both rankings are
+        told apart from the rest, and didn't change since the round before.
+        Deterministic analyzers have nothing to sample, so every target is played once.
+        :param result_count: How many words at each end of the rankings have to settle.
+        :param confidence: The confidence level of the intervals they're told apart with.
+        :param tolerance: How far intervals can overlap and still count as told apart, in guesses.
+        :param games_per_word: How many games each word being sampled gets every round.
+        :param min_games: How many games every word needs before its ranking can settle.
+        :param max_games: When to give up if the rankings don't settle. As many games as a full study if not given.
+        :param processes: How many processes to split the work over.
+        :param seed: A seed to make the estimate reproducible.
+        :return: The statistics, and if the rankings settled.
+        """
+        answers = cls.get_wordle_dictionary().answers
+        table = cls.get_table()
+        stats = StudyStats(table.answers, table.guesses)
+        if cls.deterministic:
+            for word, start_word, guesses in cls.study_game_index(answers, 0, cls.get_dictionary()):
+                stats.add_game(word, start_word, guesses)
+            return stats, True
 
-        sorted_guesses = list(guesses_per_target_word.keys())
-        sorted_guesses.sort(
-            key=lambda l: sum(guesses_per_target_word[l])/max(len(guesses_per_target_word[l]), 1)
-        )
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        start_count = len(answers)
+        if max_games is None:
+            max_games = start_count * len(answers)
+        sampler = random.Random(seed)
+        pool = None
+        if processes > 1:
+            pool = Pool(processes, initializer=_init_study_worker, initargs=(cls, False, cls.wordle_dictionary))
+        else:
+            dictionary = cls.get_dictionary()
 
-        sorted_guesses_initial = list(guesses_per_start_word.keys())
-        sorted_guesses_initial.sort(
-            key=lambda l: sum(guesses_per_start_word[l]) / max(len(guesses_per_start_word[l]), 1)
-        )
+        # The game indices each start word was played from, by start word index.
+        start_games: Dict[int, Set[int]] = defaultdict(set)
+        unsettled_targets: List[int] = []
+        unsettled_starts: List[int] = []
+        warming_up = True
+        games = 0
+        sample_index = 0
+        round_index = 0
+        settled = False
+        last_ends = None
+        study_start = time()
+        try:
+            while games < max_games and not settled:
+                round_start = time()
+                # Every sample is (counts for targets, counts for start words, game index, targets).
+                samples = []
+                if warming_up:
+                    for game_index in range(start_count):
+                        samples.append((True, True, game_index, sampler.choices(answers, k=games_per_word)))
+                else:
+                    for game_index in sorted({game_index for start in unsettled_starts
+                                              for game_index in start_games[start]}):
+                        samples.append((False, True, game_index, sampler.choices(answers, k=games_per_word)))
+                    draws = defaultdict(list)
+                    for target in unsettled_targets:
+                        for game_index in sampler.choices(range(start_count), k=games_per_word):
+                            draws[game_index].append(answers[target])
+                    for game_index, targets in sorted(draws.items()):
+                        samples.append((True, False, game_index, targets))
+
+                tasks = []
+                budget = max_games - games
+                for _, _, game_index, targets in samples:
+                    targets = targets[:budget]
+                    tasks.append((cls, sample_index, game_index, targets, seed))
+                    sample_index += 1
+                    budget -= len(targets)
+                    if budget <= 0:
+                        break
+                if pool is not None:
+                    round_results = pool.imap(_study_sample_worker, tasks, chunksize=16)
+                else:
+                    round_results = (cls.study_game_index(targets, game_index, dictionary, seed=seed, unit=unit)
+                                     for _, unit, game_index, targets, seed in tasks)
+                for (for_targets, for_starts, game_index, _), results in zip(samples, round_results):
+                    for word, start_word, guesses in results:
+                        start = table.guess_index[start_word]
+                        start_games[start].add(game_index)
+                        if for_targets:
+                            stats.targets.add(table.answer_index[word], guesses)
+                        if for_starts:
+                            stats.starts.add(start, guesses)
+                    games += len(results)
+                round_index += 1
+
+                sorted_targets = stats.targets.ranked()
+                sorted_starts = stats.starts.ranked()
+                ends = (sorted_targets[:result_count], sorted_targets[-result_count:],
+                        sorted_starts[:result_count], sorted_starts[-result_count:])
+                unsettled_targets = stats.targets.get_unsettled(result_count, z, tolerance, min_games)
+                unsettled_starts = stats.starts.get_unsettled(result_count, z, tolerance, min_games)
+                warming_up = any(stats.targets.counts[i] < min_games for i in sorted_targets) or \
+                    any(stats.starts.counts[i] < min_games for i in sorted_starts)
+                settled = ends == last_ends and not unsettled_targets and not unsettled_starts
+                last_ends = ends
+                print(f"Round {round_index}: {games} games in {round(time() - round_start, 2)} seconds "
+                      f"({round(time() - study_start, 2)} in total), {len(unsettled_targets)} targets and "
+                      f"{len(unsettled_starts)} start words unsettled." + (" Rankings settled." if settled else ""))
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+        return stats, settled
 
+    @classmethod
+    def print_estimate(cls, result_count: int = 20, confidence: float = 0.95, tolerance: float = 0.1,
+                       max_games: Optional[int] = None, processes: int = 1, seed: Optional[int] = None) -> None:
+        """
+        Estimates a study by sampling, and prints the results like print_study.
+        See estimate_study for the parameters.
+        """
+        print("=== BEGIN WORDLE ESTIMATE ===")
+        print(f"Wordle class: {cls.__name__}")
+        print(f"Settling the top and bottom {result_count} at {round(confidence * 100, 2)}% confidence, "
+              f"give or take {tolerance} guesses.")
+        stats, settled = cls.estimate_study(result_count, confidence, tolerance, max_games=max_games,
+                                            processes=processes, seed=seed)
+        if not settled:
+            print("The rankings didn't settle before the game limit, so they may still change.")
+        print("=== END WORDLE ESTIMATE ===")
+        print('')
+        cls.print_results(stats, result_count)
+
+    @staticmethod
+    def get_result_line(word_stats: RunningStats, i: int, words: Sequence[str]) -> str:
+        """
+        :return: A word's mean guess count, its 95% confidence interval and its standard deviation.
+        """
+        low, high = word_stats.interval(i)
+        return (f"{words[i]} with {round(word_stats.mean(i), 3)} guesses "
+                f"(95% CI {round(low, 3)}-{round(high, 3)}, sd {round(sqrt(word_stats.variance(i)), 3)}, "
+                f"{word_stats.counts[i]} games)")
+
+    @classmethod
+    def print_log_results(cls, log_directory: str, result_count: int = 20) -> None:
+        """
+        Prints the results of a logged study, without replaying its games.
+        The study doesn't have to be finished.
+        :param log_directory: Where the study was logged.
+        :param result_count: How many words to show in each table.
+        """
+        table = cls.get_table()
+        stats = StudyStats(table.answers, table.guesses)
+        for target, start, guesses in StudyLog(log_directory).read():
+            stats.add(target, start, guesses)
+        cls.print_results(stats, result_count)
+
+    @classmethod
+    def print_results(cls, stats: StudyStats, result_count: int = 20) -> None:
+        """
+        Prints the rankings of a study, and writes the best initial words to file.
+        :param stats: The running statistics of the study.
+        :param result_count: How many words to show in each table.
+        """
+        # Compute results
+        print("Computing results...")
+        sorted_targets = stats.targets.ranked()
+        sorted_starts = stats.starts.ranked()
         print("Done.")
         print('')
 
         # Get the guesses per target word lined up
         print(f"Top {result_count} easiest words to guess:")
-        for i in range(result_count):
-            word = sorted_guesses[i]
-            guess_count = round(sum(guesses_per_target_word[word]) / max(len(guesses_per_target_word[word]), 1), 3)
-            print(f"{i + 1}. {word} with {guess_count} guesses")
+        for i in range(min(result_count, len(sorted_targets))):
+            print(f"{i + 1}. " + cls.get_result_line(stats.targets, sorted_targets[i], stats.target_words))
         print('')
         print(f"Top {result_count} hardest words to guess:")
-        for i in range(result_count):
-            word = sorted_guesses[-(i + 1)]
-            guess_count = round(sum(guesses_per_target_word[word]) / max(len(guesses_per_target_word[word]), 1), 3)
-            print(f"{i + 1}. {word} with {guess_count} guesses")
+        for i in range(min(result_count, len(sorted_targets))):
+            print(f"{i + 1}. " + cls.get_result_line(stats.targets, sorted_targets[-(i + 1)], stats.target_words))
         print('')
         # Get the guesses per start word lined up
         print(f"Top {result_count} best guess counts from initial word:")
-        for i in range(result_count):
-            word = sorted_guesses_initial[i]
-            guess_count = round(sum(guesses_per_start_word[word]) / max(len(guesses_per_start_word[word]), 1), 3)
-            print(f"{i + 1}. {word} with {guess_count} guesses")
+        for i in range(min(result_count, len(sorted_starts))):
+            print(f"{i + 1}. " + cls.get_result_line(stats.starts, sorted_starts[i], stats.start_words))
         print('')
         print(f"Top {result_count} worst guess counts from initial word:")
-        for i in range(result_count):
-            word = sorted_guesses_initial[-(i + 1)]
-            guess_count = round(sum(guesses_per_start_word[word]) / max(len(guesses_per_start_word[word]), 1), 3)
-            print(f"{i + 1}. {word} with {guess_count} guesses")
+        for i in range(min(result_count, len(sorted_starts))):
+            print(f"{i + 1}. " + cls.get_result_line(stats.starts, sorted_starts[-(i + 1)], stats.start_words))
+        print('')
+        # How the games went overall
+        distribution = stats.targets.total_distribution()
+        games = sum(distribution)
+        print(f"Guess count distribution over {games} games:")
+        for guesses, amount in enumerate(distribution):
+            if amount:
+                label = f"{guesses}+" if guesses == len(distribution) - 1 else str(guesses)
+                print(f"{label:>4}: {amount} ({round(amount / games * 100, 2)}%)")
         print('')
         print('End of analysis.')
 
         # Output best initial guesses into a file
+        cls.write_start_words([stats.start_words[i] for i in sorted_starts])
+
+    @classmethod
+    def write_start_words(cls, words: Iterable[str]) -> None:
+        """
+        Writes the best initial words to this analyzer's dictionary's start word list, best first.
+        :param words: The ranked start words.
+        """
         print('Writing best initial words to file...')
-        with open('../wordlist/top_initial_word_list.txt', mode='w') as file:
-            for word in sorted_guesses_initial:
+        path = cls.get_wordle_dictionary().get_start_words_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, mode='w') as file:
+            for word in words:
                 file.write(word + '\n')
         print('Written.')
 
+    """
+    Start word ranking
+    """
+
+    @classmethod
+    def rank_start_words(cls, metric: str = 'expected_size', lookahead: int = 0,
+                         lookahead_guesses: Optional[int] = None) -> List[Tuple[float, int]]:
+        """
+        Scores every guess as a start word by how it splits up the answer list,
+        without playing any games.
+        :param metric: 'expected_size', 'entropy' or 'worst_bucket'.
+        :param lookahead: Re-rank this many of the best start words by the
+                          expected candidates left after the best second guess.
+        :param lookahead_guesses: How many of the best start words to try as second guesses.
+                                  Every guess if not given, which takes a few seconds per start word.
+        :return: (score, guess index) of every guess, best first. Lower scores are better.
+        """
+        table = cls.get_table()
+        scorer = partition_scorers[metric]
+        ranked = sorted((scorer(partition), guess) for guess, partition in table.partitions())
+        if lookahead:
+            second_guesses = [guess for _, guess in ranked[:lookahead_guesses or len(ranked)]]
+            refined = sorted((cls.get_lookahead_score(table, guess, second_guesses), guess)
+                             for _, guess in ranked[:lookahead])
+            ranked = refined + ranked[lookahead:]
+        return ranked
+
+    @staticmethod
+    def get_lookahead_score(table: FeedbackTable, guess: int, second_guesses: Sequence[int]) -> float:
+        """
+        :param table: The feedback table.
+        :param guess: The start word's guess index.
+        :param second_guesses: The guess indices to try after it.
+        :return: How many answers are left on average after the start word and the best second guess.
+        """
+        buckets = defaultdict(list)
+        for answer, pattern in enumerate(table.row(guess)):
+            buckets[pattern].append(answer)
+        total = 0
+        for bucket in buckets.values():
+            if len(bucket) <= 2:
+                # Guess one of them; whatever's left is alone.
+                total += len(bucket)
+                continue
+            total += min(sum(size * size for size in partition.values())
+                         for _, partition in table.partitions(bucket, second_guesses))
+        return total / table.answer_count
+
+    @classmethod
+    def print_start_word_ranking(cls, metric: str = 'expected_size', lookahead: int = 0,
+                                 lookahead_guesses: Optional[int] = None, result_count: int = 20) -> None:
+        """
+        Ranks every start word by its partition of the answer list,
+        prints the best ones and writes the ranking to file.
+        :param metric: 'expected_size', 'entropy' or 'worst_bucket'.
+        :param lookahead: Re-rank this many of the best start words with a second guess.
+        :param lookahead_guesses: How many of the best start words to try as second guesses.
+        :param result_count: How many words to show.
+        """
+        print("=== BEGIN START WORD RANKING ===")
+        print(f"Metric: {metric}" + (f", two-step lookahead over the top {lookahead}" if lookahead else ''))
+        start = perf_counter()
+        ranked = cls.rank_start_words(metric, lookahead, lookahead_guesses)
+        print(f"Ranked {len(ranked)} start words in {round(perf_counter() - start, 2)} seconds.")
+        print('')
+
+        table = cls.get_table()
+        print(f"Top {result_count} start words:")
+        for i in range(min(result_count, len(ranked))):
+            score, guess = ranked[i]
+            label = 'lookahead' if i < lookahead else metric
+            print(f"{i + 1}. {table.guesses[guess]} with {label} {round(abs(score), 4)}")
+        print('')
+        cls.write_start_words(table.guesses[guess] for _, guess in ranked)
+
 
 class WARandomAnswer(WordleAnalyzer):
     """
     Guesses the result based on randomizing the potential answers.
     """
 
-    use_list = answer_list
+    use_headless = True
+
+    def __init__(self, index):
+        super().__init__(index)
+        self.candidates = 0
+        self.seen_guesses = 0
 
     @classmethod
-    def get_dictionary(cls) -> dict:
-        set_list = cls.use_list[:]
-        ret_dict = defaultdict(list)
-        for word in set_list:
-            ret_dict[word[0]].append(word)
-        return dict(ret_dict)
+    def get_dictionary(cls) -> WordIndex:
+        return cls.get_wordle_dictionary().get_answer_index()
+
+    def set_dictionary(self, dictionary: WordIndex) -> None:
+        super().set_dictionary(dictionary)
+        self.candidates = dictionary.all
+        self.seen_guesses = 0
+
+    def update_candidates(self, response: WordleResponse) -> None:
+        """
+        Narrows down our candidates with the newest feedback.
+        :param response: The latest response from the game.
+        """
+        guesses = len(response.guessed_words)
+        if guesses == self.seen_guesses:
+            return
+        if guesses == self.seen_guesses + 1:
+            self.candidates = self.dictionary.narrow(
+                self.candidates, response.guessed_words[-1], response.word_response
+            )
+        elif response.snapshot is not None:
+            # We missed a turn, so pick up from the game's snapshot.
+            self.set_state(response.snapshot)
+        else:
+            # We missed a turn, so work from everything the game knows.
+            self.candidates = self.dictionary.constrain(
+                self.dictionary.all, response.wrong_characters,
+                response.misplaced_characters, response.correct_characters,
+                response.min_letter_counts, response.max_letter_counts
+            )
+        self.seen_guesses = guesses
+
+    def set_state(self, state: GameState) -> None:
+        table = self.get_table()
+        self.candidates = self.dictionary.all
+        for guess, pattern in state.get_history():
+            word = table.guesses[guess]
+            self.candidates = self.dictionary.narrow(self.candidates, word, decode_pattern(pattern, len(word)))
+        self.seen_guesses = state.get_guesses()
 
     def get_best_guess(self, response: WordleResponse = None):
-        if response.wrong_characters or response.misplaced_characters or response.correct_characters:
-            potential_list = []
-
-            # first get our shortened list based on our dictionary
-            check_list = []
-            for letter in self.dictionary:
-                if letter in response.wrong_characters:
-                    continue
-                if letter in response.misplaced_characters:
-                    if 0 in response.misplaced_characters[letter]:
-                        continue
-                if letter in response.correct_characters:
-                    if 0 in response.correct_characters[letter]:
-                        check_list = self.dictionary[letter]
-                        break
-                check_list += self.dictionary[letter]
+        if response is not None and response.guessed_words:
+            self.update_candidates(response)
+            return self.pick_candidate()
 
-            # check every letter of every word like a boss
-            for word in check_list[:]:
-                acceptableWord = True
+        # this is our first pick, so use an index from the use list
+        return self.dictionary.words[self.index % len(self.dictionary.words)]
 
-                for letter in response.misplaced_characters:
-                    if letter not in word:
-                        continue
+    def get_next_guess(self, guess: Optional[str], pattern: int) -> str:
+        if guess is not None:
+            self.candidates = self.dictionary.narrow(self.candidates, guess, decode_pattern(pattern, len(guess)))
+            self.seen_guesses += 1
+        if self.seen_guesses:
+            return self.pick_candidate()
 
-                for i, letter in enumerate(word):
-                    # if it's a wrong character, then no thank you.
-                    if letter in response.wrong_characters:
-                        acceptableWord = False
-                        break
+        # this is our first pick, so use an index from the use list
+        return self.dictionary.words[self.index % len(self.dictionary.words)]
 
-                    # if this character is in a position known to be misplaced, then no thank you.
-                    if letter in response.misplaced_characters:
-                        if i in response.misplaced_characters[letter]:
-                            acceptableWord = False
-                            break
-
-                    # if there is a correct character in this position,
-                    # and we're not it, then no thank you.
-                    for correct_letter, correct_places in response.correct_characters.items():
-                        if i in correct_places:
-                            if letter != correct_letter:
-                                acceptableWord = False
-                                break
-
-                    if not acceptableWord:
-                        break
+    @classmethod
+    def simulate_batch(cls, targets: Sequence[str], game_index: int, dictionary: WordIndex) -> Tuple[array, array]:
+        """
+        Plays game number game_index against every target at once, a turn at a time.
+        Every game's candidates are a bitset, and the split made by the shared
+        first guess is only worked out once per pattern.
+        Candidates fit every response, so they always use every hint in hard mode.
+        """
+        if cls.wordle_class.adversarial:
+            return super().simulate_batch(targets, game_index, dictionary)
+        table = cls.get_table()
+        max_guesses = cls.wordle_class.max_guesses
+        win = winning_pattern(table.word_length)
+        first = dictionary.words[game_index % len(dictionary.words)]
+        first_id = table.guess_index[first]
+        guess_counts = array('L', [1]) * len(targets)
+        first_guesses = array('L', [first_id]) * len(targets)
 
-                if acceptableWord:
-                    # if it's a good word, accept it
-                    potential_list.append(word)
+        first_row = table.row(first_id)
+        first_splits = {}
+        # Every active game is (target position, answer index, candidates).
+        active = []
+        for member, word in enumerate(targets):
+            answer = table.answer_index[word]
+            pattern = first_row[answer]
+            if pattern == win or max_guesses <= 1:
+                continue
+            if pattern not in first_splits:
+                first_splits[pattern] = dictionary.narrow(dictionary.all, first, decode_pattern(pattern, len(first)))
+            active.append((member, answer, first_splits[pattern]))
 
-            return random.choice(potential_list)
+        while active:
+            still_active = []
+            for member, answer, candidates in active:
+                guess = dictionary.words[random.choice(list(bit_indices(candidates)))]
+                pattern = table.pattern(table.guess_index[guess], answer)
+                guess_counts[member] += 1
+                if pattern != win and guess_counts[member] < max_guesses:
+                    candidates = dictionary.narrow(candidates, guess, decode_pattern(pattern, len(guess)))
+                    still_active.append((member, answer, candidates))
+            active = still_active
+        if instrumentation.enabled:
+            instrumentation.count('games', len(targets))
+        return guess_counts, first_guesses
 
-        # this is our first pick, so use an index from the use list
-        return self.use_list[self.index % len(self.use_list)]
+    def pick_candidate(self) -> str:
+        """
+        :return: A random word out of our candidates.
+        """
+        if instrumentation.enabled:
+            start = perf_counter()
+            word = self.dictionary.words[random.choice(list(bit_indices(self.candidates)))]
+            instrumentation.add_time('choosing', perf_counter() - start)
+            return word
+        return self.dictionary.words[random.choice(list(bit_indices(self.candidates)))]
 
 
 class WARandomGuess(WARandomAnswer):
@@ -247,8 +911,657 @@ class WARandomGuess(WARandomAnswer):
     Guesses the result based on randomizing the potential guesses.
     """
 
-    use_list = guess_list
+    @classmethod
+    def get_dictionary(cls) -> WordIndex:
+        return cls.get_wordle_dictionary().get_guess_index()
+
+
+class WAEntropy(WordleAnalyzer):
+    """
+    Guesses the word that tells us the most about the answer.
+    Every allowed guess is scored by how it splits up the remaining candidates:
+        - entropy: the information its feedback gives
+        - expected_size: how many candidates it leaves on average
+        - worst_bucket: how many candidates it leaves at worst
+    Decisions are cached by game history, and candidates are only narrowed
+    down when a decision isn't cached, so replaying a known game is a tree walk.
+    In hard mode, the guesses that use every hint are kept as a bitset, narrowed with every guess.
+    """
+
+    metric = 'entropy'
+    use_headless = True
+    deterministic = True
+
+    # Only guess words that could still be the answer.
+    candidates_only = False
+
+    def __init__(self, index):
+        super().__init__(index)
+        self.candidates: List[int] = []
+        self.pending: List[Tuple[int, int]] = []
+        self.history: Optional[History] = ()
+        self.allowed = 0
+        self.seen_guesses = 0
+
+    @classmethod
+    def get_dictionary(cls) -> FeedbackTable:
+        return cls.get_table()
+
+    @classmethod
+    def get_strategy_name(cls) -> str:
+        return f"{cls.__name__}-{cls.metric}" + ('-candidates' if cls.candidates_only else '') + \
+            ('-hard' if cls.wordle_class.hard_mode else '')
+
+    def set_dictionary(self, dictionary: FeedbackTable) -> None:
+        super().set_dictionary(dictionary)
+        self.candidates = list(range(dictionary.answer_count))
+        self.pending = []
+        self.history = ()
+        self.allowed = self.get_wordle_dictionary().get_guess_index().all if self.wordle_class.hard_mode else 0
+        self.seen_guesses = 0
+
+    def clone(self) -> 'WAEntropy':
+        analyzer = copy(self)
+        analyzer.pending = list(self.pending)
+        return analyzer
+
+    @classmethod
+    def rank_guesses(cls, table: FeedbackTable, candidates: Sequence[int],
+                     guesses: Iterable[int] = None) -> List[Tuple[float, int]]:
+        """
+        Scores guesses over the candidates; lower is better.
+        A guess that could be the answer wins ties.
+        :param table: The feedback table.
+        :param candidates: The remaining answer indices.
+        :param guesses: The guess indices to score. Every guess if not given.
+        :return: (score, guess) for every guess, best first.
+        """
+        if instrumentation.enabled:
+            start = perf_counter()
+        candidate_words = {table.answers[answer] for answer in candidates}
+        ranked = []
+        for guess, partition in table.partitions(candidates, guesses):
+            score = partition_scorers[cls.metric](partition)
+            ranked.append((score, table.guesses[guess] not in candidate_words, guess))
+        ranked.sort()
+        if instrumentation.enabled:
+            instrumentation.add_time('ranking', perf_counter() - start)
+            instrumentation.count('guesses_scored', len(ranked))
+        return [(score, guess) for score, _, guess in ranked]
+
+    def choose_guess(self) -> str:
+        """
+        :return: The best guess over our candidates.
+        """
+        table = self.dictionary
+        cache = self.get_decision_cache() if self.history is not None else None
+        if cache is not None:
+            guess = cache.get(self.history)
+            if instrumentation.enabled:
+                instrumentation.count('cache_hits' if guess is not None else 'cache_misses')
+            if guess is not None:
+                return table.guesses[guess]
+
+        candidates = self.get_candidates()
+        if len(candidates) <= 2:
+            guess = table.guess_index[table.answers[candidates[0]]]
+        else:
+            guess = self.rank_guesses(table, candidates, self.get_guess_pool())[0][1]
+        if cache is not None:
+            cache.put(self.history, guess)
+        return table.guesses[guess]
+
+    def get_guess_pool(self) -> Optional[List[int]]:
+        """
+        :return: The guess indices we're allowed to pick from, or None for all of them.
+        """
+        table = self.dictionary
+        if self.candidates_only:
+            return [table.guess_index[table.answers[answer]] for answer in self.get_candidates()]
+        if self.wordle_class.hard_mode:
+            return list(bit_indices(self.allowed))
+        return None
+
+    def get_candidates(self) -> List[int]:
+        """
+        Narrows down the candidates with any feedback not applied yet.
+        :return: The remaining answer indices.
+        """
+        table = self.dictionary
+        if instrumentation.enabled and self.pending:
+            start = perf_counter()
+            instrumentation.count('candidates_scanned', len(self.candidates))
+        for guess, pattern in self.pending:
+            row = table.row(guess)
+            self.candidates = [answer for answer in self.candidates if row[answer] == pattern]
+        if instrumentation.enabled and self.pending:
+            instrumentation.add_time('filtering', perf_counter() - start)
+        self.pending = []
+        return self.candidates
+
+    def narrow(self, guess: str, pattern: int) -> None:
+        """
+        Takes in the feedback of a guess.
+        :param guess: The word that was guessed.
+        :param pattern: Its feedback pattern.
+        """
+        table = self.dictionary
+        guess_id = table.guess_index.get(guess)
+        if guess_id is None:
+            # Words outside the table can't be part of a cached history.
+            self.candidates = [answer for answer in self.get_candidates()
+                               if score_word(guess, table.answers[answer]) == pattern]
+            self.history = None
+        else:
+            self.pending.append((guess_id, pattern))
+            if self.history is not None:
+                self.history += ((guess_id, pattern),)
+        if self.wordle_class.hard_mode:
+            self.allowed = self.get_wordle_dictionary().get_guess_index().narrow_hints(
+                self.allowed, guess, decode_pattern(pattern, len(guess)))
+        self.seen_guesses += 1
+
+    def get_best_guess(self, response: WordleResponse = None):
+        if response is not None and len(response.guessed_words) != self.seen_guesses:
+            if len(response.guessed_words) == self.seen_guesses + 1:
+                self.narrow(response.guessed_words[-1], encode_pattern(response.word_response))
+            elif response.snapshot is not None:
+                # We missed a turn, so pick up from the game's snapshot.
+                self.set_state(response.snapshot)
+            else:
+                # We missed a turn, so work from everything the game knows.
+                index = self.get_wordle_dictionary().get_answer_index()
+                bits = index.constrain(index.all, response.wrong_characters,
+                                       response.misplaced_characters, response.correct_characters,
+                                       response.min_letter_counts, response.max_letter_counts)
+                self.candidates = list(bit_indices(bits))
+                self.pending = []
+                self.history = None
+                if self.wordle_class.hard_mode:
+                    guess_index = self.get_wordle_dictionary().get_guess_index()
+                    self.allowed = guess_index.constrain(guess_index.all, [], {}, response.correct_characters,
+                                                         response.min_letter_counts)
+                self.seen_guesses = len(response.guessed_words)
+        return self.choose_guess()
+
+    def set_state(self, state: GameState) -> None:
+        # The candidates are narrowed down the next time they're needed, so cached decisions skip it.
+        self.candidates = list(range(self.dictionary.answer_count))
+        self.pending = list(state.get_history())
+        self.history = state.get_history()
+        if self.wordle_class.hard_mode:
+            guess_index = self.get_wordle_dictionary().get_guess_index()
+            self.allowed = guess_index.all
+            for guess, pattern in self.history:
+                word = self.dictionary.guesses[guess]
+                self.allowed = guess_index.narrow_hints(self.allowed, word, decode_pattern(pattern, len(word)))
+        self.seen_guesses = state.get_guesses()
+
+    def get_next_guess(self, guess: Optional[str], pattern: int) -> str:
+        if guess is not None:
+            self.narrow(guess, pattern)
+        return self.choose_guess()
+
+
+# The decision caches of deterministic strategies, by strategy name.
+_decision_caches: Dict[str, DecisionCache] = {}
+
+# The dictionary of a study worker process, built once when the worker starts.
+_worker_dictionary = None
+
+
+class WADecisionTree(WordleAnalyzer):
+    """
+    Replays a decision tree, such as the optimal strategy from OptimalSolver in WordleCrack.
+    Every node is {'guess': word, 'children': {pattern: node}}, with patterns as strings.
+    """
+
+    use_headless = True
+    deterministic = True
+
+    # The tree to replay, as written by save_decision_tree.
+    tree_path = get_path(os.path.join(cache_directory, 'trees', 'optimal.json'))
+
+    def __init__(self, index):
+        super().__init__(index)
+        self.node = None
+        self.seen_guesses = 0
+
+    @classmethod
+    def get_dictionary(cls) -> dict:
+        """
+        :return: The root of the tree, loaded once per process.
+        """
+        if cls.tree_path not in _decision_trees:
+            with open(cls.tree_path) as file:
+                tree = json.load(file)
+            _decision_trees[cls.tree_path] = tree.get('tree', tree)
+        return _decision_trees[cls.tree_path]
+
+    @classmethod
+    def get_strategy_name(cls) -> str:
+        return f"{cls.__name__}-{os.path.splitext(os.path.basename(cls.tree_path))[0]}"
+
+    def set_dictionary(self, dictionary: dict) -> None:
+        super().set_dictionary(dictionary)
+        self.node = dictionary
+        self.seen_guesses = 0
+
+    def clone(self) -> 'WADecisionTree':
+        return copy(self)
+
+    def follow(self, pattern: int) -> None:
+        """
+        Moves down the tree.
+        :param pattern: The feedback pattern of the last guess.
+        """
+        children = self.node.get('children', {})
+        if str(pattern) not in children:
+            raise ValueError(f"The decision tree has no move after '{self.node['guess']}' got pattern {pattern}.")
+        self.node = children[str(pattern)]
+        self.seen_guesses += 1
+
+    def set_state(self, state: GameState) -> None:
+        table = self.get_table()
+        self.node = self.dictionary
+        self.seen_guesses = 0
+        for guess, pattern in state.get_history():
+            if self.node['guess'] != table.guesses[guess]:
+                raise ValueError(f"The decision tree guesses '{self.node['guess']}', not '{table.guesses[guess]}'.")
+            self.follow(pattern)
+
+    def get_best_guess(self, response: WordleResponse = None):
+        if response is not None and len(response.guessed_words) != self.seen_guesses:
+            if len(response.guessed_words) == self.seen_guesses + 1:
+                self.follow(encode_pattern(response.word_response))
+            elif response.snapshot is not None:
+                self.set_state(response.snapshot)
+            else:
+                raise ValueError("A decision tree can't pick up a game halfway.")
+        return self.node['guess']
+
+    def get_next_guess(self, guess: Optional[str], pattern: int) -> str:
+        if guess is not None:
+            self.follow(pattern)
+        return self.node['guess']
+
+
+_decision_trees: Dict[str, dict] = {}
+
+
+class WAMultiBoard:
+    """
+    Plays every board of a multi-board game, like Quordle, at once.
+    It isn't a WordleAnalyzer, since its games have a word per board and its feedback a pattern per board,
+    so it has its own entry points: run_game, simulate_boards and print_board_study.
+    Every board keeps its candidates as a list of answer indices, narrowed with the guess's feedback table row.
+    Boards that still have the same candidates, like every board before the first guess,
+    are split up by the row in one pass, and each one takes its pattern's part.
+    Guesses are scored by how they split up every unsolved board's candidates together:
+    the candidates of all boards are looked up in the guess's feedback table row,
+    and the guess with the most (board, pattern) buckets wins, as every bucket is a different outcome.
+    A guess that could solve a board wins ties, and a board that's down to one word is solved right away.
+    """
+
+    wordle_class = WordleMulti
+
+    # The words this analyzer plays with. The config's word lists if not set.
+    wordle_dictionary: Optional[WordleDictionary] = None
+
+    # How many of the best start words (by expected size) are scored besides the candidates.
+    opener_count = 10
+
+    # The most candidates that are scored as guesses, taken from the boards with the fewest first.
+    pool_size = 48
+
+    def __init__(self, index):
+        self.index = index
+        self.dictionary = None
+        # The candidates of every board as answer indices, or None once it's solved.
+        # Boards with the same candidates share one list, which is never changed in place.
+        self.candidates: List[Optional[List[int]]] = []
+        self.seen_guesses = 0
+
+    @classmethod
+    def get_wordle_dictionary(cls) -> WordleDictionary:
+        return cls.wordle_dictionary if cls.wordle_dictionary is not None else get_default_dictionary()
+
+    @classmethod
+    def get_table(cls) -> FeedbackTable:
+        return cls.get_wordle_dictionary().get_feedback_table()
+
+    @classmethod
+    def get_dictionary(cls) -> FeedbackTable:
+        return cls.get_table()
+
+    @classmethod
+    def get_strategy_name(cls) -> str:
+        return f"{cls.__name__}-{cls.wordle_class.board_count}"
+
+    @classmethod
+    def get_cache_name(cls) -> str:
+        """
+        :return: The strategy name, with the dictionary's name unless it's the default one.
+        """
+        name = cls.get_wordle_dictionary().name
+        return cls.get_strategy_name() + ('' if name == default_dictionary_name else f'-{name}')
+
+    @classmethod
+    def get_openers(cls) -> List[int]:
+        """
+        :return: The guess indices of the best start words by expected size, ranked once per process.
+        """
+        name = cls.get_cache_name()
+        if name not in _multi_openers:
+            ranked = sorted((partition_expected_size(partition), guess)
+                            for guess, partition in cls.get_table().partitions())
+            _multi_openers[name] = [guess for _, guess in ranked[:cls.opener_count]]
+        return _multi_openers[name]
+
+    def set_dictionary(self, dictionary: FeedbackTable) -> None:
+        self.dictionary = dictionary
+        self.candidates = [list(range(dictionary.answer_count))] * self.wordle_class.board_count
+        self.seen_guesses = 0
+
+    def narrow(self, guess: str, patterns: Sequence[int]) -> None:
+        """
+        Takes in the feedback of every board.
+        :param guess: The guessed word.
+        :param patterns: The pattern of every board, with -1 for boards solved before.
+        """
+        table = self.dictionary
+        win = winning_pattern(table.word_length)
+        row = self.get_row(table.guess_index[guess])
+        sharing = Counter(id(candidates) for candidates in self.candidates if candidates is not None)
+        # The parts of every candidate list more than one board has, by pattern.
+        parts: Dict[int, Dict[int, List[int]]] = {}
+        for board, pattern in enumerate(patterns):
+            candidates = self.candidates[board]
+            if candidates is None or pattern < 0:
+                continue
+            if pattern == win:
+                self.candidates[board] = None
+            elif sharing[id(candidates)] > 1:
+                if id(candidates) not in parts:
+                    split = parts[id(candidates)] = defaultdict(list)
+                    for answer in candidates:
+                        split[row[answer]].append(answer)
+                self.candidates[board] = parts[id(candidates)].get(pattern, [])
+            else:
+                self.candidates[board] = [answer for answer in candidates if row[answer] == pattern]
+        self.seen_guesses += 1
+
+    def get_row(self, guess: int) -> Union[bytes, memoryview]:
+        """
+        :param guess: The index of a guess.
+        :return: Its feedback table row. One-byte patterns are copied out as bytes, which index faster.
+        """
+        row = self.dictionary.row(guess)
+        return row.tobytes() if self.dictionary.pattern_size == 1 else row
+
+    def choose_guess(self) -> str:
+        """
+        :return: The guess that splits up every board's candidates the most.
+        """
+        if instrumentation.enabled:
+            start = perf_counter()
+        table = self.dictionary
+        boards = sorted((candidates for candidates in self.candidates if candidates is not None), key=len)
+        if len(boards[0]) == 1:
+            return table.answers[boards[0][0]]
+
+        # Candidates of the smallest boards first, then the best start words.
+        pool = []
+        for board in boards:
+            pool.extend(table.guess_index[table.answers[answer]] for answer in board)
+            if len(pool) >= self.pool_size:
+                break
+        candidate_guesses = set(pool)
+        pool = list(dict.fromkeys(pool[:self.pool_size] + self.get_openers()))
+
+        getters = [itemgetter(*answers) for answers in boards]
+
+        def get_score(guess: int) -> Tuple[int, bool, int]:
+            row = self.get_row(guess)
+            return sum(len(set(get(row))) for get in getters), guess in candidate_guesses, -guess
+
+        best = max(pool, key=get_score)
+        if instrumentation.enabled:
+            instrumentation.add_time('choosing', perf_counter() - start)
+            instrumentation.count('guesses_scored', len(pool))
+        return table.guesses[best]
+
+    def get_best_guess(self, response: MultiWordleResponse = None):
+        if response is not None and len(response.guessed_words) > self.seen_guesses:
+            if len(response.guessed_words) != self.seen_guesses + 1:
+                raise ValueError(f"{type(self).__name__} can't pick up a game halfway.")
+            self.narrow(response.guessed_words[-1],
+                        [encode_pattern(board.word_response) if board.word_response else -1
+                         for board in response.board_responses])
+        return self.get_next_guess(None, ())
+
+    def get_next_guess(self, guess: Optional[str], patterns: Sequence[int]) -> str:
+        if guess is not None:
+            self.narrow(guess, patterns)
+        if self.seen_guesses:
+            return self.choose_guess()
+
+        # this is our first pick, so use an index from the use list
+        return self.dictionary.answers[self.index % self.dictionary.answer_count]
+
+    @classmethod
+    def run_game(cls, words: Sequence[str], index: int, dictionary) -> MultiWordleResponse:
+        """
+        Runs a multi-board game.
+        :param words: The word of every board.
+        :param index: The index of this game, used for the first pick.
+        :param dictionary: The shared dictionary from get_dictionary.
+        :return: The final MultiWordleResponse.
+        """
+        analyzer = cls(index)
+        analyzer.set_dictionary(dictionary)
+        wordle = cls.wordle_class(words=words, dictionary=cls.get_wordle_dictionary())
+        response = wordle.play()
+        while response.game_state not in (WordleState.GameWon, WordleState.GameLost):
+            if response.game_state == WordleState.InvalidGuess:
+                raise ValueError(f"{cls.__name__} made a guess {cls.wordle_class.__name__} doesn't take.")
+            response = wordle.play(analyzer.get_best_guess(response))
+        if instrumentation.enabled:
+            instrumentation.count('games')
+        return response
+
+    @classmethod
+    def simulate_boards(cls, answer_sets: Sequence[Sequence[str]], first_index: int = 0,
+                        dictionary=None) -> Tuple[array, array]:
+        """
+        Plays a game against every set of board words, with no guess limit.
+        :param answer_sets: The words of every board in each game.
+        :param first_index: The index of the first game, used for the first pick; each game after it counts up.
+        :param dictionary: The shared dictionary from get_dictionary. Looked up if not given.
+        :return: The guess count and first guess (as a feedback table index) of every game.
+        """
+        if dictionary is None:
+            dictionary = cls.get_dictionary()
+
+        def new_player(i):
+            analyzer = cls(first_index + i)
+            analyzer.set_dictionary(dictionary)
+            return analyzer
+
+        return WordleMultiHeadless.play_batch(answer_sets, new_player, table=cls.get_table(),
+                                              max_guesses=WordleEndless.max_guesses)
+
+    @classmethod
+    def print_board_study(cls, games: int = 1000, seed: Optional[int] = None, processes: int = 1) -> None:
+        """
+        Plays games with random board words, and prints how many guesses they took.
+        :param games: How many games to play.
+        :param seed: A seed to make the study reproducible.
+        :param processes: How many processes to split the games over.
+        """
+        board_count = cls.wordle_class.board_count
+        max_guesses = cls.wordle_class.max_guesses
+        print("=== BEGIN MULTI-BOARD ANALYSIS ===")
+        print(f"Wordle class: {cls.wordle_class.__name__} ({board_count} boards, {max_guesses} guesses)")
+        if seed is not None:
+            random.seed(f'{seed}:boards')
+        answers = cls.get_wordle_dictionary().answers
+        answer_sets = [random.sample(answers, board_count) for _ in range(games)]
+        dictionary = cls.get_dictionary()
+        # Ranked before any worker starts, so forked workers don't rank them again.
+        cls.get_openers()
+        study_start = perf_counter()
+        if processes > 1:
+            print(f"Processes: {processes}")
+            chunk_size = max(1, -(-games // (processes * 4)))
+            tasks = [(cls, answer_sets[i:i + chunk_size], i) for i in range(0, games, chunk_size)]
+            with Pool(processes, initializer=_init_study_worker, initargs=(cls, False, cls.wordle_dictionary)) as pool:
+                guess_counts = array('L')
+                for chunk_counts in pool.imap(_simulate_boards_worker, tasks):
+                    guess_counts.extend(chunk_counts)
+        else:
+            guess_counts, _ = cls.simulate_boards(answer_sets, 0, dictionary)
+        seconds = perf_counter() - study_start
+        print(f"Played {games} games in {round(seconds, 2)} seconds "
+              f"({round(games / seconds, 1) if seconds else games} games per second).")
+        print("=== END MULTI-BOARD ANALYSIS ===")
+        print('')
+
+        stats = RunningStats(1, bins=max(guess_counts) + 1)
+        for guesses in guess_counts:
+            stats.add(0, guesses)
+        low, high = stats.interval(0)
+        wins = sum(1 for guesses in guess_counts if guesses <= max_guesses)
+        print(f"{round(stats.mean(0), 3)} guesses on average (95% CI {round(low, 3)}-{round(high, 3)}), "
+              f"{round(wins / games * 100, 2)}% of games won in {max_guesses} guesses.")
+        print("Guess count distribution:")
+        for guesses, amount in enumerate(stats.distribution(0)):
+            if amount:
+                print(f"{guesses:>4}: {amount} ({round(amount / games * 100, 2)}%)")
+        print('')
+
+
+_multi_openers: Dict[str, List[int]] = {}
+
+
+def _init_study_worker(analyzer_class, instrument: bool = False,
+                       dictionary: Optional[WordleDictionary] = None) -> None:
+    """
+    Prepares a worker process for a parallel study.
+    :param analyzer_class: The WordleAnalyzer subclass being studied.
+    :param instrument: If the worker should report into its instrumentation.
+    :param dictionary: The analyzer's words, if it was given any.
+    """
+    global _worker_dictionary
+    if dictionary is not None:
+        analyzer_class.wordle_dictionary = dictionary
+    _worker_dictionary = analyzer_class.get_dictionary()
+    analyzer_class.get_table()
+    instrumentation.reset()
+    instrumentation.enabled = instrument
+
+
+def _get_profile_chunk(profiler: cProfile.Profile, labels: List[str], limit: int = 15) -> dict:
+    """
+    Sums up a cProfile run over a chunk of a study.
+    :param profiler: The profiler, once it's disabled.
+    :param labels: The units of work in the chunk.
+    :param limit: How many functions to keep.
+    :return: The chunk, with the functions taking the most time of their own.
+    """
+    stats = pstats.Stats(profiler).stats
+    hot_spots = sorted(stats.items(), key=lambda item: -item[1][2])[:limit]
+    return {
+        'first': labels[0],
+        'last': labels[-1],
+        'units': len(labels),
+        'hot_spots': [
+            {
+                'function': f"{file}:{line}({name})",
+                'calls': calls,
+                'own_seconds': round(own_time, 6),
+                'cumulative_seconds': round(cumulative_time, 6),
+            }
+            for (file, line, name), (_, calls, own_time, cumulative_time, _) in hot_spots
+        ],
+    }
+
+
+def _study_target_worker(task) -> Tuple[List[Tuple[str, str, int]], List[Tuple[History, int]], Optional[dict]]:
+    """
+    Plays every game against one target word in a worker process.
+    :param task: The analyzer class, target index, target word, game count and seed.
+    :return: The target word, start word and guess count of every game,
+             any new cached decisions, and the worker's instrumentation.
+    """
+    analyzer_class, target_index, word, game_count, seed = task
+    results = [(word, start_word, guesses) for start_word, guesses in
+               analyzer_class.study_target(word, game_count, _worker_dictionary,
+                                           seed=seed, target_index=target_index)]
+    new_decisions = analyzer_class.get_decision_cache().take_new_decisions() if analyzer_class.deterministic else []
+    return results, new_decisions, instrumentation.take() if instrumentation.enabled else None
+
+
+def _study_game_index_worker(task) -> Tuple[List[Tuple[str, str, int]], List[Tuple[History, int]], Optional[dict]]:
+    """
+    Plays one game index against every target in a worker process, with the batch engine.
+    :param task: The analyzer class, game index, target words and seed.
+    :return: The target word, start word and guess count of every game,
+             no cached decisions, and the worker's instrumentation.
+    """
+    analyzer_class, game_index, targets, seed = task
+    results = analyzer_class.study_game_index(targets, game_index, _worker_dictionary, seed=seed)
+    return results, [], instrumentation.take() if instrumentation.enabled else None
+
+
+def _simulate_boards_worker(task) -> array:
+    """
+    Plays a chunk of multi-board games in a worker process.
+    :param task: The analyzer class, the words of every board in each game, and the index of the first game.
+    :return: The guess count of every game.
+    """
+    analyzer_class, answer_sets, first_index = task
+    return analyzer_class.simulate_boards(answer_sets, first_index, _worker_dictionary)[0]
+
+
+def _study_sample_worker(task) -> List[Tuple[str, str, int]]:
+    """
+    Plays one start index against a sample of targets in a worker process, for estimate_study.
+    :param task: The analyzer class, sample number, game index, target words and seed.
+    :return: The target word, start word and guess count of every game.
+    """
+    analyzer_class, unit, game_index, targets, seed = task
+    return analyzer_class.study_game_index(targets, game_index, _worker_dictionary, seed=seed, unit=unit)
 
 
 if __name__ == '__main__':
-    WARandomAnswer.print_study()
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rank-start-words', choices=sorted(partition_scorers), metavar='METRIC',
+                        help="rank start words by a partition metric instead of studying games")
+    parser.add_argument('--lookahead', type=int, default=0, help="re-rank this many start words two steps ahead")
+    parser.add_argument('--lookahead-guesses', type=int, help="second guesses to try (default: all)")
+    parser.add_argument('--estimate', action='store_true',
+                        help="sample games until the rankings settle instead of playing every one")
+    parser.add_argument('--confidence', type=float, default=0.95, help="confidence level of an estimate")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="how many guesses apart words can be and still count as tied in an estimate")
+    parser.add_argument('--max-games', type=int, help="most games an estimate plays (default: a full study)")
+    parser.add_argument('--processes', type=int, default=1, help="processes to split the games over")
+    parser.add_argument('--seed', type=int, help="seed to make the study reproducible")
+    parser.add_argument('--boards', type=int, choices=sorted(multi_board_variants),
+                        help="play multi-board games with this many boards instead")
+    parser.add_argument('--games', type=int, default=1000, help="how many multi-board games to play")
+    args = parser.parse_args()
+    if args.boards:
+        class WAMultiBoardVariant(WAMultiBoard):
+            wordle_class = multi_board_variants[args.boards]
+
+        WAMultiBoardVariant.print_board_study(args.games, seed=args.seed, processes=args.processes)
+    elif args.rank_start_words:
+        WordleAnalyzer.print_start_word_ranking(args.rank_start_words, args.lookahead, args.lookahead_guesses)
+    elif args.estimate:
+        WARandomAnswer.print_estimate(confidence=args.confidence, tolerance=args.tolerance,
+                                      max_games=args.max_games, processes=args.processes, seed=args.seed)
+    else:
+        WARandomAnswer.print_study(processes=args.processes, seed=args.seed)
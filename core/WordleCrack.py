@@ -1,4 +1,352 @@
 """
 A class that you can use to help beat Wordle as efficiently as possible.
 Delivers the best guesses based on what words are the most helpful.
-"""
\ No newline at end of file
+"""
+from core.WordleAnalyzer import *
+from itertools import chain
+from operator import itemgetter
+from typing import Union
+import argparse
+import json
+
+inf = float('inf')
+
+
+class WordleCrack:
+    """
+    An interactive solver.
+    Tell it what you guessed and what the game said, and it suggests the next guess.
+    """
+
+    def __init__(self, analyzer_class=WAEntropy) -> None:
+        """
+        Starts solving a new game.
+        :param analyzer_class: The analyzer that picks the guesses.
+        """
+        self.analyzer = analyzer_class(0)
+        self.analyzer.set_dictionary(analyzer_class.get_dictionary())
+
+    def suggest(self) -> str:
+        """
+        :return: The best word to guess next.
+        """
+        if not self.get_candidates():
+            return ''
+        return self.analyzer.choose_guess()
+
+    def enter(self, guess: str, characters: str) -> None:
+        """
+        Tells the solver what the game said about a guess.
+        :param guess: The word that was guessed.
+        :param characters: The game's response, as made by Wordle.response_to_characters.
+        """
+        self.analyzer.narrow(guess, encode_pattern(Wordle.characters_to_response(characters)))
+
+    def get_candidates(self) -> List[str]:
+        """
+        :return: Every answer that is still possible.
+        """
+        return [self.analyzer.dictionary.answers[answer] for answer in self.analyzer.get_candidates()]
+
+
+class OptimalSolver:
+    """
+    Finds the strategy with the fewest total guesses over a set of answers, by exhaustive search.
+    Every candidate set is split up by the feedback of each guess, and each part is solved in turn:
+        - solved sets are memoized on their sorted answer indices and the guesses left
+        - guesses that split a set the same way are only tried once
+        - a guess is dropped as soon as a lower bound on its cost can't beat the best guess so far
+    Past the deadline, the rest of the search takes the most promising guess at each step,
+    and the result is only an upper bound.
+    """
+
+    def __init__(self, table: FeedbackTable = None, guesses: Sequence[int] = None,
+                 max_guesses: int = Wordle.max_guesses, deadline: Optional[float] = None,
+                 dictionary: WordleDictionary = None) -> None:
+        """
+        :param table: The feedback table. The dictionary's if not given.
+        :param guesses: The guess indices the strategy can use. Every guess if not given.
+        :param max_guesses: How many guesses a game allows.
+        :param deadline: When to stop searching exhaustively, as a time.time() value.
+        :param dictionary: The words to solve with, if no table is given. The config's word lists if not given.
+        """
+        if table is None:
+            dictionary = dictionary if dictionary is not None else get_default_dictionary()
+            table = dictionary.get_feedback_table()
+        self.dictionary = dictionary
+        self.table = table
+        self.guesses = list(guesses) if guesses is not None else list(range(len(self.table.guesses)))
+        self.max_guesses = max_guesses
+        self.deadline = deadline
+        self.exact = True
+        self.win = winning_pattern(self.table.word_length)
+        self.answer_guesses = [self.table.guess_index.get(word) for word in self.table.answers]
+        # (candidates, guesses left) -> (total guesses, best guess)
+        self.solved: Dict[Tuple[Tuple[int, ...], int], Tuple[float, int]] = {}
+        # (candidates, guesses left) -> a total the candidates are known not to beat
+        self.bounds: Dict[Tuple[Tuple[int, ...], int], float] = {}
+
+    @staticmethod
+    def lower_bound(size: int, depth: int) -> float:
+        """
+        :param size: How many candidates are left.
+        :param depth: How many guesses are left.
+        :return: The fewest total guesses that could solve them: one candidate
+                 is guessed right away, and every other one takes at least two.
+        """
+        if size == 0:
+            return 0
+        if size == 1:
+            return 1 if depth >= 1 else inf
+        return 2 * size - 1 if depth >= 2 else inf
+
+    def split(self, guess: int, candidates: Sequence[int]) -> Dict[int, Tuple[int, ...]]:
+        """
+        :return: The candidates, grouped by the pattern the guess would get.
+        """
+        row = self.table.row(guess)
+        buckets = defaultdict(list)
+        for answer in candidates:
+            buckets[row[answer]].append(answer)
+        return {pattern: tuple(bucket) for pattern, bucket in buckets.items()}
+
+    def get_splits(self, candidates: Tuple[int, ...], depth: int) -> List[Tuple[float, int, tuple]]:
+        """
+        Finds every different way a guess can split up the candidates.
+        :param candidates: The remaining answer indices.
+        :param depth: How many guesses are left, counting this one.
+        :return: (lower bound, guess, pattern of each candidate), most promising first.
+        """
+        size = len(candidates)
+        getter = itemgetter(*candidates)
+        seen = set()
+        splits = []
+        # Candidates go first, so they're kept over other guesses that split the same way.
+        candidate_guesses = [self.answer_guesses[answer] for answer in candidates
+                             if self.answer_guesses[answer] is not None]
+        for guess in chain(candidate_guesses, self.guesses):
+            signature = getter(self.table.row(guess))
+            if signature in seen:
+                continue
+            seen.add(signature)
+            sizes = Counter(signature)
+            if len(sizes) == 1 and self.win not in sizes:
+                # Tells us nothing.
+                continue
+            bound = size + sum(self.lower_bound(count, depth - 1)
+                               for pattern, count in sizes.items() if pattern != self.win)
+            splits.append((bound, guess, signature))
+        splits.sort(key=itemgetter(0, 1))
+        return splits
+
+    def solve(self, candidates: Tuple[int, ...], depth: int, limit: float = inf) -> Tuple[float, Optional[int]]:
+        """
+        Finds the best guess over a set of candidates.
+        :param candidates: The remaining answer indices, sorted.
+        :param depth: How many guesses are left, counting this one.
+        :param limit: Only look for totals below this.
+        :return: The fewest total guesses to solve every candidate, and the guess to make.
+                 If that can't be done below the limit, a total at or above it and None.
+        """
+        size = len(candidates)
+        lower = self.lower_bound(size, depth)
+        if size == 1 or lower == inf:
+            return lower, self.answer_guesses[candidates[0]] if size == 1 else None
+        key = (candidates, depth)
+        solved = self.solved.get(key)
+        if solved is not None:
+            return solved
+        lower = max(lower, self.bounds.get(key, 0))
+        if lower >= limit:
+            return lower, None
+        if size == 2:
+            self.solved[key] = 3, self.answer_guesses[candidates[0]]
+            return self.solved[key]
+
+        greedy = self.deadline is not None and time() > self.deadline
+        if greedy:
+            self.exact = False
+        best, best_guess = limit, None
+        for bound, guess, signature in self.get_splits(candidates, depth):
+            if bound >= best:
+                break
+            buckets = defaultdict(list)
+            for answer, pattern in zip(candidates, signature):
+                if pattern != self.win:
+                    buckets[pattern].append(answer)
+            cost = size
+            remaining = bound - size
+            # Big buckets first, so a bad guess is dropped early.
+            for bucket in sorted(buckets.values(), key=len, reverse=True):
+                remaining -= self.lower_bound(len(bucket), depth - 1)
+                child_cost, _ = self.solve(tuple(bucket), depth - 1, inf if greedy else best - cost - remaining)
+                cost += child_cost
+                if cost + remaining >= best:
+                    break
+            else:
+                best, best_guess = cost, guess
+                if greedy or best <= lower:
+                    break
+
+        if best_guess is None:
+            if not greedy:
+                self.bounds[key] = best
+            return best, None
+        self.solved[key] = best, best_guess
+        return best, best_guess
+
+    def get_tree(self, candidates: Tuple[int, ...], depth: int) -> dict:
+        """
+        Writes out the solved strategy for a set of candidates.
+        :param candidates: The remaining answer indices, sorted.
+        :param depth: How many guesses are left, counting this one.
+        :return: The decision tree: {'guess': word, 'children': {pattern: tree}}.
+        """
+        _, guess = self.solve(candidates, depth)
+        if guess is None:
+            raise ValueError(f"{len(candidates)} candidates can't be solved in {depth} guesses.")
+        node = {'guess': self.table.guesses[guess]}
+        children = {str(pattern): self.get_tree(bucket, depth - 1)
+                    for pattern, bucket in self.split(guess, candidates).items() if pattern != self.win}
+        if children:
+            node['children'] = children
+        return node
+
+    def solve_start(self, start_word: str, candidates: Sequence[int] = None,
+                    processes: int = 1, time_budget: Optional[float] = None) -> dict:
+        """
+        Finds the best strategy after a start word.
+        The parts the start word splits the answers into are solved in parallel.
+        :param start_word: The first guess.
+        :param candidates: The possible answer indices. Every answer if not given.
+        :param processes: How many processes to split the work over.
+        :param time_budget: Seconds to search exhaustively for, before settling for an upper bound.
+        :return: The start word, the answer count, the total and expected guess counts,
+                 if the result is exact, and the decision tree.
+        """
+        if time_budget is not None:
+            self.deadline = time() + time_budget
+        candidates = sorted(candidates) if candidates is not None else list(range(self.table.answer_count))
+        start = self.table.guess_index[start_word]
+        tasks = sorted(((pattern, bucket) for pattern, bucket in self.split(start, candidates).items()
+                        if pattern != self.win), key=lambda task: -len(task[1]))
+
+        pool = None
+        if processes > 1:
+            # Workers get the dictionary, which pickles as its words, or else the table itself.
+            words = self.dictionary if self.dictionary is not None else self.table
+            pool = Pool(processes, initializer=_init_solver_worker,
+                        initargs=(words, self.guesses, self.max_guesses, self.deadline))
+            results = pool.imap(_solve_bucket_worker, [bucket for _, bucket in tasks])
+        else:
+            results = (self.solve_bucket(bucket) for _, bucket in tasks)
+
+        total = len(candidates)
+        tree = {'guess': start_word, 'children': {}}
+        try:
+            for (pattern, _), (cost, subtree, exact) in zip(tasks, results):
+                total += cost
+                tree['children'][str(pattern)] = subtree
+                self.exact = self.exact and exact
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+        return {
+            'start': start_word,
+            'answers': len(candidates),
+            'total': total,
+            'expected': total / max(len(candidates), 1),
+            'exact': self.exact,
+            'tree': tree,
+        }
+
+    def solve_bucket(self, bucket: Tuple[int, ...]) -> Tuple[float, dict, bool]:
+        """
+        Solves what's left after the start word.
+        :param bucket: The answer indices that gave the same pattern.
+        :return: The total guesses after the start word, the decision tree, and if it's exact.
+        """
+        cost, _ = self.solve(bucket, self.max_guesses - 1)
+        return cost, self.get_tree(bucket, self.max_guesses - 1), self.exact
+
+
+def save_decision_tree(path: str, result: dict) -> None:
+    """
+    Writes a solved strategy to a JSON file, for WADecisionTree to replay.
+    :param path: Where to write it.
+    :param result: The result of OptimalSolver.solve_start.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, mode='w') as file:
+        json.dump(result, file)
+
+
+_solver: Optional[OptimalSolver] = None
+
+
+def _init_solver_worker(words: Union[WordleDictionary, FeedbackTable], guesses: List[int], max_guesses: int,
+                        deadline: Optional[float]) -> None:
+    global _solver
+    if isinstance(words, WordleDictionary):
+        _solver = OptimalSolver(guesses=guesses, max_guesses=max_guesses, deadline=deadline, dictionary=words)
+    else:
+        _solver = OptimalSolver(words, guesses=guesses, max_guesses=max_guesses, deadline=deadline)
+
+
+def _solve_bucket_worker(bucket: Tuple[int, ...]) -> Tuple[float, dict, bool]:
+    _solver.exact = True
+    return _solver.solve_bucket(bucket)
+
+
+def main_solve(args) -> None:
+    """
+    Solves a start word from the command line, and writes its decision tree.
+    """
+    solver = OptimalSolver()
+    result = solver.solve_start(args.solve, processes=args.processes, time_budget=args.time_budget)
+    print(f"{result['start']}: {result['total']} guesses over {result['answers']} answers, "
+          f"{round(result['expected'], 4)} on average ({'optimal' if result['exact'] else 'upper bound'}).")
+    save_decision_tree(args.output, result)
+    print(f"Decision tree written to {args.output}.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--solve', metavar='START_WORD', help="find the optimal strategy after this start word")
+    parser.add_argument('--processes', type=int, default=1, help="processes to split the search over")
+    parser.add_argument('--time-budget', type=float, help="seconds to search exhaustively for")
+    parser.add_argument('--output', default=WADecisionTree.tree_path, help="where to write the decision tree")
+    args = parser.parse_args()
+    if args.solve:
+        main_solve(args)
+        raise SystemExit
+
+    crack = WordleCrack()
+    print(f"Enter each guess, then what Wordle said about it.\n"
+          f"'{Wordle.char_check}' is correct, '{Wordle.char_quest}' is misplaced, "
+          f"'{Wordle.char_wrong}' is wrong. Leave the guess blank to use the suggestion.\n")
+    while True:
+        suggestion = crack.suggest()
+        if not suggestion:
+            print("No words fit those responses.")
+            break
+        print(f"Try: {suggestion} ({len(crack.get_candidates())} possible answers)")
+        guess = input('Your guess: ').strip().lower() or suggestion
+        if guess not in crack.analyzer.get_wordle_dictionary().get_guess_lookup():
+            print("Invalid guess.\n")
+            continue
+        characters = input('Response: ').strip()
+        if len(characters) != len(guess) or \
+                any(char not in (Wordle.char_check, Wordle.char_quest, Wordle.char_wrong) for char in characters):
+            print("Invalid response.\n")
+            continue
+        if characters == Wordle.char_check * len(guess):
+            print("Solved!")
+            crack.analyzer.save_decision_cache()
+            break
+        crack.enter(guess, characters)
+        candidates = crack.get_candidates()
+        if 0 < len(candidates) <= 10:
+            print(f"Possible answers: {', '.join(candidates)}")
+        print('')
@@ -0,0 +1,131 @@
+"""
+A cache of the decisions a deterministic strategy makes.
+A game's history is the list of (guess, pattern) pairs so far,
+and a deterministic strategy always picks the same next guess for it.
+Cached decisions form a tree, so replaying a game is a walk down it.
+"""
+from core.WordleFeedback import *
+from collections import OrderedDict
+from typing import List
+
+
+# A game history; every pair is (guess index, feedback pattern).
+History = Tuple[Tuple[int, int], ...]
+
+
+class DecisionCache:
+    """
+    A size-bounded map from game history to the next guess.
+    The least recently used decisions are evicted first, and histories
+    deeper than max_depth are never stored, so endless games can't grow it without limit.
+    """
+
+    header_format = '<4sI20s'
+    header_magic = b'WDTC'
+    header_size = struct.calcsize(header_format)
+
+    def __init__(self, max_entries: int = decision_cache_entries, max_depth: int = decision_cache_depth) -> None:
+        """
+        Creates an empty cache.
+        :param max_entries: How many decisions to keep at most.
+        :param max_depth: The longest history to keep decisions for.
+        """
+        self.max_entries = max_entries
+        self.max_depth = max_depth
+        self.decisions: 'OrderedDict[History, int]' = OrderedDict()
+        self.new_decisions: List[Tuple[History, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.decisions)
+
+    def get(self, history: History) -> Optional[int]:
+        """
+        :param history: The game so far.
+        :return: The cached next guess, or None.
+        """
+        guess = self.decisions.get(history)
+        if guess is not None:
+            self.decisions.move_to_end(history)
+        return guess
+
+    def put(self, history: History, guess: int, record: bool = True) -> None:
+        """
+        Caches a decision.
+        :param history: The game so far.
+        :param guess: The next guess.
+        :param record: If the decision should be kept for take_new_decisions.
+        """
+        if len(history) > self.max_depth:
+            return
+        self.decisions[history] = guess
+        self.decisions.move_to_end(history)
+        if record:
+            self.new_decisions.append((history, guess))
+        while len(self.decisions) > self.max_entries:
+            self.decisions.popitem(last=False)
+
+    def take_new_decisions(self) -> List[Tuple[History, int]]:
+        """
+        Hands over the decisions made since the last call,
+        so a worker process can send them back to be merged.
+        :return: The new decisions.
+        """
+        new_decisions, self.new_decisions = self.new_decisions, []
+        return new_decisions
+
+    def merge(self, decisions: Iterable[Tuple[History, int]]) -> None:
+        """
+        Caches decisions made somewhere else.
+        :param decisions: The decisions to add.
+        """
+        for history, guess in decisions:
+            self.put(history, guess, record=False)
+
+    """
+    Persistence
+    """
+
+    def save(self, path: str, digest: bytes) -> None:
+        """
+        Writes the cache to disk.
+        Each decision is its depth (1 byte), its history (2 + 2 bytes a pair), and its guess (2 bytes).
+        :param path: Where to write it.
+        :param digest: A fingerprint of the feedback table the decisions were made with.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, mode='wb') as file:
+            file.write(struct.pack(self.header_format, self.header_magic, len(self.decisions), digest))
+            for history, guess in self.decisions.items():
+                record = struct.pack('<B', len(history))
+                for pair in history:
+                    record += struct.pack('<HH', *pair)
+                file.write(record + struct.pack('<H', guess))
+        os.replace(temp_path, path)
+
+    def load(self, path: str, digest: bytes) -> bool:
+        """
+        Adds the decisions saved on disk to the cache.
+        :param path: Where the cache was saved.
+        :param digest: A fingerprint of the feedback table in use.
+        :return: If anything was loaded.
+        """
+        if not os.path.exists(path):
+            return False
+        with open(path, mode='rb') as file:
+            data = file.read()
+        if len(data) < self.header_size:
+            return False
+        magic, count, saved_digest = struct.unpack_from(self.header_format, data)
+        if magic != self.header_magic or saved_digest != digest:
+            return False
+        offset = self.header_size
+        for _ in range(count):
+            (depth,) = struct.unpack_from('<B', data, offset)
+            offset += 1
+            pairs = struct.unpack_from('<' + 'HH' * depth, data, offset)
+            offset += 4 * depth
+            (guess,) = struct.unpack_from('<H', data, offset)
+            offset += 2
+            self.put(tuple(zip(pairs[::2], pairs[1::2])), guess, record=False)
+        return True
@@ -0,0 +1,141 @@
+"""
+Word lists as objects, so games and analyzers can play with any word length or alphabet.
+Every dictionary builds its own lookups, indexes and feedback table the first time
+they're needed, so several dictionaries can be used side by side in one process.
+"""
+from core.WordleIndex import *
+from itertools import chain
+import random
+
+default_dictionary_name = 'default'
+
+
+class WordleDictionary:
+    """
+    The words of one Wordle variant.
+    """
+
+    # The most letters an alphabet can have; WordleHeadless keeps letters in 64-bit masks.
+    max_alphabet = 64
+
+    # The most words a list can have; study logs and decision caches keep word indices as 16-bit numbers.
+    max_words = 0xFFFF
+
+    def __init__(self, answers: Sequence[str], guesses: Sequence[str] = None, name: str = 'custom') -> None:
+        """
+        :param answers: The words that can be answers.
+        :param guesses: Every word that can be guessed. Just the answers if not given.
+        :param name: What the dictionary's files in the cache are called.
+        """
+        self.name = name
+        self.answers = list(answers)
+        self.guesses = list(guesses) if guesses is not None else list(self.answers)
+        if not self.answers:
+            raise ValueError(f"The dictionary '{name}' has no answers.")
+        if max(len(self.answers), len(self.guesses)) > self.max_words:
+            raise ValueError(f"The dictionary '{name}' has more than {self.max_words} words in a list.")
+        self.word_length = len(self.answers[0])
+        if any(len(word) != self.word_length for word in chain(self.answers, self.guesses)):
+            raise ValueError(f"The words of the dictionary '{name}' aren't all {self.word_length} letters long.")
+        get_pattern_size(self.word_length)
+        self.alphabet = ''.join(sorted(set(''.join(self.guesses))))
+        if len(self.alphabet) > self.max_alphabet:
+            raise ValueError(f"The dictionary '{name}' has more than {self.max_alphabet} letters.")
+        self.__answer_lookup: Optional[WordLookup] = None
+        self.__guess_lookup: Optional[WordLookup] = None
+        self.__answer_index: Optional[WordIndex] = None
+        self.__guess_index: Optional[WordIndex] = None
+        self.__table: Optional[FeedbackTable] = None
+
+    @classmethod
+    def from_files(cls, answer_path: str, guess_path: str = None, name: str = None) -> 'WordleDictionary':
+        """
+        Loads a dictionary from text word lists, one word per line.
+        :param answer_path: The answers, relative to the repository or absolute.
+        :param guess_path: The words that can be guessed besides the answers.
+        :param name: What the dictionary's files in the cache are called. Named after the answer list if not given.
+        :return: The dictionary.
+        """
+        answers = [word for word in load_word_list(answer_path) if word]
+        guesses = [word for word in load_word_list(guess_path) if word] + answers if guess_path else None
+        return cls(answers, guesses, name=name or os.path.splitext(os.path.basename(answer_path))[0])
+
+    def __getstate__(self) -> dict:
+        # Worker processes get the words, and load everything else themselves.
+        return {'name': self.name, 'answers': self.answers, 'guesses': self.guesses}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state['answers'], state['guesses'], state['name'])
+
+    def __repr__(self) -> str:
+        return f"WordleDictionary('{self.name}', {len(self.answers)} answers, " \
+               f"{len(self.guesses)} guesses, {self.word_length} letters)"
+
+    def random_answer(self) -> str:
+        return random.choice(self.answers)
+
+    def get_cache_path(self, kind: str) -> str:
+        """
+        :param kind: What the file holds, such as 'feedback'.
+        :return: Where this dictionary keeps it.
+        """
+        if self.name == default_dictionary_name:
+            return get_path(os.path.join(cache_directory, f'{kind}.bin'))
+        return get_path(os.path.join(cache_directory, 'dictionaries', f'{self.name}-{kind}.bin'))
+
+    def get_start_words_path(self) -> str:
+        """
+        :return: Where studies with this dictionary write their ranked start words.
+        """
+        if self.name == default_dictionary_name:
+            return get_path('wordlist/top_initial_word_list.txt')
+        return os.path.splitext(self.get_cache_path('start-words'))[0] + '.txt'
+
+    """
+    Indexes
+    """
+
+    def get_answer_lookup(self) -> WordLookup:
+        if self.__answer_lookup is None:
+            self.__answer_lookup = WordLookup(self.answers)
+        return self.__answer_lookup
+
+    def get_guess_lookup(self) -> WordLookup:
+        if self.__guess_lookup is None:
+            self.__guess_lookup = WordLookup(self.guesses)
+        return self.__guess_lookup
+
+    def get_answer_index(self) -> WordIndex:
+        if self.__answer_index is None:
+            self.__answer_index = WordIndex(self.answers)
+        return self.__answer_index
+
+    def get_guess_index(self) -> WordIndex:
+        if self.__guess_index is None:
+            self.__guess_index = WordIndex(self.guesses)
+        return self.__guess_index
+
+    def get_feedback_table(self) -> FeedbackTable:
+        """
+        :return: This dictionary's feedback table, memory-mapped from the cache and built if needed.
+        """
+        if self.__table is None:
+            if self.name == default_dictionary_name:
+                self.__table = get_feedback_table()
+            else:
+                self.__table = FeedbackTable.load_or_build(self.get_cache_path('feedback'),
+                                                           self.guesses, self.answers)
+        return self.__table
+
+
+_default_dictionary: Optional[WordleDictionary] = None
+
+
+def get_default_dictionary() -> WordleDictionary:
+    """
+    :return: The dictionary of the word lists in the config.
+    """
+    global _default_dictionary
+    if _default_dictionary is None:
+        _default_dictionary = WordleDictionary(get_answer_list(), get_guess_list(), name=default_dictionary_name)
+    return _default_dictionary
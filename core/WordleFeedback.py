@@ -0,0 +1,413 @@
+"""
+A precomputed table of Wordle feedback.
+Every guess is scored against every answer once, and stored as a base-3 pattern:
+    - each position is a digit (0 = wrong, 1 = misplaced, 2 = correct)
+    - position i is worth 3 ** i, so an all-correct 5-letter word is 242
+The table is saved to disk and memory-mapped on later runs,
+so simulations only have to do lookups.
+"""
+from core.WordleGlobals import *
+from collections import Counter, defaultdict
+from functools import lru_cache
+from hashlib import sha1
+from math import log2
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple
+import mmap
+import os
+import struct
+
+
+# Bumped whenever the scoring rules change, so old tables on disk are rebuilt.
+feedback_version = 2
+
+pattern_digit_states = (WordleState.Wrong, WordleState.Misplaced, WordleState.Correct)
+pattern_state_digits = {state: digit for digit, state in enumerate(pattern_digit_states)}
+
+
+@lru_cache(maxsize=None)
+def get_letter_counts(word: str) -> Dict[str, int]:
+    """
+    :param word: The word to count.
+    :return: How many times each letter is in the word. Cached, so don't modify it.
+    """
+    counts = {}
+    for char in word:
+        counts[char] = counts.get(char, 0) + 1
+    return counts
+
+
+def score_word(guess: str, answer: str) -> int:
+    """
+    Scores a guess against an answer without any table.
+    A letter is only Misplaced while the answer has copies of it left over,
+    after the Correct copies and the Misplaced copies before it are taken out.
+    :param guess: The word that was guessed.
+    :param answer: The word being guessed.
+    :return: The feedback pattern.
+    """
+    counts = get_letter_counts(answer)
+    pattern = 0
+    power = 1
+    for i, char in enumerate(guess):
+        if char == answer[i]:
+            pattern += 2 * power
+        elif char in counts:
+            left = counts[char]
+            for j, other in enumerate(guess):
+                if other == char and (j < i or answer[j] == char):
+                    left -= 1
+            if left > 0:
+                pattern += power
+        power *= 3
+    return pattern
+
+
+@lru_cache(maxsize=None)
+def decode_pattern(pattern: int, length: int = 5) -> Tuple[WordleState, ...]:
+    """
+    Turns a feedback pattern back into character states.
+    :param pattern: The pattern to decode.
+    :param length: The length of the word it was scored from.
+    :return: A WordleState for every position.
+    """
+    states = []
+    for _ in range(length):
+        states.append(pattern_digit_states[pattern % 3])
+        pattern //= 3
+    return tuple(states)
+
+
+def encode_pattern(word_response: Sequence[WordleState]) -> int:
+    """
+    Turns character states into a feedback pattern.
+    :param word_response: A WordleState for every position.
+    :return: The encoded pattern.
+    """
+    pattern = 0
+    power = 1
+    for state in word_response:
+        pattern += pattern_state_digits[state] * power
+        power *= 3
+    return pattern
+
+
+def winning_pattern(length: int = 5) -> int:
+    """
+    :param length: The length of the word.
+    :return: The pattern of a fully correct guess.
+    """
+    return 3 ** length - 1
+
+
+def partition_entropy(partition: Counter) -> float:
+    """
+    :param partition: How many candidates fall under each pattern.
+    :return: The information a guess gives, in bits.
+    """
+    total = sum(partition.values())
+    return log2(total) - sum(size * log2(size) for size in partition.values()) / total
+
+
+def partition_expected_size(partition: Counter) -> float:
+    """
+    :param partition: How many candidates fall under each pattern.
+    :return: How many candidates are left after the guess, on average.
+    """
+    return sum(size * size for size in partition.values()) / sum(partition.values())
+
+
+def partition_worst_bucket(partition: Counter) -> int:
+    """
+    :param partition: How many candidates fall under each pattern.
+    :return: How many candidates are left after the guess, at worst.
+    """
+    return max(partition.values())
+
+
+# Every way of scoring a partition; lower is better.
+partition_scorers: Dict[str, Callable[[Counter], float]] = {
+    'entropy': lambda partition: -partition_entropy(partition),
+    'expected_size': partition_expected_size,
+    'worst_bucket': partition_worst_bucket,
+}
+
+
+def get_pattern_size(word_length: int) -> int:
+    """
+    :param word_length: The length of the words.
+    :return: How many bytes a pattern takes: 1 up to 5 letters, 2 up to 10.
+    """
+    if winning_pattern(word_length) <= 0xFF:
+        return 1
+    if winning_pattern(word_length) <= 0xFFFF:
+        return 2
+    raise ValueError(f"Words of {word_length} letters are too long for a feedback table.")
+
+
+class FeedbackTable:
+    """
+    A guess x answer grid of feedback patterns, one byte per pair
+    (two bytes for words of more than five letters).
+    Row g holds the pattern of guess g against every answer.
+    """
+
+    header_format = '<4sIIII20s'
+    header_magic = b'WFBT'
+    header_size = struct.calcsize(header_format)
+
+    def __init__(self, guesses: Sequence[str], answers: Sequence[str], data=None) -> None:
+        """
+        Creates a table, building the patterns unless they are given.
+        :param guesses: The words that can be guessed.
+        :param answers: The words that can be answers.
+        :param data: Already built patterns (a buffer of len(guesses) * len(answers) patterns).
+        """
+        self.guesses = list(guesses)
+        self.answers = list(answers)
+        self.guess_index: Dict[str, int] = {word: i for i, word in enumerate(self.guesses)}
+        self.answer_index: Dict[str, int] = {word: i for i, word in enumerate(self.answers)}
+        self.word_length = len(self.answers[0]) if self.answers else 5
+        self.answer_count = len(self.answers)
+        self.pattern_size = get_pattern_size(self.word_length)
+        self.alphabet = ''.join(sorted(set(''.join(self.guesses))))
+        self.letter_index: Dict[str, int] = {char: i for i, char in enumerate(self.alphabet)}
+        self.data = data if data is not None else self.build(self.guesses, self.answers)
+        self.patterns = memoryview(self.data).cast('B' if self.pattern_size == 1 else 'H')
+        self.__fingerprint: Optional[bytes] = None
+
+    """
+    Building
+    """
+
+    @staticmethod
+    def build(guesses: Sequence[str], answers: Sequence[str]) -> bytearray:
+        """
+        Scores every guess against every answer.
+        Each answer is a byte (or two) inside of a big integer, so a whole row is
+        built with a handful of integer operations instead of a loop per answer.
+        :param guesses: The words that can be guessed.
+        :param answers: The words that can be answers.
+        :return: The row-major pattern buffer.
+        """
+        answer_count = len(answers)
+        length = len(answers[0]) if answers else 0
+        size = get_pattern_size(length or 5)
+
+        # Lane masks; every answer's lane is 1 if the answer matches and 0 otherwise.
+        ones = int.from_bytes((b'\x01' + bytes(size - 1)) * answer_count, 'little')
+        position_masks = [defaultdict(int) for _ in range(length)]
+        # count_masks[char][k] holds the answers with at least k copies of char.
+        count_masks = defaultdict(lambda: [0] * (length + 1))
+        for j, answer in enumerate(answers):
+            bit = 1 << (8 * size * j)
+            for i, char in enumerate(answer):
+                position_masks[i][char] |= bit
+            for char, count in get_letter_counts(answer).items():
+                masks = count_masks[char]
+                for k in range(1, count + 1):
+                    masks[k] |= bit
+
+        data = bytearray()
+        for guess in guesses:
+            letter_positions = defaultdict(list)
+            for i, char in enumerate(guess):
+                letter_positions[char].append(i)
+
+            row = 0
+            for char, positions in letter_positions.items():
+                at_least = count_masks.get(char)
+                if at_least is None:
+                    continue
+                if len(positions) == 1:
+                    # correct = 1 + 1, misplaced = 0 + 1, wrong = 0 + 0
+                    i = positions[0]
+                    row += (position_masks[i].get(char, 0) + at_least[1]) * 3 ** i
+                    continue
+                # A repeated letter: split the answers up by which of its positions are correct.
+                # The rest are misplaced, left to right, while the answer has copies left.
+                greens = [position_masks[i].get(char, 0) for i in positions]
+                for subset in range(1 << len(positions)):
+                    matched = ones
+                    for k, green in enumerate(greens):
+                        matched &= green if subset >> k & 1 else ones ^ green
+                    if not matched:
+                        continue
+                    used = bin(subset).count('1')
+                    for k, i in enumerate(positions):
+                        if subset >> k & 1:
+                            row += 2 * 3 ** i * matched
+                        else:
+                            used += 1
+                            row += 3 ** i * (matched & at_least[used])
+            data += row.to_bytes(answer_count * size, 'little')
+        return data
+
+    """
+    Lookups
+    """
+
+    def pattern(self, guess: int, answer: int) -> int:
+        """
+        :param guess: The index of the guess.
+        :param answer: The index of the answer.
+        :return: The feedback pattern.
+        """
+        return self.patterns[guess * self.answer_count + answer]
+
+    def row(self, guess: int) -> memoryview:
+        """
+        :param guess: The index of the guess.
+        :return: The patterns of that guess against every answer.
+        """
+        start = guess * self.answer_count
+        return self.patterns[start:start + self.answer_count]
+
+    def score(self, guess: str, answer: str) -> int:
+        """
+        Scores two words, using the table when both of them are in it.
+        :param guess: The word that was guessed.
+        :param answer: The word being guessed.
+        :return: The feedback pattern.
+        """
+        guess_id = self.guess_index.get(guess)
+        answer_id = self.answer_index.get(answer)
+        if guess_id is None or answer_id is None:
+            return score_word(guess, answer)
+        return self.patterns[guess_id * self.answer_count + answer_id]
+
+    def partition(self, guess: int, candidates: Sequence[int] = None) -> Counter:
+        """
+        Splits candidates up by the feedback a guess would get.
+        :param guess: The index of the guess.
+        :param candidates: Answer indices. Every answer if not given.
+        :return: How many candidates fall under each pattern.
+        """
+        return next(self.partitions(candidates, (guess,)))[1]
+
+    def partitions(self, candidates: Sequence[int] = None,
+                   guesses: Iterable[int] = None) -> Iterator[Tuple[int, Counter]]:
+        """
+        Splits candidates up by the feedback of many guesses.
+        The counting is done by Counter and itemgetter, so each guess
+        costs a couple of C calls rather than a Python loop over the candidates.
+        :param candidates: Answer indices. Every answer if not given.
+        :param guesses: Guess indices. Every guess if not given.
+        :return: Every guess and its partition.
+        """
+        if guesses is None:
+            guesses = range(len(self.guesses))
+        if candidates is None or len(candidates) == self.answer_count:
+            for guess in guesses:
+                yield guess, Counter(self.row(guess))
+        elif len(candidates) == 1:
+            (answer,) = candidates
+            for guess in guesses:
+                yield guess, Counter((self.pattern(guess, answer),))
+        else:
+            get = itemgetter(*candidates)
+            for guess in guesses:
+                yield guess, Counter(get(self.row(guess)))
+
+    """
+    Persistence
+    """
+
+    @staticmethod
+    def digest(guesses: Sequence[str], answers: Sequence[str]) -> bytes:
+        """
+        :return: A fingerprint of the word lists and scoring rules.
+        """
+        fingerprint = sha1(str(feedback_version).encode())
+        fingerprint.update('\n'.join(guesses).encode())
+        fingerprint.update(b'\0')
+        fingerprint.update('\n'.join(answers).encode())
+        return fingerprint.digest()
+
+    def __getstate__(self) -> dict:
+        # Memory-mapped patterns can't be pickled, so they're copied out.
+        return {'guesses': self.guesses, 'answers': self.answers, 'data': bytes(self.data)}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state['guesses'], state['answers'], state['data'])
+
+    def get_fingerprint(self) -> bytes:
+        """
+        :return: The digest of this table's word lists, worked out once.
+        """
+        if self.__fingerprint is None:
+            self.__fingerprint = self.digest(self.guesses, self.answers)
+        return self.__fingerprint
+
+    def save(self, path: str) -> None:
+        """
+        Writes the table to disk.
+        :param path: Where to write it.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        header = struct.pack(self.header_format, self.header_magic, feedback_version,
+                             len(self.guesses), len(self.answers), self.word_length,
+                             self.get_fingerprint())
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, mode='wb') as file:
+            file.write(header)
+            file.write(self.data)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str, guesses: Sequence[str], answers: Sequence[str]) -> Optional['FeedbackTable']:
+        """
+        Memory-maps a table from disk.
+        :param path: Where the table was saved.
+        :param guesses: The words that can be guessed.
+        :param answers: The words that can be answers.
+        :return: The table, or None if it is missing or was built from other words.
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, mode='rb') as file:
+            header = file.read(cls.header_size)
+            if len(header) < cls.header_size:
+                return None
+            magic, version, guess_count, answer_count, word_length, digest = struct.unpack(cls.header_format, header)
+            if magic != cls.header_magic or version != feedback_version \
+                    or guess_count != len(guesses) or answer_count != len(answers) \
+                    or digest != cls.digest(guesses, answers):
+                return None
+            size = get_pattern_size(word_length)
+            if os.fstat(file.fileno()).st_size != cls.header_size + guess_count * answer_count * size:
+                return None
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        data = memoryview(mapped)[cls.header_size:]
+        return cls(guesses, answers, data=data)
+
+    @classmethod
+    def load_or_build(cls, path: str, guesses: Sequence[str], answers: Sequence[str]) -> 'FeedbackTable':
+        """
+        Memory-maps a table from disk, building and saving it first if needed.
+        :param path: Where the table is saved.
+        :param guesses: The words that can be guessed.
+        :param answers: The words that can be answers.
+        :return: The table.
+        """
+        table = cls.load(path, guesses, answers)
+        if table is None:
+            cls(guesses, answers).save(path)
+            table = cls.load(path, guesses, answers)
+        return table
+
+
+_feedback_table: Optional[FeedbackTable] = None
+
+
+def get_feedback_table() -> FeedbackTable:
+    """
+    The shared table for the configured word lists.
+    Loaded on first use, then kept for the rest of the process.
+    :return: The table.
+    """
+    global _feedback_table
+    if _feedback_table is None:
+        path = get_path(os.path.join(cache_directory, 'feedback.bin'))
+        _feedback_table = FeedbackTable.load_or_build(path, get_guess_list(), get_answer_list())
+    return _feedback_table
@@ -0,0 +1,229 @@
+"""
+Immutable snapshots of what a Wordle game has shown about its word.
+Taking a guess makes a new snapshot instead of changing the old one,
+so lookahead can branch off any snapshot without copying a game,
+and snapshots can key a memo.
+"""
+from core.WordleDecisions import *
+from core.WordleIndex import bit_indices
+
+
+def fits_hints(table: FeedbackTable, word: str, correct: Sequence[int], min_counts: Sequence[int]) -> bool:
+    """
+    Checks if a guess uses every hint so far, like hard mode asks.
+    :param table: The feedback table the game is scored with.
+    :param word: The guess.
+    :param correct: The letter at each position, or -1.
+    :param min_counts: The fewest copies of each letter the word has.
+    :return: If green letters stay in place and every shown letter is used as often as it was shown.
+    """
+    letter_index = table.letter_index
+    for position, letter in enumerate(correct):
+        if letter >= 0 and letter_index.get(word[position]) != letter:
+            return False
+    counts = get_letter_counts(word)
+    alphabet = table.alphabet
+    return all(counts.get(alphabet[letter], 0) >= count for letter, count in enumerate(min_counts) if count)
+
+
+class GameState:
+    """
+    What a game knows, in compact immutable fields:
+        - history: every guess so far, packed as guess index * 3 ** word length + pattern
+        - correct: the letter at each position, or -1
+        - misplaced: a bitmask per position of letters known not to be there
+        - wrong: a bitmask of letters not in the word
+        - min_counts / max_counts: the fewest and most copies of each letter the word can have, a byte per letter
+    Letters are numbered by their place in the table's alphabet, like in WordleHeadless.
+    A new snapshot shares every field its guess didn't change with the snapshot before it.
+    Snapshots are equal when they know the same things after the same number of guesses,
+    whatever order the guesses came in, so equal snapshots can have different histories.
+    Setting a field after a snapshot is made raises an AttributeError.
+    """
+
+    __slots__ = 'history', 'correct', 'misplaced', 'wrong', 'min_counts', 'max_counts', '__key'
+
+    def __init__(self, history: Tuple[int, ...], correct: Tuple[int, ...], misplaced: Tuple[int, ...],
+                 wrong: int, min_counts: bytes, max_counts: bytes) -> None:
+        set_field = object.__setattr__
+        set_field(self, 'history', history)
+        set_field(self, 'correct', correct)
+        set_field(self, 'misplaced', misplaced)
+        set_field(self, 'wrong', wrong)
+        set_field(self, 'min_counts', min_counts)
+        set_field(self, 'max_counts', max_counts)
+        set_field(self, '_GameState__key', (len(history), correct, misplaced, wrong, min_counts, max_counts))
+
+    @classmethod
+    def start(cls, table: FeedbackTable) -> 'GameState':
+        """
+        :param table: The feedback table the game is scored with.
+        :return: The snapshot of a game with no guesses yet.
+        """
+        length = table.word_length
+        return cls((), (-1,) * length, (0,) * length, 0,
+                   bytes(len(table.alphabet)), bytes([length]) * len(table.alphabet))
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"GameState is immutable; take a guess with after() instead of setting '{name}'.")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"GameState is immutable; '{name}' can't be deleted.")
+
+    def __reduce__(self) -> tuple:
+        # Rebuilt through __init__, since unpickling would otherwise set the fields one by one.
+        return GameState, (self.history, self.correct, self.misplaced, self.wrong, self.min_counts, self.max_counts)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, GameState) and self.__key == other.__key
+
+    def __hash__(self) -> int:
+        return hash(self.__key)
+
+    def __repr__(self) -> str:
+        return f"GameState({self.get_guesses()} guesses, {len(self.correct) - self.correct.count(-1)} correct)"
+
+    """
+    Guessing
+    """
+
+    def after(self, table: FeedbackTable, guess: int, pattern: int) -> 'GameState':
+        """
+        Takes in a guess, leaving this snapshot as it is.
+        :param table: The feedback table the game is scored with.
+        :param guess: The index of the guessed word.
+        :param pattern: Its feedback pattern.
+        :return: The snapshot after the guess.
+        """
+        word = table.guesses[guess]
+        length = len(self.correct)
+        correct = list(self.correct)
+        misplaced = list(self.misplaced)
+        # Every letter shown this guess, the letters that also came back wrong, and how many copies were shown.
+        shown = 0
+        wrong = 0
+        copies: Dict[int, int] = {}
+        remaining = pattern
+        for i in range(length):
+            digit = remaining % 3
+            remaining //= 3
+            letter = table.letter_index[word[i]]
+            if digit == 2:
+                correct[i] = letter
+            else:
+                misplaced[i] |= 1 << letter
+            if digit:
+                shown |= 1 << letter
+                copies[letter] = copies.get(letter, 0) + 1
+            else:
+                wrong |= 1 << letter
+                copies.setdefault(letter, 0)
+
+        min_counts = self.min_counts
+        raised = [(letter, count) for letter, count in copies.items() if count > min_counts[letter]]
+        if raised:
+            min_counts = bytearray(min_counts)
+            for letter, count in raised:
+                min_counts[letter] = count
+            min_counts = bytes(min_counts)
+        max_counts = self.max_counts
+        exact = [(letter, count) for letter, count in copies.items()
+                 if wrong >> letter & 1 and count != max_counts[letter]]
+        if exact:
+            max_counts = bytearray(max_counts)
+            for letter, count in exact:
+                max_counts[letter] = count
+            max_counts = bytes(max_counts)
+
+        correct = tuple(correct)
+        misplaced = tuple(misplaced)
+        return GameState(self.history + (guess * 3 ** length + pattern,),
+                         self.correct if correct == self.correct else correct,
+                         self.misplaced if misplaced == self.misplaced else misplaced,
+                         self.wrong | (wrong & ~shown), min_counts, max_counts)
+
+    def is_won(self) -> bool:
+        return bool(self.history) and self.history[-1] % 3 ** len(self.correct) == winning_pattern(len(self.correct))
+
+    def get_guesses(self) -> int:
+        return len(self.history)
+
+    def get_history(self) -> History:
+        """
+        :return: Every (guess index, pattern) so far, like the decision cache keys games.
+        """
+        pattern_count = 3 ** len(self.correct)
+        return tuple(divmod(step, pattern_count) for step in self.history)
+
+    def get_words(self, table: FeedbackTable) -> List[str]:
+        """
+        :return: Every word guessed so far.
+        """
+        return [table.guesses[guess] for guess, _ in self.get_history()]
+
+    def fits_hints(self, table: FeedbackTable, word: str) -> bool:
+        """
+        :return: If a guess uses every hint so far, like hard mode asks.
+        """
+        return fits_hints(table, word, self.correct, self.min_counts)
+
+    def get_candidates(self, table: FeedbackTable, candidates: Sequence[int] = None) -> List[int]:
+        """
+        Finds the answers that fit every guess so far.
+        :param table: The feedback table the game is scored with.
+        :param candidates: The answer indices to pick from. Every answer if not given.
+        :return: The answer indices that would have given the same feedback.
+        """
+        candidates = list(range(table.answer_count)) if candidates is None else list(candidates)
+        for guess, pattern in self.get_history():
+            row = table.row(guess)
+            candidates = [answer for answer in candidates if row[answer] == pattern]
+        return candidates
+
+    """
+    Characters
+    """
+
+    def get_correct_characters(self, alphabet: str) -> Dict[str, List[int]]:
+        """
+        :param alphabet: The table's alphabet.
+        :return: Every letter known to be in the word, and the positions it's at.
+        """
+        characters: Dict[str, List[int]] = {}
+        for position, letter in enumerate(self.correct):
+            if letter >= 0:
+                characters.setdefault(alphabet[letter], []).append(position)
+        return characters
+
+    def get_misplaced_characters(self, alphabet: str) -> Dict[str, List[int]]:
+        """
+        :param alphabet: The table's alphabet.
+        :return: Every letter known to be in the word, and the positions it isn't at.
+        """
+        characters: Dict[str, List[int]] = {}
+        for position, letters in enumerate(self.misplaced):
+            for letter in bit_indices(letters & ~self.wrong):
+                characters.setdefault(alphabet[letter], []).append(position)
+        return characters
+
+    def get_wrong_characters(self, alphabet: str) -> List[str]:
+        """
+        :param alphabet: The table's alphabet.
+        :return: Every letter known not to be in the word.
+        """
+        return [alphabet[letter] for letter in bit_indices(self.wrong)]
+
+    def get_min_letter_counts(self, alphabet: str) -> Dict[str, int]:
+        """
+        :param alphabet: The table's alphabet.
+        :return: The fewest copies of each letter the word has, for every letter it's known to have.
+        """
+        return {alphabet[letter]: count for letter, count in enumerate(self.min_counts) if count}
+
+    def get_max_letter_counts(self, alphabet: str) -> Dict[str, int]:
+        """
+        :param alphabet: The table's alphabet.
+        :return: How many copies of each letter the word has, for every letter that's known exactly.
+        """
+        length = len(self.correct)
+        return {alphabet[letter]: count for letter, count in enumerate(self.max_counts) if count < length}
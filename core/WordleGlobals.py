@@ -2,17 +2,190 @@
 Global definitions for the Wordle class.
 """
 
-from dataclasses import dataclass
+from bisect import bisect_left
+from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
 from config import *
+import mmap
+import os
+import struct
 
 
-with open('../' + answer_filepath) as answer_file:
-    answer_list = [line.strip('\n') for line in answer_file]
+# Config paths are relative to the repository, wherever the scripts are run from.
+root_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-with open('../' + guess_filepath) as guess_file:
-    guess_list = [line.strip('\n') for line in guess_file] + answer_list
+
+def get_path(path: str) -> str:
+    """
+    :param path: A path from the config, relative to the repository.
+    :return: The absolute path.
+    """
+    return os.path.join(root_directory, path)
+
+
+"""
+Word lists
+"""
+
+# Binary word lists are a header, then every word as a fixed-width record.
+word_list_header = struct.Struct('<4sII')
+word_list_magic = b'WLST'
+
+
+def get_binary_path(text_path: str) -> str:
+    """
+    :param text_path: A text word list from the config.
+    :return: Where its binary form is kept.
+    """
+    name = os.path.splitext(os.path.basename(text_path))[0]
+    return get_path(os.path.join(cache_directory, 'wordlists', name + '.bin'))
+
+
+def read_binary_word_list(path: str) -> Optional[List[str]]:
+    """
+    Reads a binary word list by memory-mapping it.
+    :param path: Where the list is.
+    :return: The words, or None if the file isn't a word list.
+    """
+    with open(path, mode='rb') as file:
+        if os.fstat(file.fileno()).st_size < word_list_header.size:
+            return None
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, word_length, count = word_list_header.unpack_from(data)
+            end = word_list_header.size + word_length * count
+            if magic != word_list_magic or len(data) != end:
+                return None
+            text = data[word_list_header.size:end].decode('ascii')
+    return [text[i:i + word_length] for i in range(0, len(text), word_length)]
+
+
+def write_binary_word_list(path: str, words: List[str]) -> bool:
+    """
+    Writes a binary word list.
+    :param path: Where to write it.
+    :param words: The words; they all have to be the same length.
+    :return: If the list could be written.
+    """
+    word_length = len(words[0]) if words else 0
+    if any(len(word) != word_length for word in words) or not all(word.isascii() for word in words):
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, mode='wb') as file:
+        file.write(word_list_header.pack(word_list_magic, word_length, len(words)))
+        file.write(''.join(words).encode('ascii'))
+    os.replace(temp_path, path)
+    return True
+
+
+def load_word_list(text_path: str) -> List[str]:
+    """
+    Loads a word list from the config.
+    The binary form is used when it's newer than the text file, and made from it otherwise.
+    :param text_path: The text word list, relative to the repository.
+    :return: The words.
+    """
+    full_path = get_path(text_path)
+    binary_path = get_binary_path(text_path)
+    try:
+        if os.path.getmtime(binary_path) >= os.path.getmtime(full_path):
+            words = read_binary_word_list(binary_path)
+            if words is not None:
+                return words
+    except OSError:
+        pass
+    with open(full_path, encoding='utf-8') as file:
+        words = [line.strip('\n') for line in file]
+    try:
+        write_binary_word_list(binary_path, words)
+    except OSError:
+        pass
+    return words
+
+
+_word_lists: Dict[str, list] = {}
+
+
+def get_answer_list() -> List[str]:
+    """
+    :return: Every word that can be an answer. Loaded on first use; don't modify it.
+    """
+    if 'answers' not in _word_lists:
+        _word_lists['answers'] = load_word_list(answer_filepath)
+    return _word_lists['answers']
+
+
+def get_guess_list() -> List[str]:
+    """
+    :return: Every word that can be guessed, answers last. Loaded on first use; don't modify it.
+    """
+    if 'guesses' not in _word_lists:
+        _word_lists['guesses'] = load_word_list(guess_filepath) + get_answer_list()
+    return _word_lists['guesses']
+
+
+class WordLookup:
+    """
+    A set of words for fast validation.
+    Membership is hashed, and a sorted copy answers prefix queries.
+    """
+
+    __slots__ = 'words', 'sorted_words'
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self.words = frozenset(words)
+        self.sorted_words = sorted(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.words
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def with_prefix(self, prefix: str, limit: int = None) -> List[str]:
+        """
+        Finds the words starting with a prefix.
+        :param prefix: The prefix to search for.
+        :param limit: The most words to return.
+        :return: The matching words, in alphabetical order.
+        """
+        found = []
+        for i in range(bisect_left(self.sorted_words, prefix), len(self.sorted_words)):
+            word = self.sorted_words[i]
+            if not word.startswith(prefix) or (limit is not None and len(found) >= limit):
+                break
+            found.append(word)
+        return found
+
+    def has_prefix(self, prefix: str) -> bool:
+        """
+        :param prefix: The prefix to search for.
+        :return: If any word starts with the prefix.
+        """
+        i = bisect_left(self.sorted_words, prefix)
+        return i < len(self.sorted_words) and self.sorted_words[i].startswith(prefix)
+
+
+_word_lookups: Dict[str, WordLookup] = {}
+
+
+def get_answer_lookup() -> WordLookup:
+    """
+    :return: A lookup of every word that can be an answer.
+    """
+    if 'answers' not in _word_lookups:
+        _word_lookups['answers'] = WordLookup(get_answer_list())
+    return _word_lookups['answers']
+
+
+def get_guess_lookup() -> WordLookup:
+    """
+    :return: A lookup of every word that can be guessed.
+    """
+    if 'guesses' not in _word_lookups:
+        _word_lookups['guesses'] = WordLookup(get_guess_list())
+    return _word_lookups['guesses']
 
 
 class WordleState(Enum):
@@ -51,3 +224,23 @@ class WordleResponse:
     guessed_words: List[str]
     guesses: int
     final_word: str
+    # The fewest and most copies of each letter the word can have, as far as we know.
+    min_letter_counts: Dict[str, int] = field(default_factory=dict)
+    max_letter_counts: Dict[str, int] = field(default_factory=dict)
+    # The GameState after this response, to pick up the game from.
+    snapshot: Optional['GameState'] = None
+
+
+@dataclass
+class MultiWordleResponse:
+    """
+    A response class from a multi-board Wordle game.
+    """
+    game_state: WordleState
+    # The response of every board to the latest guess; boards solved before it respond with GameEnded.
+    board_responses: List[WordleResponse]
+    guessed_words: List[str]
+    guesses: int
+    solved_boards: List[bool]
+    # Every board's word, once the game is over.
+    final_words: List[str] = field(default_factory=list)
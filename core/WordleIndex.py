@@ -0,0 +1,161 @@
+"""
+Bitset indexes over word lists.
+Every word in a list gets one bit, so a set of words is a single integer,
+and narrowing down candidates is a few bitwise operations.
+"""
+from core.WordleGlobals import *
+from core.WordleFeedback import *
+from core.WordleProfiler import *
+from collections import defaultdict
+from time import perf_counter
+from typing import Iterator, Sequence
+
+
+def bit_indices(bits: int) -> Iterator[int]:
+    """
+    Yields the index of every set bit, lowest first.
+    :param bits: The bitset to read.
+    """
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class WordIndex:
+    """
+    Per-(position, letter) and per-letter bitsets over a list of words.
+    """
+
+    def __init__(self, words: Sequence[str]) -> None:
+        """
+        Indexes a list of words.
+        :param words: The words to index. Bit i stands for words[i].
+        """
+        self.words = list(words)
+        self.all = (1 << len(self.words)) - 1
+
+        position_bits = defaultdict(int)
+        count_bits = defaultdict(int)
+        for i, word in enumerate(self.words):
+            bit = 1 << i
+            for position, char in enumerate(word):
+                position_bits[position, char] |= bit
+            for char, count in get_letter_counts(word).items():
+                for copies in range(1, count + 1):
+                    count_bits[char, copies] |= bit
+        self.position_bits: Dict[tuple, int] = dict(position_bits)
+        self.count_bits: Dict[tuple, int] = dict(count_bits)
+        self.letter_bits: Dict[str, int] = {char: bits for (char, copies), bits in self.count_bits.items()
+                                            if copies == 1}
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def at_position(self, char: str, position: int) -> int:
+        """
+        :return: Every word with this character at this position.
+        """
+        return self.position_bits.get((position, char), 0)
+
+    def containing(self, char: str) -> int:
+        """
+        :return: Every word containing this character.
+        """
+        return self.letter_bits.get(char, 0)
+
+    def with_copies(self, char: str, copies: int) -> int:
+        """
+        :return: Every word with at least this many copies of this character.
+        """
+        if copies <= 0:
+            return self.all
+        return self.count_bits.get((char, copies), 0)
+
+    def narrow(self, candidates: int, guess: str, word_response: Sequence[WordleState]) -> int:
+        """
+        Removes every candidate that could not have given this feedback.
+        :param candidates: The current candidates.
+        :param guess: The word that was guessed.
+        :param word_response: The feedback for every position of the guess.
+        :return: The remaining candidates.
+        """
+        if instrumentation.enabled:
+            start = perf_counter()
+            instrumentation.count('candidates_scanned', candidates.bit_count())
+        shown = {}
+        exact = set()
+        for position, state in enumerate(word_response):
+            char = guess[position]
+            if state == WordleState.Correct:
+                candidates &= self.at_position(char, position)
+                shown[char] = shown.get(char, 0) + 1
+            else:
+                candidates &= ~self.at_position(char, position)
+                if state == WordleState.Misplaced:
+                    shown[char] = shown.get(char, 0) + 1
+                else:
+                    exact.add(char)
+        # The feedback shows every copy of a letter, unless one of them came back wrong.
+        for char, copies in shown.items():
+            candidates &= self.with_copies(char, copies)
+        for char in exact:
+            candidates &= ~self.with_copies(char, shown.get(char, 0) + 1)
+        if instrumentation.enabled:
+            instrumentation.add_time('filtering', perf_counter() - start)
+        return candidates
+
+    def narrow_hints(self, candidates: int, guess: str, word_response: Sequence[WordleState]) -> int:
+        """
+        Removes every candidate that doesn't use the hints of this feedback, like hard mode asks:
+        green letters stay in place, and every shown letter is used at least as often as it was shown.
+        :param candidates: The current candidates.
+        :param guess: The word that was guessed.
+        :param word_response: The feedback for every position of the guess.
+        :return: The remaining candidates.
+        """
+        shown = {}
+        for position, state in enumerate(word_response):
+            char = guess[position]
+            if state == WordleState.Correct:
+                candidates &= self.at_position(char, position)
+            if state != WordleState.Wrong:
+                shown[char] = shown.get(char, 0) + 1
+        for char, copies in shown.items():
+            candidates &= self.with_copies(char, copies)
+        return candidates
+
+    def constrain(self, candidates: int, wrong_characters: List[str],
+                  misplaced_characters: Dict[str, List[int]], correct_characters: Dict[str, List[int]],
+                  min_letter_counts: Dict[str, int] = None, max_letter_counts: Dict[str, int] = None) -> int:
+        """
+        Removes every candidate that breaks the known character constraints.
+        :param candidates: The current candidates.
+        :param wrong_characters: Characters not in the word.
+        :param misplaced_characters: Characters in the word, and the positions they're not at.
+        :param correct_characters: Characters in the word, and the positions they're at.
+        :param min_letter_counts: The fewest copies of each character the word has.
+        :param max_letter_counts: The most copies of each character the word has.
+        :return: The remaining candidates.
+        """
+        for char in wrong_characters:
+            candidates &= ~self.containing(char)
+        for char, positions in misplaced_characters.items():
+            candidates &= self.containing(char)
+            for position in positions:
+                candidates &= ~self.at_position(char, position)
+        for char, positions in correct_characters.items():
+            for position in positions:
+                candidates &= self.at_position(char, position)
+        for char, copies in (min_letter_counts or {}).items():
+            candidates &= self.with_copies(char, copies)
+        for char, copies in (max_letter_counts or {}).items():
+            candidates &= ~self.with_copies(char, copies + 1)
+        return candidates
+
+    def get_words(self, bits: int) -> List[str]:
+        """
+        :param bits: A set of words.
+        :return: The words in the set, in list order.
+        """
+        return [self.words[i] for i in bit_indices(bits)]
@@ -0,0 +1,175 @@
+"""
+Works out the answers behind shared result grids.
+A grid is the response to every guess of a game, as made by Wordle.response_to_characters,
+with the guesses left out. Read one grid per line, rows split up by spaces, commas or slashes:
+    xx?xx/x?C?x/CCCCC
+An answer fits a grid if every row is the feedback of some guess against it, so instead of
+scoring guesses per grid, every pattern keeps a bitset of the answers some guess gives it for,
+and a grid's answers are one AND per row. Identical grids are only worked out once.
+"""
+from core.WordleAnalyzer import *
+from collections import Counter
+from typing import Union
+import argparse
+import json
+import re
+import sys
+
+# What splits up the rows of a grid on one line.
+grid_separator = re.compile(r'[\s,/]+')
+
+
+class GridIndex:
+    """
+    An inverted index from feedback patterns to the (guess, answer) pairs that give them.
+    The answers of each pattern are kept as bitsets, by how many different guesses give it,
+    so rows that come up more than once are ANDed in like the rest.
+    The guesses of a pair are read from the answer's column of the feedback table when they're asked for.
+    """
+
+    # The most times a row can come up in a grid and still be looked up in the index.
+    max_repeats = Wordle.max_guesses
+
+    def __init__(self, table: FeedbackTable = None) -> None:
+        """
+        Indexes every pattern of a feedback table.
+        :param table: The feedback table. The config's word lists if not given.
+        """
+        self.table = table if table is not None else get_feedback_table()
+        self.win = winning_pattern(self.table.word_length)
+        answer_count = self.table.answer_count
+        members = defaultdict(list)
+        for answer in range(answer_count):
+            # The column of an answer is every guess's pattern against it, counted in C over a strided view.
+            for pattern, guesses in Counter(self.table.patterns[answer::answer_count]).items():
+                for repeats in range(1, min(guesses, self.max_repeats) + 1):
+                    members[pattern, repeats].append(answer)
+        # (pattern, repeats) -> the answers at least that many guesses give the pattern for
+        self.pattern_answers: Dict[Tuple[int, int], int] = {key: sum(1 << answer for answer in answers)
+                                                            for key, answers in members.items()}
+        self.all = (1 << answer_count) - 1
+        # Every row seen so far, read into its pattern.
+        self.row_patterns: Dict[str, int] = {}
+        # The column of every answer asked about so far, copied out of the table so it can be searched in C.
+        self.columns: Dict[int, Union[bytes, array]] = {}
+
+    def read_grid(self, grid: str) -> Tuple[int, ...]:
+        """
+        :param grid: A grid on one line, rows split up by spaces, commas or slashes.
+        :return: The pattern of every row.
+        """
+        patterns = []
+        for row in grid_separator.split(grid.strip()):
+            if not row:
+                continue
+            pattern = self.row_patterns.get(row)
+            if pattern is None:
+                if len(row) != self.table.word_length or \
+                        any(char not in (Wordle.char_check, Wordle.char_quest, Wordle.char_wrong) for char in row):
+                    raise ValueError(f"'{row}' isn't a response.")
+                pattern = encode_pattern(Wordle.characters_to_response(row))
+                self.row_patterns[row] = pattern
+            patterns.append(pattern)
+        return tuple(patterns)
+
+    def infer(self, patterns: Sequence[int]) -> int:
+        """
+        Finds the answers a grid could have come from.
+        Only the last row can be a win, and a row that comes up more than once needs that many different guesses.
+        :param patterns: The pattern of every row.
+        :return: The answers, as a bitset over the table's answers.
+        """
+        if self.win in patterns[:-1]:
+            return 0
+        answers = self.all
+        for pattern, repeats in Counter(patterns).items():
+            if pattern == self.win:
+                continue
+            answers &= self.pattern_answers.get((pattern, min(repeats, self.max_repeats)), 0)
+            if repeats > self.max_repeats:
+                for answer in bit_indices(answers):
+                    if len(self.get_guesses(answer, pattern, repeats)) < repeats:
+                        answers &= ~(1 << answer)
+        return answers
+
+    def get_guesses(self, answer: int, pattern: int, limit: int = None) -> List[int]:
+        """
+        :param answer: The index of the answer.
+        :param pattern: A feedback pattern.
+        :param limit: The most guesses to find. Every one if not given.
+        :return: The index of every guess that gets that pattern against that answer.
+        """
+        values = self.columns.get(answer)
+        if values is None:
+            column = self.table.patterns[answer::self.table.answer_count]
+            # One-byte patterns are searched as bytes, which skips along with memchr.
+            values = column.tobytes() if self.table.pattern_size == 1 else array(column.format, column.tobytes())
+            self.columns[answer] = values
+        guesses = []
+        guess = 0
+        while limit is None or len(guesses) < limit:
+            try:
+                guess = values.index(pattern, guess)
+            except ValueError:
+                break
+            guesses.append(guess)
+            guess += 1
+        return guesses
+
+    def get_guess_paths(self, answer: int, patterns: Sequence[int], limit: int = 3) -> List[List[str]]:
+        """
+        :param answer: The index of an answer that fits the grid.
+        :param patterns: The pattern of every row.
+        :param limit: How many guesses to list for each row.
+        :return: Some of the guesses that could have made each row, row by row.
+        """
+        return [[self.table.guesses[guess] for guess in self.get_guesses(answer, pattern, limit)]
+                for pattern in patterns]
+
+    def infer_grids(self, grids: Iterable[str]) -> Dict[Tuple[int, ...], Tuple[int, int]]:
+        """
+        Works out the answers of many grids, once per different grid.
+        :param grids: Every grid, one line each, such as the lines of a file. Blank lines are skipped.
+        :return: How many times each grid came up, and its answers as a bitset, by the patterns of the grid.
+        """
+        counts: Counter = Counter()
+        for grid in grids:
+            if grid.strip():
+                counts[self.read_grid(grid)] += 1
+        return {patterns: (count, self.infer(patterns)) for patterns, count in counts.items()}
+
+    def grid_to_characters(self, patterns: Sequence[int]) -> str:
+        """
+        :return: A grid on one line, the way read_grid reads it.
+        """
+        return '/'.join(Wordle.response_to_characters(decode_pattern(pattern, self.table.word_length))
+                        for pattern in patterns)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('grids', help="the file of grids, one per line ('-' for stdin)")
+    parser.add_argument('--limit', type=int, default=20, help="most answers to list per grid")
+    parser.add_argument('--paths', type=int, default=0, help="list this many guesses per row for each answer listed")
+    args = parser.parse_args()
+
+    index = GridIndex()
+    start = perf_counter()
+    with (open(args.grids, encoding='utf-8') if args.grids != '-' else sys.stdin) as file:
+        results = index.infer_grids(file)
+    seconds = perf_counter() - start
+    table = index.table
+    for patterns, (count, answers) in sorted(results.items(), key=lambda item: -item[1][0]):
+        listed = []
+        for answer in bit_indices(answers):
+            if len(listed) >= args.limit:
+                break
+            listed.append(answer)
+        line = {'grid': index.grid_to_characters(patterns), 'count': count,
+                'candidates': answers.bit_count(), 'answers': [table.answers[answer] for answer in listed]}
+        if args.paths:
+            line['paths'] = {table.answers[answer]: index.get_guess_paths(answer, patterns, args.paths)
+                             for answer in listed}
+        print(json.dumps(line))
+    print(f"{sum(count for count, _ in results.values())} grids ({len(results)} different) "
+          f"in {round(seconds, 3)} seconds.", file=sys.stderr)
@@ -0,0 +1,123 @@
+"""
+Opt-in instrumentation for the simulator and analyzers.
+Hot paths check instrumentation.enabled before timing anything,
+so leaving it off costs one attribute lookup per check.
+"""
+from typing import Dict, List, Optional
+import json
+
+
+class Instrumentation:
+    """
+    Per-phase timers and counters, reported into by Wordle and the analyzers.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.timers: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.chunks: List[dict] = []
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        """
+        Adds a timed call to a phase.
+        :param phase: The name of the phase.
+        :param seconds: How long the call took.
+        """
+        timer = self.timers.get(phase)
+        if timer is None:
+            self.timers[phase] = [seconds, 1]
+        else:
+            timer[0] += seconds
+            timer[1] += 1
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        """
+        Adds to a counter.
+        :param counter: The name of the counter.
+        :param amount: How much to add.
+        """
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def add_chunk(self, chunk: dict) -> None:
+        """
+        Records a chunk of a study, such as its duration or its cProfile hot spots.
+        :param chunk: What to record; must be JSON serializable.
+        """
+        self.chunks.append(chunk)
+
+    def reset(self) -> None:
+        self.timers = {}
+        self.counters = {}
+        self.chunks = []
+
+    def take(self) -> dict:
+        """
+        Hands over everything recorded so far, and starts over.
+        Used by worker processes to send their numbers back.
+        :return: The recorded timers and counters.
+        """
+        snapshot = {'timers': self.timers, 'counters': self.counters}
+        self.timers = {}
+        self.counters = {}
+        return snapshot
+
+    def merge(self, snapshot: Optional[dict]) -> None:
+        """
+        Adds numbers recorded somewhere else.
+        :param snapshot: The numbers, as made by take.
+        """
+        if not snapshot:
+            return
+        for phase, (seconds, calls) in snapshot['timers'].items():
+            timer = self.timers.setdefault(phase, [0.0, 0])
+            timer[0] += seconds
+            timer[1] += calls
+        for counter, amount in snapshot['counters'].items():
+            self.count(counter, amount)
+
+    """
+    Reports
+    """
+
+    def get_summary(self) -> List[str]:
+        """
+        :return: The lines of a table of every phase and counter.
+        """
+        total = sum(seconds for seconds, _ in self.timers.values()) or 1.0
+        lines = [f"{'Phase':<20}{'Calls':>12}{'Seconds':>12}{'Mean (us)':>12}{'Share':>9}"]
+        for phase, (seconds, calls) in sorted(self.timers.items(), key=lambda item: -item[1][0]):
+            lines.append(f"{phase:<20}{calls:>12}{seconds:>12.3f}"
+                         f"{seconds / max(calls, 1) * 1e6:>12.2f}{seconds / total:>9.1%}")
+        lines.append('')
+        lines.append(f"{'Counter':<20}{'Count':>12}")
+        for counter, amount in sorted(self.counters.items()):
+            lines.append(f"{counter:<20}{amount:>12}")
+        return lines
+
+    def print_summary(self) -> None:
+        for line in self.get_summary():
+            print(line)
+
+    def get_trace(self) -> dict:
+        """
+        :return: Everything recorded, ready to be written as JSON.
+        """
+        return {
+            'timers': {phase: {'seconds': seconds, 'calls': calls}
+                       for phase, (seconds, calls) in self.timers.items()},
+            'counters': dict(self.counters),
+            'chunks': self.chunks,
+        }
+
+    def write_trace(self, path: str) -> None:
+        """
+        Writes everything recorded to a JSON file.
+        :param path: Where to write it.
+        """
+        with open(path, mode='w') as file:
+            json.dump(self.get_trace(), file, indent=2)
+
+
+# The instrumentation every module reports into.
+instrumentation = Instrumentation()
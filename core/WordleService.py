@@ -0,0 +1,279 @@
+"""
+A solver service for many Wordle players at once.
+Requests and responses are JSON objects, one per line, over stdin/stdout or a socket:
+    {"id": 1, "op": "new"}                                              -> {"id": 1, "session": "..."}
+    {"id": 2, "op": "enter", "session": "...", "guess": "slate", "response": "xx?xC"}
+                                                                        -> {"id": 2, "candidates": 41}
+    {"id": 3, "op": "suggest", "session": "..."}                        -> {"id": 3, "guess": "...", "candidates": 41}
+    {"id": 4, "op": "candidates", "session": "...", "limit": 10}        -> {"id": 4, "words": [...], "candidates": 41}
+    {"id": 5, "op": "close", "session": "..."}                          -> {"id": 5, "closed": true}
+Failed requests get {"id": ..., "error": "..."} instead.
+
+A session is only its history and a bitset of its candidates, narrowed with a word index
+shared by every session. Guesses come from the decision cache when they can,
+and are worked out in a pool of worker processes when they can't.
+"""
+from core.WordleAnalyzer import *
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+
+
+class SolverSession:
+    """
+    What one player has told the service so far.
+    """
+
+    __slots__ = 'history', 'candidates', 'lock'
+
+    def __init__(self, candidates: int) -> None:
+        """
+        :param candidates: Every answer, as a bitset.
+        """
+        self.history: History = ()
+        self.candidates = candidates
+        self.lock = asyncio.Lock()
+
+
+class WordleService:
+    """
+    Serves hints to any number of sessions.
+    """
+
+    analyzer_class = WAEntropy
+
+    def __init__(self, processes: int = 1) -> None:
+        """
+        :param processes: How many worker processes work out guesses.
+                          With 0, a thread in this process does instead.
+        """
+        self.table = self.analyzer_class.get_table()
+        self.index = self.analyzer_class.get_wordle_dictionary().get_answer_index()
+        self.cache = self.analyzer_class.get_decision_cache()
+        self.sessions: Dict[str, SolverSession] = {}
+        # Histories being worked out right now, so identical requests share the work.
+        self.pending: Dict[History, asyncio.Future] = {}
+        if processes > 0:
+            self.executor: Executor = ProcessPoolExecutor(processes, initializer=_init_service_worker,
+                                                          initargs=(self.analyzer_class,))
+        else:
+            _init_service_worker(self.analyzer_class)
+            self.executor = ThreadPoolExecutor(1)
+
+    def close(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+        self.analyzer_class.save_decision_cache()
+
+    """
+    Requests
+    """
+
+    async def handle(self, request: dict) -> dict:
+        """
+        Answers a request.
+        :param request: The request; 'op' says what it wants.
+        :return: The response, with the request's id.
+        """
+        response = {'id': request.get('id')}
+        try:
+            operation = getattr(self, 'op_' + str(request.get('op')), None)
+            if operation is None:
+                raise ValueError(f"Unknown op '{request.get('op')}'.")
+            response.update(await operation(request))
+        except KeyError as error:
+            # A KeyError's own message is its key, quoted.
+            response['error'] = str(error.args[0])
+        except (TypeError, ValueError) as error:
+            response['error'] = str(error)
+        return response
+
+    def get_session(self, request: dict) -> SolverSession:
+        session = self.sessions.get(request.get('session'))
+        if session is None:
+            raise ValueError(f"No session '{request.get('session')}'.")
+        return session
+
+    async def op_new(self, _: dict) -> dict:
+        session_id = uuid.uuid4().hex
+        self.sessions[session_id] = SolverSession(self.index.all)
+        return {'session': session_id}
+
+    async def op_close(self, request: dict) -> dict:
+        self.get_session(request)
+        del self.sessions[request['session']]
+        return {'closed': True}
+
+    async def op_enter(self, request: dict) -> dict:
+        session = self.get_session(request)
+        guess = request.get('guess')
+        characters = request.get('response')
+        if not isinstance(guess, str) or not isinstance(characters, str):
+            raise ValueError("A guess and its response have to be strings.")
+        guess = guess.lower()
+        if guess not in self.table.guess_index:
+            raise ValueError(f"'{guess}' can't be guessed.")
+        if len(characters) != len(guess) or \
+                any(char not in (Wordle.char_check, Wordle.char_quest, Wordle.char_wrong) for char in characters):
+            raise ValueError(f"'{characters}' isn't a response.")
+        word_response = Wordle.characters_to_response(characters)
+        async with session.lock:
+            session.candidates = self.index.narrow(session.candidates, guess, word_response)
+            session.history += ((self.table.guess_index[guess], encode_pattern(word_response)),)
+            return {'candidates': session.candidates.bit_count()}
+
+    async def op_candidates(self, request: dict) -> dict:
+        session = self.get_session(request)
+        limit = request.get('limit', 20)
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit < 0:
+            raise ValueError(f"'{limit}' isn't a limit.")
+        words = []
+        for i in bit_indices(session.candidates):
+            if len(words) >= limit:
+                break
+            words.append(self.index.words[i])
+        return {'words': words, 'candidates': session.candidates.bit_count()}
+
+    async def op_suggest(self, request: dict) -> dict:
+        session = self.get_session(request)
+        async with session.lock:
+            count = session.candidates.bit_count()
+            if count == 0:
+                raise ValueError("No words fit those responses.")
+            if count <= 2:
+                guess = self.index.words[next(bit_indices(session.candidates))]
+            else:
+                guess = self.table.guesses[await self.get_guess(session.history)]
+            return {'guess': guess, 'candidates': count}
+
+    async def get_guess(self, history: History) -> int:
+        """
+        Finds the best guess after a history, from the cache or a worker.
+        :param history: Every (guess, pattern) so far.
+        :return: The guess index.
+        """
+        guess = self.cache.get(history)
+        if guess is not None:
+            return guess
+        future = self.pending.get(history)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, _service_worker_guess, history)
+            self.pending[history] = future
+            try:
+                guess = await future
+            finally:
+                del self.pending[history]
+            self.cache.put(history, guess)
+            return guess
+        return await future
+
+    """
+    Serving
+    """
+
+    async def serve(self, reader: asyncio.StreamReader, writer) -> None:
+        """
+        Answers every request on a stream, as each one finishes.
+        :param reader: Where the requests come from.
+        :param writer: Where the responses go.
+        """
+        tasks = set()
+
+        async def answer(line: bytes) -> None:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError
+            except ValueError:
+                response = {'id': None, 'error': "Requests have to be JSON objects."}
+            else:
+                try:
+                    response = await self.handle(request)
+                except Exception as error:
+                    # Such as a worker process dying; the client still hears back about its request.
+                    response = {'id': request.get('id'), 'error': f"The request failed: {error!r}"}
+            writer.write(json.dumps(response).encode() + b'\n')
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                task = asyncio.create_task(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def serve_stdio(self) -> None:
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        await self.serve(reader, _StdoutWriter())
+
+    async def serve_socket(self, path: str = None, host: str = '127.0.0.1', port: int = None) -> None:
+        """
+        Serves connections on a Unix socket, or a TCP port.
+        """
+        async def connected(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            try:
+                await self.serve(reader, writer)
+                await writer.drain()
+            finally:
+                writer.close()
+
+        if path is not None:
+            server = await asyncio.start_unix_server(connected, path=path)
+        else:
+            server = await asyncio.start_server(connected, host=host, port=port)
+        async with server:
+            await server.serve_forever()
+
+
+class _StdoutWriter:
+    """
+    Writes responses to stdout like a stream writer.
+    """
+
+    @staticmethod
+    def write(data: bytes) -> None:
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+
+
+_service_analyzer: Optional[WordleAnalyzer] = None
+
+
+def _init_service_worker(analyzer_class) -> None:
+    global _service_analyzer
+    _service_analyzer = analyzer_class(0)
+    _service_analyzer.set_dictionary(analyzer_class.get_dictionary())
+
+
+def _service_worker_guess(history: History) -> int:
+    analyzer = _service_analyzer.clone()
+    table = analyzer.dictionary
+    for guess, pattern in history:
+        analyzer.narrow(table.guesses[guess], pattern)
+    return table.guess_index[analyzer.choose_guess()]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--socket', help="serve on this Unix socket (default: stdin/stdout)")
+    parser.add_argument('--port', type=int, help="serve on this TCP port on localhost")
+    parser.add_argument('--processes', type=int, default=1, help="worker processes for working out guesses")
+    args = parser.parse_args()
+
+    service = WordleService(args.processes)
+    try:
+        if args.socket or args.port:
+            asyncio.run(service.serve_socket(path=args.socket, port=args.port))
+        else:
+            asyncio.run(service.serve_stdio())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
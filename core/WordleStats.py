@@ -0,0 +1,241 @@
+"""
+Streaming aggregation of study results.
+Instead of keeping every game's guess count, each word keeps a running
+count, sum, sum of squares and histogram in fixed-size arrays,
+so a study takes the same memory no matter how many games it plays.
+"""
+from array import array
+from math import sqrt
+from statistics import NormalDist
+from typing import List, Sequence, Tuple
+
+
+class RunningStats:
+    """
+    Running guess-count statistics for a fixed number of words.
+    """
+
+    __slots__ = 'counts', 'sums', 'squares', 'histograms', 'bins'
+
+    def __init__(self, size: int, bins: int = 16) -> None:
+        """
+        :param size: How many words to keep statistics for.
+        :param bins: The size of each histogram. Guess counts of bins - 1
+                     and up all go into the last bin.
+        """
+        self.bins = bins
+        self.counts = array('Q', [0]) * size
+        self.sums = array('Q', [0]) * size
+        self.squares = array('Q', [0]) * size
+        self.histograms = array('Q', [0]) * (size * bins)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, i: int, guesses: int, weight: int = 1) -> None:
+        """
+        Adds a game.
+        :param i: The index of the word.
+        :param guesses: How many guesses the game took.
+        :param weight: How many identical games to add.
+        """
+        self.counts[i] += weight
+        self.sums[i] += guesses * weight
+        self.squares[i] += guesses * guesses * weight
+        self.histograms[i * self.bins + min(guesses, self.bins - 1)] += weight
+
+    def merge(self, other: 'RunningStats') -> None:
+        """
+        Adds the games of another set of statistics over the same words.
+        """
+        for i in range(len(self.counts)):
+            self.counts[i] += other.counts[i]
+            self.sums[i] += other.sums[i]
+            self.squares[i] += other.squares[i]
+        for i in range(len(self.histograms)):
+            self.histograms[i] += other.histograms[i]
+
+    def mean(self, i: int) -> float:
+        return self.sums[i] / self.counts[i] if self.counts[i] else 0.0
+
+    def variance(self, i: int) -> float:
+        """
+        :return: The sample variance of a word's guess counts.
+        """
+        count = self.counts[i]
+        if count < 2:
+            return 0.0
+        return max(self.squares[i] - self.sums[i] * self.sums[i] / count, 0.0) / (count - 1)
+
+    def interval(self, i: int, z: float = 1.96) -> Tuple[float, float]:
+        """
+        :param i: The index of the word.
+        :param z: The z-score of the confidence level; 1.96 is 95%.
+        :return: The confidence interval of a word's mean guess count.
+        """
+        mean = self.mean(i)
+        if not self.counts[i]:
+            return mean, mean
+        margin = z * sqrt(self.variance(i) / self.counts[i])
+        return mean - margin, mean + margin
+
+    def distribution(self, i: int) -> List[int]:
+        """
+        :return: How many of a word's games took each guess count; the last bin is everything beyond.
+        """
+        return self.histograms[i * self.bins:(i + 1) * self.bins].tolist()
+
+    def total_distribution(self) -> List[int]:
+        """
+        :return: The distribution over every word.
+        """
+        total = [0] * self.bins
+        for i, amount in enumerate(self.histograms):
+            total[i % self.bins] += amount
+        return total
+
+    def ranked(self) -> List[int]:
+        """
+        :return: The index of every word with games, lowest mean first.
+        """
+        means = [self.mean(i) for i in range(len(self.counts))]
+        return sorted((i for i in range(len(self.counts)) if self.counts[i]), key=means.__getitem__)
+
+    def get_unsettled(self, k: int, z: float = 1.96, tolerance: float = 0.0, min_count: int = 2) -> List[int]:
+        """
+        Finds the words that can't be told apart yet from the k best or the k worst.
+        The best k are settled once every interval among them ends before every other interval starts,
+        and the worst k once every interval among them starts after every other interval ends.
+        :param k: How many words to tell apart at each end.
+        :param z: The z-score of the confidence level.
+        :param tolerance: How far intervals can overlap and still count as told apart,
+                          so words with the same mean don't keep the rankings open forever.
+        :param min_count: How many games every word needs first, for its interval to mean anything.
+        :return: The index of every word with games whose place in the ranking could still change.
+        """
+        ranked = self.ranked()
+        if len(ranked) <= k:
+            return [i for i in ranked if self.counts[i] < min_count]
+        intervals = [self.interval(i, z) for i in ranked]
+        lows = [low for low, _ in intervals]
+        highs = [high for _, high in intervals]
+        best_high, rest_low = max(highs[:k]), min(lows[k:])
+        rest_high, worst_low = max(highs[:-k]), min(lows[-k:])
+        unsettled = []
+        for place, i in enumerate(ranked):
+            if self.counts[i] < min_count or \
+                    (highs[place] > rest_low + tolerance if place < k else lows[place] + tolerance < best_high) or \
+                    (lows[place] + tolerance < rest_high if place >= len(ranked) - k else
+                     highs[place] > worst_low + tolerance):
+                unsettled.append(i)
+        return unsettled
+
+    def is_settled(self, k: int, z: float = 1.96, tolerance: float = 0.0, min_count: int = 2) -> bool:
+        """
+        :return: If the k best and k worst words are told apart from every other word. See get_unsettled.
+        """
+        return not self.get_unsettled(k, z, tolerance, min_count)
+
+
+class PairedStats:
+    """
+    Running statistics of the difference between two strategies' guess counts,
+    over games they both played against the same target with the same random numbers.
+    """
+
+    __slots__ = 'count', 'sum', 'squares', 'better', 'worse'
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.sum = 0
+        self.squares = 0
+        # How many games the first strategy took fewer guesses in, and how many it took more.
+        self.better = 0
+        self.worse = 0
+
+    def add(self, difference: int, weight: int = 1) -> None:
+        """
+        Adds a pair of games.
+        :param difference: The first strategy's guess count minus the second's.
+        :param weight: How many identical pairs to add.
+        """
+        self.count += weight
+        self.sum += difference * weight
+        self.squares += difference * difference * weight
+        if difference < 0:
+            self.better += weight
+        elif difference > 0:
+            self.worse += weight
+
+    def get_ties(self) -> int:
+        return self.count - self.better - self.worse
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def variance(self) -> float:
+        if self.count < 2:
+            return 0.0
+        return max(self.squares - self.sum * self.sum / self.count, 0.0) / (self.count - 1)
+
+    def interval(self, z: float = 1.96) -> Tuple[float, float]:
+        """
+        :param z: The z-score of the confidence level; 1.96 is 95%.
+        :return: The confidence interval of the mean difference.
+        """
+        mean = self.mean()
+        if not self.count:
+            return mean, mean
+        margin = z * sqrt(self.variance() / self.count)
+        return mean - margin, mean + margin
+
+    def p_value(self) -> float:
+        """
+        A paired z-test; with the thousands of games in a study, it's as good as a t-test.
+        :return: How likely a mean difference this far from 0 is if both strategies are as good.
+        """
+        if not self.count:
+            return 1.0
+        error = sqrt(self.variance() / self.count)
+        if not error:
+            return 1.0 if not self.sum else 0.0
+        return 2 * (1 - NormalDist().cdf(abs(self.mean()) / error))
+
+
+class StudyStats:
+    """
+    The running statistics of a study, per target word and per start word.
+    """
+
+    def __init__(self, target_words: Sequence[str], start_words: Sequence[str], bins: int = 16) -> None:
+        """
+        :param target_words: Every word that can be a target.
+        :param start_words: Every word that can be a start word.
+        :param bins: The size of each histogram.
+        """
+        self.target_words = list(target_words)
+        self.start_words = list(start_words)
+        self.target_index = {word: i for i, word in enumerate(self.target_words)}
+        self.start_index = {word: i for i, word in enumerate(self.start_words)}
+        self.targets = RunningStats(len(self.target_words), bins)
+        self.starts = RunningStats(len(self.start_words), bins)
+
+    def add(self, target: int, start: int, guesses: int, weight: int = 1) -> None:
+        """
+        Adds a game by word indices.
+        :param target: The index of the target word.
+        :param start: The index of the start word.
+        :param guesses: How many guesses the game took.
+        :param weight: How many identical games to add.
+        """
+        self.targets.add(target, guesses, weight)
+        self.starts.add(start, guesses, weight)
+
+    def add_game(self, target_word: str, start_word: str, guesses: int, weight: int = 1) -> None:
+        """
+        Adds a game by words.
+        """
+        self.add(self.target_index[target_word], self.start_index[start_word], guesses, weight)
+
+    def get_games(self) -> int:
+        return sum(self.targets.counts)
@@ -0,0 +1,109 @@
+"""
+An append-only log of study results, with checkpoints.
+Every game of a study is written as it finishes, so a crashed or stopped
+study can be resumed, and its rankings rebuilt without replaying any games.
+
+A study directory holds:
+    - games.log: a 6-byte record per game (target, start word, guess count)
+    - checkpoint.json: the study's parameters, and how far it got
+"""
+from core.WordleFeedback import *
+import json
+
+
+class StudyLog:
+    """
+    The on-disk results of one study.
+    Targets are answer indices, and start words are guess indices, of the feedback table.
+    """
+
+    record = struct.Struct('<HHH')
+
+    def __init__(self, directory: str) -> None:
+        """
+        :param directory: Where the study is kept.
+        """
+        self.directory = directory
+        self.log_path = os.path.join(directory, 'games.log')
+        self.checkpoint_path = os.path.join(directory, 'checkpoint.json')
+        self.file = None
+        self.parameters = {}
+        self.units_done = 0
+
+    def read_checkpoint(self) -> Optional[dict]:
+        """
+        :return: The last checkpoint, or None if there isn't one.
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as file:
+            return json.load(file)
+
+    def open(self, parameters: dict, resume: bool = False) -> int:
+        """
+        Opens the log for writing.
+        :param parameters: What the study is; a resumed study has to match them.
+        :param resume: Carry on from the last checkpoint, instead of starting over.
+        :return: How many units of work are already done.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self.parameters = parameters
+        checkpoint = self.read_checkpoint() if resume else None
+        if checkpoint is not None:
+            if checkpoint['parameters'] != parameters:
+                raise ValueError(f"The study in '{self.directory}' was started with different parameters: "
+                                 f"{checkpoint['parameters']}")
+            self.units_done = checkpoint['units_done']
+            # Anything after the checkpoint is from a unit that didn't finish.
+            self.file = open(self.log_path, mode='r+b' if os.path.exists(self.log_path) else 'w+b')
+            self.file.truncate(checkpoint['log_size'])
+            self.file.seek(checkpoint['log_size'])
+        else:
+            self.units_done = 0
+            self.file = open(self.log_path, mode='wb')
+            self.checkpoint(0)
+        return self.units_done
+
+    def append(self, records: Iterable[Tuple[int, int, int]]) -> None:
+        """
+        Writes the results of some games.
+        :param records: (target, start word, guess count) of every game.
+        """
+        pack = self.record.pack
+        self.file.write(b''.join(pack(target, start, min(guesses, 0xFFFF)) for target, start, guesses in records))
+
+    def checkpoint(self, units_done: int) -> None:
+        """
+        Marks everything written so far as done.
+        :param units_done: How many units of work the study finished.
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.units_done = units_done
+        temp_path = f'{self.checkpoint_path}.{os.getpid()}.tmp'
+        with open(temp_path, mode='w') as file:
+            json.dump({'parameters': self.parameters, 'units_done': units_done,
+                       'log_size': self.file.tell()}, file)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def read(self) -> Iterator[Tuple[int, int, int]]:
+        """
+        Reads back every game up to the last checkpoint.
+        :return: (target, start word, guess count) of every game.
+        """
+        checkpoint = self.read_checkpoint()
+        if checkpoint is None or not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, mode='rb') as file:
+            remaining = checkpoint['log_size']
+            while remaining > 0:
+                block = file.read(min(remaining, self.record.size * 65536))
+                if not block:
+                    break
+                remaining -= len(block)
+                yield from self.record.iter_unpack(block[:len(block) - len(block) % self.record.size])
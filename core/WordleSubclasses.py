@@ -2,6 +2,43 @@
 Various subclasses of Wordle, which play the game in different ways.
 """
 from core.Wordle import *
+from array import array
+from collections import defaultdict
+from typing import Sequence, Tuple
+
+
+def get_pattern_hints(pattern: int, length: int) -> Tuple[int, int]:
+    """
+    :return: How many green and yellow letters a pattern shows.
+    """
+    greens = yellows = 0
+    for _ in range(length):
+        digit = pattern % 3
+        pattern //= 3
+        if digit == 2:
+            greens += 1
+        elif digit == 1:
+            yellows += 1
+    return greens, yellows
+
+
+def pick_adversarial_bucket(table: FeedbackTable, guess: int, candidates: Sequence[int]) -> Tuple[int, List[int]]:
+    """
+    Picks the feedback an adversarial game gives: the one that leaves the most candidates,
+    and on a tie, the one with the fewest green letters, then the fewest yellow ones.
+    :param table: The feedback table.
+    :param guess: The index of the guessed word.
+    :param candidates: The answer indices that still fit every response.
+    :return: The pattern, and the candidates that fit it.
+    """
+    row = table.row(guess)
+    buckets = defaultdict(list)
+    for answer in candidates:
+        buckets[row[answer]].append(answer)
+    largest = max(len(bucket) for bucket in buckets.values())
+    pattern = min((pattern for pattern, bucket in buckets.items() if len(bucket) == largest),
+                  key=lambda tied: get_pattern_hints(tied, table.word_length))
+    return pattern, buckets[pattern]
 
 
 class WordleEndless(Wordle):
@@ -10,3 +47,461 @@ class WordleEndless(Wordle):
     """
     max_guesses = 1000000000
     reveals_word = True
+
+
+class WordleHardMode(Wordle):
+    """
+    Wordle in hard mode: every guess has to use the hints shown so far.
+    Green letters stay in place, and every shown letter is used as often as it was shown.
+    """
+    hard_mode = True
+
+    def is_valid_guess(self, word: str) -> bool:
+        return super().is_valid_guess(word) and \
+            self.get_snapshot().fits_hints(self.get_dictionary().get_feedback_table(), word)
+
+
+class WordleAbsurd(Wordle):
+    """
+    An adversarial Wordle, like Absurdle: there's no word to begin with.
+    Every guess gets the feedback that leaves the most words possible,
+    so the game is only won once a guess is the last word left.
+    The words left are narrowed down with the feedback table as the game goes.
+    """
+
+    __slots__ = '__candidates', '__candidates_guesses'
+
+    adversarial = True
+
+    def __init__(self, word: str = None, dictionary: WordleDictionary = None, snapshot: GameState = None) -> None:
+        """
+        Initiates an adversarial game.
+        :param word: Unused; the game picks its word as it goes.
+        :param dictionary: The words to play with. The config's word lists if not given.
+        :param snapshot: Carry on from this point of another adversarial game.
+        """
+        self.__candidates: List[int] = []
+        # The guess count the candidates are for; they're worked out again if it's off, such as after a resume.
+        self.__candidates_guesses = -1
+        super().__init__(word, dictionary, snapshot)
+
+    def get_candidates(self) -> List[int]:
+        """
+        :return: The answer indices that still fit every response.
+        """
+        if self.__candidates_guesses != self.get_guesses():
+            self.__candidates = self.get_snapshot().get_candidates(self.get_dictionary().get_feedback_table())
+            self.__candidates_guesses = self.get_guesses()
+        return self.__candidates
+
+    def score_guess(self, word: str) -> int:
+        table = self.get_dictionary().get_feedback_table()
+        pattern, self.__candidates = pick_adversarial_bucket(table, table.guess_index[word], self.get_candidates())
+        self.__candidates_guesses = self.get_guesses() + 1
+        return pattern
+
+    def fits_snapshot(self, snapshot: GameState) -> bool:
+        return bool(snapshot.get_candidates(self.get_dictionary().get_feedback_table()))
+
+    def get_word(self) -> str:
+        if not super().get_word():
+            return ""
+        return self.get_dictionary().get_feedback_table().answers[self.get_candidates()[0]]
+
+
+class WordleHeadless:
+    """
+    A stripped-down Wordle for simulations.
+    Guesses return a packed feedback pattern instead of a WordleResponse,
+    and what's known about the word is kept in fixed-size arrays:
+        - correct: the letter at each position, or -1
+        - misplaced: a bitmask of letters known not to be at each position
+        - wrong: a bitmask of letters not in the word
+        - min_counts / max_counts: the fewest and most copies of each letter the word can have
+    Letters are numbered by their place in the table's alphabet, so with a-z bit 0 is 'a'.
+    One game object can be reset and reused for any number of games.
+    Like WordleHardMode and WordleAbsurd, a game can be in hard mode, or adversarial;
+    then candidates holds the answer indices that still fit every response,
+    and answer is one of them.
+    """
+
+    __slots__ = 'table', 'max_guesses', 'hard_mode', 'adversarial', 'answer', 'candidates', 'guesses', 'won', \
+                'correct', 'misplaced', 'wrong', 'min_counts', 'max_counts'
+
+    def __init__(self, answer: str = None, table: FeedbackTable = None, max_guesses: int = Wordle.max_guesses,
+                 hard_mode: bool = False, adversarial: bool = False) -> None:
+        """
+        Initiates a headless game.
+        :param answer: The word to guess. Random if not given; unused by adversarial games.
+        :param table: The feedback table to score with.
+        :param max_guesses: How many guesses the game allows.
+        :param hard_mode: If every guess has to use the hints shown so far.
+        :param adversarial: If the game picks the feedback that leaves the most words.
+        """
+        self.table = table if table is not None else get_feedback_table()
+        self.max_guesses = max_guesses
+        self.hard_mode = hard_mode
+        self.adversarial = adversarial
+        self.candidates: List[int] = []
+        self.correct = array('b', [-1] * self.table.word_length)
+        self.misplaced = array('Q', [0] * self.table.word_length)
+        self.min_counts = array('b', [0] * len(self.table.alphabet))
+        self.max_counts = array('b', [self.table.word_length] * len(self.table.alphabet))
+        self.answer = 0
+        self.guesses = 0
+        self.won = False
+        self.wrong = 0
+        self.reset(answer)
+
+    def reset(self, answer: str = None) -> None:
+        """
+        Starts a new game, reusing this object.
+        :param answer: The word to guess. Random if not given.
+        """
+        self.answer = self.table.answer_index[answer] if answer else random.randrange(self.table.answer_count)
+        if self.adversarial:
+            self.candidates = list(range(self.table.answer_count))
+        self.guesses = 0
+        self.won = False
+        self.wrong = 0
+        for i in range(len(self.correct)):
+            self.correct[i] = -1
+            self.misplaced[i] = 0
+        for letter in range(len(self.min_counts)):
+            self.min_counts[letter] = 0
+            self.max_counts[letter] = len(self.correct)
+
+    def is_over(self) -> bool:
+        return self.won or self.guesses >= self.max_guesses
+
+    def guess(self, guess: int) -> int:
+        """
+        Makes a guess by its index in the table.
+        :param guess: The index of the guessed word.
+        :return: The feedback pattern, -1 if the game is already over,
+                 or -2 if it doesn't use every hint in hard mode.
+        """
+        if self.is_over():
+            return -1
+        if self.hard_mode and not fits_hints(self.table, self.table.guesses[guess], self.correct, self.min_counts):
+            return -2
+        timed = instrumentation.enabled
+        if timed:
+            start = perf_counter()
+        if self.adversarial:
+            pattern, self.candidates = pick_adversarial_bucket(self.table, guess, self.candidates)
+            self.answer = self.candidates[0]
+        else:
+            pattern = self.table.patterns[guess * self.table.answer_count + self.answer]
+        self.guesses += 1
+        if pattern == winning_pattern(len(self.correct)):
+            self.won = True
+
+        word = self.table.guesses[guess]
+        # Every letter shown this guess, and the letters that also came back wrong.
+        shown = 0
+        wrong = 0
+        digits = []
+        remaining = pattern
+        for i in range(len(self.correct)):
+            digit = remaining % 3
+            remaining //= 3
+            letter = self.table.letter_index[word[i]]
+            digits.append(digit)
+            if digit == 2:
+                self.correct[i] = letter
+            else:
+                self.misplaced[i] |= 1 << letter
+            if digit:
+                shown |= 1 << letter
+            else:
+                wrong |= 1 << letter
+        self.wrong |= wrong & ~shown
+        for char in set(word):
+            letter = self.table.letter_index[char]
+            copies = sum(1 for i, other in enumerate(word) if other == char and digits[i])
+            if copies > self.min_counts[letter]:
+                self.min_counts[letter] = copies
+            if wrong >> letter & 1:
+                self.max_counts[letter] = copies
+        if timed:
+            instrumentation.add_time('feedback', perf_counter() - start)
+            instrumentation.count('turns')
+        return pattern
+
+    def guess_word(self, word: str) -> int:
+        """
+        Makes a guess by its word.
+        :param word: The guessed word.
+        :return: The feedback pattern, -1 if the game is over, or -2 if the word can't be guessed.
+        """
+        guess = self.table.guess_index.get(word)
+        if guess is None:
+            return -2
+        return self.guess(guess)
+
+    def get_word(self) -> str:
+        return self.table.answers[self.answer]
+
+    @classmethod
+    def play_batch(cls, answers: Sequence[str], new_player: Callable[[int], object],
+                   table: FeedbackTable = None, max_guesses: int = Wordle.max_guesses,
+                   hard_mode: bool = False, adversarial: bool = False) -> Tuple[array, array]:
+        """
+        Plays many games back to back.
+        :param answers: The word to guess in each game.
+        :param new_player: Makes the player of game i. A player has
+                           get_next_guess(guess, pattern), which is given the last
+                           guess (None at the start) and its pattern, and returns a word.
+        :param table: The feedback table to score with.
+        :param max_guesses: How many guesses each game allows.
+        :param hard_mode: If every guess has to use the hints shown so far.
+        :param adversarial: If the games pick the feedback that leaves the most words.
+        :return: The guess count and the first guess (as a table index) of every game.
+        """
+        game = cls(answers[0] if answers else None, table=table, max_guesses=max_guesses,
+                   hard_mode=hard_mode, adversarial=adversarial)
+        guess_counts = array('L')
+        first_guesses = array('L')
+        for i, answer in enumerate(answers):
+            game.reset(answer)
+            player = new_player(i)
+            guess, pattern = None, 0
+            while not game.is_over():
+                guess = player.get_next_guess(guess, pattern)
+                pattern = game.guess_word(guess)
+                if pattern == -2:
+                    raise ValueError(f"'{guess}' can't be guessed.")
+                if game.guesses == 1:
+                    first_guesses.append(game.table.guess_index[guess])
+            guess_counts.append(game.guesses)
+        if instrumentation.enabled:
+            instrumentation.count('games', len(answers))
+        return guess_counts, first_guesses
+
+
+class WordleBoard(Wordle):
+    """
+    One board of a multi-board game. It only runs out of guesses with the game it's in.
+    """
+    max_guesses = WordleEndless.max_guesses
+
+
+class WordleMulti:
+    """
+    Several Wordle boards played at once, like Quordle: each guess is played on
+    every board that isn't solved yet, and the game is won once every board is.
+    """
+
+    __slots__ = '__words', '__dictionary', '__boards', '__responses', '__state'
+
+    board_class = WordleBoard
+    board_count = 4
+
+    # A guess per board, plus the 5 a single Wordle has to spare.
+    max_guesses = 9
+
+    def __init__(self, words: Sequence[str] = None, dictionary: WordleDictionary = None) -> None:
+        """
+        Initiates a multi-board game.
+        :param words: The word of every board. Different random answers if not given.
+        :param dictionary: The words to play with. The config's word lists if not given.
+        """
+        self.__dictionary = dictionary if dictionary is not None else get_default_dictionary()
+        if words is None:
+            words = random.sample(self.__dictionary.answers, self.board_count)
+        if len(words) != self.board_count:
+            raise ValueError(f"{type(self).__name__} needs {self.board_count} words, not {len(words)}.")
+        self.__words = list(words)
+        self.__boards = [self.board_class(word=word, dictionary=self.__dictionary) for word in self.__words]
+        self.__responses: List[WordleResponse] = []
+        self.__state = WordleState.Ready
+
+    def play(self, word: str = None) -> MultiWordleResponse:
+        """
+        Plays a guess on every board.
+        The first call starts the game, like Wordle.play.
+        :param word: The guess.
+        :return: A packaged response.
+        """
+        if self.__state == WordleState.Ready:
+            self.__responses = [board.play() for board in self.__boards]
+            self.__state = WordleState.Playing
+            return self.__get_response(WordleState.GameStart)
+        if self.__state != WordleState.Playing:
+            return self.__get_response(WordleState.GameEnded)
+        if not self.__boards[0].is_valid_guess(word):
+            return self.__get_response(WordleState.InvalidGuess)
+
+        self.__responses = [board.play(word) for board in self.__boards]
+        if all(self.get_solved_boards()):
+            self.__state = WordleState.Win
+            return self.__get_response(WordleState.GameWon)
+        if self.get_guesses() >= self.max_guesses:
+            self.__state = WordleState.Lose
+            return self.__get_response(WordleState.GameLost)
+        return self.__get_response(WordleState.ValidGuess)
+
+    def __get_response(self, callback_state: WordleState) -> MultiWordleResponse:
+        over = self.__state in (WordleState.Win, WordleState.Lose)
+        return MultiWordleResponse(
+            game_state=callback_state,
+            board_responses=list(self.__responses),
+            guessed_words=self.get_guessed_words(),
+            guesses=self.get_guesses(),
+            solved_boards=self.get_solved_boards(),
+            final_words=list(self.__words) if over else [],
+        )
+
+    """
+    Public Attributes
+    """
+
+    def get_state(self) -> WordleState:
+        return self.__state
+
+    def get_guesses(self) -> int:
+        # Every board sees every guess until it's solved, so the board solved last has them all.
+        return max(board.get_guesses() for board in self.__boards)
+
+    def get_guessed_words(self) -> List[str]:
+        return max((board.get_guessed_words() for board in self.__boards), key=len)
+
+    def get_solved_boards(self) -> List[bool]:
+        return [board.get_state() == WordleState.Win for board in self.__boards]
+
+    def get_boards(self) -> List[Wordle]:
+        return list(self.__boards)
+
+    def get_dictionary(self) -> WordleDictionary:
+        return self.__dictionary
+
+
+class WordleDordle(WordleMulti):
+    board_count = 2
+    max_guesses = 7
+
+
+class WordleOctordle(WordleMulti):
+    board_count = 8
+    max_guesses = 13
+
+
+class WordleSedecordle(WordleMulti):
+    board_count = 16
+    max_guesses = 21
+
+
+# The multi-board games by their board count.
+multi_board_variants: Dict[int, type] = {cls.board_count: cls for cls in
+                                         (WordleDordle, WordleMulti, WordleOctordle, WordleSedecordle)}
+
+
+class WordleMultiHeadless:
+    """
+    A stripped-down multi-board game for simulations, like WordleHeadless.
+    Each board's answer is an index into the feedback table, and a guess scores
+    every board from the same row of the table.
+    Solved boards are kept as a bitmask, with bit i for board i.
+    """
+
+    __slots__ = 'table', 'max_guesses', 'answers', 'solved', 'guesses', 'won'
+
+    def __init__(self, answers: Sequence[str] = None, table: FeedbackTable = None,
+                 board_count: int = WordleMulti.board_count, max_guesses: int = WordleMulti.max_guesses) -> None:
+        """
+        Initiates a headless multi-board game.
+        :param answers: The word of every board. Different random answers if not given.
+        :param table: The feedback table to score with.
+        :param board_count: How many boards there are, if answers aren't given.
+        :param max_guesses: How many guesses the game allows.
+        """
+        self.table = table if table is not None else get_feedback_table()
+        self.max_guesses = max_guesses
+        self.answers: List[int] = [0] * (len(answers) if answers else board_count)
+        self.solved = 0
+        self.guesses = 0
+        self.won = False
+        self.reset(answers)
+
+    def reset(self, answers: Sequence[str] = None) -> None:
+        """
+        Starts a new game with as many boards, reusing this object.
+        :param answers: The word of every board. Different random answers if not given.
+        """
+        if answers:
+            self.answers = [self.table.answer_index[word] for word in answers]
+        else:
+            self.answers = random.sample(range(self.table.answer_count), len(self.answers))
+        self.solved = 0
+        self.guesses = 0
+        self.won = False
+
+    def is_over(self) -> bool:
+        return self.won or self.guesses >= self.max_guesses
+
+    def guess(self, guess: int) -> Tuple[int, ...]:
+        """
+        Makes a guess by its index in the table.
+        :param guess: The index of the guessed word.
+        :return: The feedback pattern of every board, with -1 for boards solved before this guess,
+                 or nothing if the game is already over.
+        """
+        if self.is_over():
+            return ()
+        row = self.table.row(guess)
+        win = winning_pattern(self.table.word_length)
+        patterns = tuple(-1 if self.solved >> board & 1 else row[answer]
+                         for board, answer in enumerate(self.answers))
+        for board, pattern in enumerate(patterns):
+            if pattern == win:
+                self.solved |= 1 << board
+        self.guesses += 1
+        self.won = self.solved == (1 << len(self.answers)) - 1
+        return patterns
+
+    def guess_word(self, word: str) -> Optional[Tuple[int, ...]]:
+        """
+        Makes a guess by its word.
+        :param word: The guessed word.
+        :return: The feedback pattern of every board like guess, or None if the word can't be guessed.
+        """
+        guess = self.table.guess_index.get(word)
+        if guess is None:
+            return None
+        return self.guess(guess)
+
+    def get_words(self) -> List[str]:
+        return [self.table.answers[answer] for answer in self.answers]
+
+    @classmethod
+    def play_batch(cls, answer_sets: Sequence[Sequence[str]], new_player: Callable[[int], object],
+                   table: FeedbackTable = None, max_guesses: int = WordleMulti.max_guesses) -> Tuple[array, array]:
+        """
+        Plays many games back to back.
+        :param answer_sets: The words of every board in each game.
+        :param new_player: Makes the player of game i. A player has
+                           get_next_guess(guess, patterns), which is given the last
+                           guess (None at the start) and the pattern of every board, and returns a word.
+        :param table: The feedback table to score with.
+        :param max_guesses: How many guesses each game allows.
+        :return: The guess count and the first guess (as a table index) of every game.
+        """
+        game = cls(answer_sets[0] if answer_sets else None, table=table, max_guesses=max_guesses)
+        guess_counts = array('L')
+        first_guesses = array('L')
+        for i, answers in enumerate(answer_sets):
+            game.reset(answers)
+            player = new_player(i)
+            guess, patterns = None, ()
+            while not game.is_over():
+                guess = player.get_next_guess(guess, patterns)
+                patterns = game.guess_word(guess)
+                if patterns is None:
+                    raise ValueError(f"'{guess}' can't be guessed.")
+                if game.guesses == 1:
+                    first_guesses.append(game.table.guess_index[guess])
+            guess_counts.append(game.guesses)
+        if instrumentation.enabled:
+            instrumentation.count('games', len(answer_sets))
+        return guess_counts, first_guesses
@@ -0,0 +1,262 @@
+"""
+A tournament between Wordle strategies.
+Every strategy plays the same schedule in one pass: the same targets, from the same game indices,
+with the RNG reseeded the same way before each strategy plays a game index,
+so the games pair up and the strategies can be compared game by game.
+
+The feedback table is memory-mapped from the cache, and the dictionaries and word indexes
+are built once before the worker processes start, so every process shares them.
+Deterministic strategies play the same games from every game index, so they're only played once.
+With several processes, every strategy's games of a game index are their own task,
+so the strategies play side by side, and a game index takes about as long as its slowest strategy.
+"""
+from core.WordleAnalyzer import *
+from itertools import islice
+from multiprocessing import Pool
+from statistics import NormalDist
+from time import perf_counter, time
+import argparse
+import random
+
+
+class WordleTournament:
+    """
+    Plays several WordleAnalyzer subclasses over the same schedule, and compares them.
+    """
+
+    def __init__(self, analyzer_classes: Sequence[type], targets: Sequence[str] = None) -> None:
+        """
+        :param analyzer_classes: The strategies to play. They have to play with the same words.
+        :param targets: The words to guess. Every answer if not given.
+        """
+        self.analyzer_classes = list(analyzer_classes)
+        if not self.analyzer_classes:
+            raise ValueError("A tournament needs at least one strategy.")
+        self.table = self.analyzer_classes[0].get_table()
+        for cls in self.analyzer_classes:
+            if cls.get_table().get_fingerprint() != self.table.get_fingerprint():
+                raise ValueError(f"{cls.__name__} plays with other words, so its games can't be paired.")
+        self.names = [cls.get_strategy_name() for cls in self.analyzer_classes]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Every strategy in a tournament needs its own name.")
+        self.targets = list(targets) if targets is not None else list(self.table.answers)
+        self.stats = [StudyStats(self.table.answers, self.table.guesses) for _ in self.analyzer_classes]
+        # The paired statistics of every two strategies, by their positions.
+        self.pairs: Dict[Tuple[int, int], PairedStats] = {
+            (i, j): PairedStats() for i in range(len(self.analyzer_classes))
+            for j in range(i + 1, len(self.analyzer_classes))
+        }
+        # How long each strategy spent playing, summed over every process.
+        self.seconds = [0.0] * len(self.analyzer_classes)
+
+    def play(self, games: Optional[int] = None, processes: int = 1, seed: Optional[int] = None) -> int:
+        """
+        Plays every strategy from the same game indices against every target.
+        :param games: How many game indices to play. As many as a full study if not given.
+        :param processes: How many processes to split the game indices over.
+        :param seed: A seed to make the tournament reproducible. Picked at random if not given,
+                     since the strategies need the same random numbers either way.
+        :return: The seed.
+        """
+        if games is None:
+            games = len(self.analyzer_classes[0].get_wordle_dictionary().answers)
+        if seed is None:
+            seed = random.randrange(1 << 32)
+        # Build everything the strategies share before any worker starts.
+        dictionaries = [cls.get_dictionary() for cls in self.analyzer_classes]
+
+        # Deterministic strategies play the same games from every game index,
+        # so their time is counted once here, and every game index adds none.
+        fixed: Dict[int, Tuple[array, array, float]] = {}
+        played = []
+        for i, cls in enumerate(self.analyzer_classes):
+            if cls.deterministic:
+                start = perf_counter()
+                guess_counts, first_guesses = cls.simulate_batch(self.targets, 0, dictionaries[i])
+                self.seconds[i] += perf_counter() - start
+                fixed[i] = (guess_counts, first_guesses, 0.0)
+                cls.save_decision_cache()
+            else:
+                played.append(i)
+        played_classes = [self.analyzer_classes[i] for i in played]
+
+        pool = None
+        if processes > 1 and played:
+            pool = Pool(processes, initializer=_init_tournament_worker,
+                        initargs=([(cls, cls.wordle_dictionary) for cls in played_classes], self.targets))
+            tasks = [(game_index, seed, position) for game_index in range(games) for position in range(len(played))]
+            strategy_results = pool.imap(_tournament_worker, tasks)
+            unit_results = (list(islice(strategy_results, len(played))) for _ in range(games))
+        else:
+            played_dictionaries = [dictionaries[i] for i in played]
+            unit_results = (_play_tournament_unit(played_classes, played_dictionaries, self.targets, game_index, seed)
+                            for game_index in range(games))
+
+        tournament_start = time()
+        try:
+            for game_index, results in enumerate(unit_results):
+                unit = dict(fixed)
+                unit.update(zip(played, results))
+                self.add_unit([unit[i] for i in range(len(self.analyzer_classes))])
+                print(f"Played game {game_index + 1} / {games} of every strategy "
+                      f"({round(time() - tournament_start, 2)} seconds so far).")
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+        return seed
+
+    def add_unit(self, results: Sequence[Tuple[array, array, float]]) -> None:
+        """
+        Adds one game index of every strategy.
+        :param results: The guess counts, first guesses and seconds taken of every strategy, in order,
+                        with the guess counts lined up with the targets.
+        """
+        table = self.table
+        answers = [table.answer_index[word] for word in self.targets]
+        for stats, (guess_counts, first_guesses, _) in zip(self.stats, results):
+            for answer, start, guesses in zip(answers, first_guesses, guess_counts):
+                stats.add(answer, start, guesses)
+        for (i, j), pair in self.pairs.items():
+            for first, second in zip(results[i][0], results[j][0]):
+                pair.add(first - second)
+        for i, (_, _, seconds) in enumerate(results):
+            self.seconds[i] += seconds
+
+    def print_results(self, confidence: float = 0.95) -> None:
+        """
+        Prints every strategy side by side, then how every two of them compare game by game.
+        :param confidence: The confidence level of the intervals.
+        """
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        level = f"{round(confidence * 100, 2)}%"
+        width = max(len(name) for name in self.names)
+        totals = [stats.targets.total_distribution() for stats in self.stats]
+        most_guesses = max((guesses for total in totals for guesses, amount in enumerate(total) if amount), default=1)
+
+        print(f"{'Strategy':<{width}}  {'Mean':>6}  {level + ' CI':>15}  {'SD':>6}  {'Games':>9}  {'Seconds':>9}")
+        for name, stats, seconds in zip(self.names, self.stats, self.seconds):
+            games, mean, low, high, sd = get_overall_stats(stats.targets, z)
+            print(f"{name:<{width}}  {mean:>6.3f}  {f'{low:.3f}-{high:.3f}':>15}  {sd:>6.3f}  "
+                  f"{games:>9}  {seconds:>9.2f}")
+        print('')
+
+        labels = [f"{guesses}+" if guesses == len(totals[0]) - 1 else str(guesses)
+                  for guesses in range(1, most_guesses + 1)]
+        print("Guess count distribution:")
+        print(f"{'':<{width}}  " + ''.join(f"{label:>7}" for label in labels))
+        for name, total in zip(self.names, totals):
+            games = sum(total) or 1
+            print(f"{name:<{width}}  " + ''.join(f"{total[guesses] / games * 100:>6.2f}%"
+                                                 for guesses in range(1, most_guesses + 1)))
+        print('')
+
+        if self.pairs:
+            print("Paired comparisons (guesses the first strategy takes minus the second, over the same games):")
+            for (i, j), pair in self.pairs.items():
+                low, high = pair.interval(z)
+                count = pair.count or 1
+                print(f"{self.names[i]} vs {self.names[j]}: {pair.mean():+.4f} "
+                      f"({level} CI {low:+.4f} to {high:+.4f}, p = {pair.p_value():.4g}), "
+                      f"fewer guesses in {round(pair.better / count * 100, 2)}%, "
+                      f"more in {round(pair.worse / count * 100, 2)}%, "
+                      f"tied in {round(pair.get_ties() / count * 100, 2)}% of {pair.count} games")
+            print('')
+
+
+def get_overall_stats(word_stats: RunningStats, z: float = 1.96) -> Tuple[int, float, float, float, float]:
+    """
+    Pools the statistics of every word.
+    :param word_stats: The running statistics per word.
+    :param z: The z-score of the confidence level.
+    :return: The game count, mean guess count, its confidence interval and the standard deviation.
+    """
+    games = sum(word_stats.counts)
+    if not games:
+        return 0, 0.0, 0.0, 0.0, 0.0
+    total = sum(word_stats.sums)
+    mean = total / games
+    variance = max(sum(word_stats.squares) - total * total / games, 0.0) / (games - 1) if games > 1 else 0.0
+    margin = z * sqrt(variance / games)
+    return games, mean, mean - margin, mean + margin, sqrt(variance)
+
+
+def _play_tournament_unit(analyzer_classes: Sequence[type], dictionaries: Sequence, targets: Sequence[str],
+                          game_index: int, seed: int) -> List[Tuple[array, array, float]]:
+    """
+    Plays one game index of every strategy against every target.
+    The RNG is reseeded before each strategy like study_game_index does, so they all get the same random numbers,
+    and each one plays the same games as a batch study with the same seed.
+    :return: The guess counts, first guesses and seconds taken of every strategy.
+    """
+    return [_play_tournament_games(cls, dictionary, targets, game_index, seed)
+            for cls, dictionary in zip(analyzer_classes, dictionaries)]
+
+
+def _play_tournament_games(analyzer_class: type, dictionary, targets: Sequence[str],
+                           game_index: int, seed: int) -> Tuple[array, array, float]:
+    """
+    Plays one game index of one strategy against every target.
+    :return: The guess counts, first guesses and seconds taken.
+    """
+    start = perf_counter()
+    random.seed(f'{seed}:batch:{game_index}')
+    guess_counts, first_guesses = analyzer_class.simulate_batch(targets, game_index, dictionary)
+    return guess_counts, first_guesses, perf_counter() - start
+
+
+_tournament_classes: List[type] = []
+_tournament_dictionaries: List = []
+_tournament_targets: List[str] = []
+
+
+def _init_tournament_worker(analyzer_classes: Sequence[Tuple[type, Optional[WordleDictionary]]],
+                            targets: Sequence[str]) -> None:
+    """
+    Prepares a worker process for a tournament.
+    Forked workers already have every dictionary and the mapped feedback table,
+    so this only looks them up; other workers load them once.
+    :param analyzer_classes: Every strategy this worker plays, with the words it was given, if any.
+    :param targets: The words to guess.
+    """
+    global _tournament_classes, _tournament_dictionaries, _tournament_targets
+    _tournament_classes = []
+    for analyzer_class, dictionary in analyzer_classes:
+        if dictionary is not None:
+            analyzer_class.wordle_dictionary = dictionary
+        _tournament_classes.append(analyzer_class)
+    _tournament_dictionaries = [analyzer_class.get_dictionary() for analyzer_class in _tournament_classes]
+    _tournament_targets = list(targets)
+
+
+def _tournament_worker(task) -> Tuple[array, array, float]:
+    """
+    Plays one game index of one strategy in a worker process.
+    :param task: The game index, seed, and the strategy's position among this worker's strategies.
+    """
+    game_index, seed, position = task
+    return _play_tournament_games(_tournament_classes[position], _tournament_dictionaries[position],
+                                  _tournament_targets, game_index, seed)
+
+
+if __name__ == '__main__':
+    analyzers = {name: value for name, value in globals().items()
+                 if isinstance(value, type) and issubclass(value, WordleAnalyzer) and value is not WordleAnalyzer}
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('strategies', nargs='+', choices=sorted(analyzers), metavar='STRATEGY',
+                        help=f"the analyzers to play ({', '.join(sorted(analyzers))})")
+    parser.add_argument('--games', type=int, help="game indices to play against every target (default: a full study)")
+    parser.add_argument('--confidence', type=float, default=0.95, help="confidence level of the comparisons")
+    parser.add_argument('--processes', type=int, default=1, help="processes to split the games over")
+    parser.add_argument('--seed', type=int, help="seed to make the tournament reproducible")
+    args = parser.parse_args()
+
+    tournament = WordleTournament([analyzers[name] for name in args.strategies])
+    print("=== BEGIN WORDLE TOURNAMENT ===")
+    seed = args.seed if args.seed is not None else random.randrange(1 << 32)
+    print(f"Strategies: {', '.join(tournament.names)}")
+    print(f"Seed: {seed}")
+    tournament.play(args.games, args.processes, seed)
+    print("=== END WORDLE TOURNAMENT ===")
+    print('')
+    tournament.print_results(args.confidence)
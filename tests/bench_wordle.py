@@ -0,0 +1,210 @@
+"""
+A benchmark suite for the Wordle simulator and analyzers.
+Results are printed as JSON, and compared against a stored baseline
+so slowdowns are caught before a long study is started.
+
+Usage:
+    python tests/bench_wordle.py                  run and compare against the baseline
+    python tests/bench_wordle.py --save-baseline  run and store the results as the new baseline
+"""
+import os
+import sys
+
+root_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_directory)
+
+from core.WordleAnalyzer import *
+from time import perf_counter
+import argparse
+import json
+import platform
+
+default_baseline_path = os.path.join(root_directory, 'tests', 'bench_baseline.json')
+
+with open(os.path.join(root_directory, 'wordlist', 'test_answer_list.txt')) as test_file:
+    test_answer_list = [line.strip('\n') for line in test_file if line.strip()]
+
+
+def measure(function: Callable[[], int], repeats: int = 3) -> dict:
+    """
+    Times a benchmark, keeping the best of a few runs.
+    :param function: Runs the benchmark once, and returns how many operations it did.
+    :param repeats: How many times to run it.
+    :return: The result entry.
+    """
+    best = None
+    operations = 0
+    for _ in range(repeats):
+        random.seed(0)
+        start = perf_counter()
+        operations = function()
+        duration = perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return {
+        'operations': operations,
+        'seconds': round(best, 6),
+        'ops_per_second': round(operations / best, 2) if best else 0.0,
+    }
+
+
+"""
+Benchmarks
+"""
+
+
+def bench_wordle_play() -> int:
+    guesses = ('slate', 'crony', 'minty', 'plumb')
+    for word in test_answer_list:
+        wordle = Wordle(word=word)
+        wordle.play()
+        for guess in guesses:
+            wordle.play(guess)
+    return len(test_answer_list) * (len(guesses) + 1)
+
+
+def bench_score_word() -> int:
+    for guess in test_answer_list:
+        for answer in test_answer_list:
+            score_word(guess, answer)
+    return len(test_answer_list) ** 2
+
+
+def bench_feedback_table() -> int:
+    table = get_feedback_table()
+    for guess in test_answer_list:
+        for answer in test_answer_list:
+            table.score(guess, answer)
+    return len(test_answer_list) ** 2
+
+
+def bench_get_dictionary() -> int:
+    # get_dictionary is cached by the WordleDictionary, so build the indexes it returns from scratch.
+    WordIndex(get_answer_list())
+    WordIndex(get_guess_list())
+    return 2
+
+
+def bench_get_best_guess() -> int:
+    dictionary = WARandomAnswer.get_dictionary()
+    turns = 0
+    for index, word in enumerate(test_answer_list):
+        analyzer = WARandomAnswer(index + 7)
+        analyzer.set_dictionary(dictionary)
+        wordle = WordleEndless(word=word)
+        response = wordle.play()
+        while response.game_state not in (WordleState.GameWon, WordleState.GameLost):
+            response = wordle.play(analyzer.get_best_guess(response))
+            turns += 1
+    return turns
+
+
+def bench_games_response() -> int:
+    dictionary = WARandomAnswer.get_dictionary()
+    for word in test_answer_list:
+        WARandomAnswer.run_game(word, 0, dictionary)
+    return len(test_answer_list)
+
+
+def bench_games_headless() -> int:
+    dictionary = WARandomAnswer.get_dictionary()
+    for word in test_answer_list:
+        WARandomAnswer.study_target(word, 1, dictionary)
+    return len(test_answer_list)
+
+
+def bench_games_batch() -> int:
+    dictionary = WARandomAnswer.get_dictionary()
+    WARandomAnswer.simulate_batch(test_answer_list, 0, dictionary)
+    return len(test_answer_list)
+
+
+def bench_games_entropy_batch() -> int:
+    WAEntropy.simulate_batch(test_answer_list, 0, WAEntropy.get_dictionary())
+    return len(test_answer_list)
+
+
+benchmarks = {
+    'wordle_play': bench_wordle_play,
+    'score_word': bench_score_word,
+    'feedback_table_score': bench_feedback_table,
+    'get_dictionary': bench_get_dictionary,
+    'get_best_guess_turn': bench_get_best_guess,
+    'games_response': bench_games_response,
+    'games_headless': bench_games_headless,
+    'games_batch': bench_games_batch,
+    'games_entropy_batch': bench_games_entropy_batch,
+}
+
+
+def run_benchmarks(names: List[str] = None, repeats: int = 3) -> dict:
+    """
+    Runs the benchmarks.
+    :param names: The benchmarks to run. All of them if not given.
+    :param repeats: How many times to run each one.
+    :return: The results, ready to be written as JSON.
+    """
+    # Load the shared tables first, so they aren't timed.
+    get_feedback_table()
+    WAEntropy.simulate_batch(test_answer_list, 0, WAEntropy.get_dictionary())
+
+    results = {}
+    for name in names or benchmarks:
+        results[name] = measure(benchmarks[name], repeats)
+    return {
+        'python': platform.python_implementation() + ' ' + platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Finds the benchmarks that got slower than the baseline allows.
+    :param report: The new results.
+    :param baseline: The stored results.
+    :param tolerance: How much slower a benchmark may get, as a fraction.
+    :return: A line describing every regression.
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        if name not in baseline.get('results', {}):
+            continue
+        expected = baseline['results'][name]['ops_per_second']
+        change = result['ops_per_second'] / expected - 1 if expected else 0.0
+        result['baseline_ops_per_second'] = expected
+        result['change'] = round(change, 4)
+        if change < -tolerance:
+            regressions.append(f"{name}: {result['ops_per_second']} ops/s, "
+                               f"baseline {expected} ops/s ({round(change * 100, 1)}%)")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('names', nargs='*', help="benchmarks to run (default: all)")
+    parser.add_argument('--baseline', default=default_baseline_path, help="the baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="store the results as the baseline")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    parser.add_argument('--repeats', type=int, default=3, help="runs per benchmark; the best one counts")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown before failing")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.names, args.repeats)
+    regressions = []
+    if args.save_baseline:
+        with open(args.baseline, mode='w') as file:
+            json.dump(report, file, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            regressions = compare_to_baseline(report, json.load(file), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, mode='w') as file:
+            file.write(output + '\n')
+    if regressions:
+        print("Regressions found:", file=sys.stderr)
+        for line in regressions:
+            print(f"    {line}", file=sys.stderr)
+        sys.exit(1)
@@ -2,4 +2,623 @@
 A test suite for the Wordle class.
 """
 from core.Wordle import *
+from core.WordleAnalyzer import WARandomAnswer
+from core.WordleSubclasses import WordleHeadless
 import pytest
+
+
+def test_play_win():
+    wordle = Wordle(word='crane')
+    assert wordle.play().game_state == WordleState.GameStart
+    response = wordle.play('slate')
+    assert response.game_state == WordleState.ValidGuess
+    assert Wordle.response_to_characters(response.word_response) == 'xxCxC'
+    assert wordle.play('crane').game_state == WordleState.GameWon
+    assert wordle.get_guesses() == 2
+
+
+def test_invalid_guess():
+    wordle = Wordle(word='crane')
+    wordle.play()
+    assert wordle.play('zzzzz').game_state == WordleState.InvalidGuess
+    assert wordle.get_guesses() == 0
+
+
+@pytest.mark.parametrize('guess', ['slate', 'mamma', 'queue', 'eerie'])
+def test_feedback_table_matches_scorer(guess):
+    table = FeedbackTable([guess], get_answer_list())
+    for j, answer in enumerate(get_answer_list()):
+        assert table.pattern(0, j) == score_word(guess, answer)
+
+
+def test_feedback_table_round_trip(tmp_path):
+    path = str(tmp_path / 'feedback.bin')
+    guesses, answers = get_guess_list(), get_answer_list()
+    table = FeedbackTable.load_or_build(path, guesses[:50], answers[:40])
+    assert FeedbackTable.load(path, guesses[:50], answers[:41]) is None
+    assert table.score(guesses[3], answers[7]) == score_word(guesses[3], answers[7])
+
+
+@pytest.mark.parametrize('guess, answer, characters', [
+    ('geese', 'those', 'xxxCC'),
+    ('mamma', 'madam', 'CC?x?'),
+    ('eerie', 'crane', 'xx?xC'),
+    ('speed', 'abide', 'xx?x?'),
+    ('kayak', 'khaki', 'C?xx?'),
+])
+def test_duplicate_letters(guess, answer, characters):
+    assert Wordle.response_to_characters(decode_pattern(score_word(guess, answer))) == characters
+    assert get_feedback_table().score(guess, answer) == score_word(guess, answer)
+
+
+def test_pattern_encoding():
+    states = decode_pattern(score_word('slate', 'crane'))
+    assert encode_pattern(states) == score_word('slate', 'crane')
+    assert decode_pattern(winning_pattern()) == (WordleState.Correct,) * 5
+
+
+def test_word_index_narrow():
+    from core.WordleIndex import WordIndex
+    index = WordIndex(get_answer_list())
+    candidates = index.narrow(index.all, 'slate', decode_pattern(score_word('slate', 'crane')))
+    words = index.get_words(candidates)
+    assert 'crane' in words
+    assert all(word[2] == 'a' and word[4] == 'e' and not set(word) & set('slt') for word in words)
+
+
+def test_word_lookup():
+    guess_lookup, answer_lookup = get_guess_lookup(), get_answer_lookup()
+    assert 'crane' in guess_lookup and 'crane' in answer_lookup
+    assert 'aahed' in guess_lookup and 'aahed' not in answer_lookup
+    assert guess_lookup.has_prefix('cra') and not guess_lookup.has_prefix('qqq')
+    words = answer_lookup.with_prefix('cran')
+    assert words == sorted(word for word in get_answer_list() if word.startswith('cran'))
+    assert len(answer_lookup.with_prefix('c', limit=3)) == 3
+
+
+def test_binary_word_list(tmp_path):
+    path = str(tmp_path / 'answers.bin')
+    assert write_binary_word_list(path, get_answer_list())
+    assert read_binary_word_list(path) == get_answer_list()
+    assert not write_binary_word_list(str(tmp_path / 'mixed.bin'), ['crane', 'cranes'])
+    assert get_guess_list()[-len(get_answer_list()):] == get_answer_list()
+
+
+def test_headless_matches_wordle():
+    game = WordleHeadless('crane')
+    wordle = Wordle(word='crane')
+    wordle.play()
+    for guess in ('slate', 'eerie', 'crane'):
+        response = wordle.play(guess)
+        assert decode_pattern(game.guess_word(guess)) == tuple(response.word_response)
+    assert game.won and game.is_over() and game.guesses == 3
+    assert game.guess_word('slate') == -1
+    assert game.correct.tolist() == [ord(char) - 97 for char in 'crane']
+
+
+def test_letter_counts():
+    from core.WordleIndex import WordIndex
+    wordle = Wordle(word='those')
+    wordle.play()
+    response = wordle.play('geese')
+    assert response.min_letter_counts == {'e': 1, 's': 1}
+    assert response.max_letter_counts == {'g': 0, 'e': 1}
+    assert 'e' not in response.wrong_characters and 'g' in response.wrong_characters
+    index = WordIndex(get_answer_list())
+    words = index.get_words(index.constrain(
+        index.all, response.wrong_characters, response.misplaced_characters, response.correct_characters,
+        response.min_letter_counts, response.max_letter_counts))
+    assert words == index.get_words(index.narrow(index.all, 'geese', response.word_response))
+    assert 'those' in words and all(word.count('e') == 1 for word in words)
+    game = WordleHeadless('those')
+    game.guess_word('geese')
+    assert game.min_counts[ord('e') - 97] == 1 and game.max_counts[ord('e') - 97] == 1
+    assert not game.wrong >> (ord('e') - 97) & 1
+
+
+def test_characters_to_response():
+    states = decode_pattern(score_word('slate', 'crane'))
+    assert Wordle.characters_to_response(Wordle.response_to_characters(states)) == list(states)
+
+
+def test_entropy_analyzer_solves():
+    from core.WordleAnalyzer import WAEntropy
+    table = get_feedback_table()
+    candidates = [table.answer_index[word] for word in ('crane', 'crate', 'crave', 'grace')]
+    best_score, best_guess = WAEntropy.rank_guesses(table, candidates)[0]
+    assert len(table.partition(best_guess, candidates)) == 4
+    analyzer = WAEntropy(0)
+    analyzer.set_dictionary(table)
+    # Start from the four candidates, which the best guess splits up, so the next guess has to win.
+    analyzer.candidates = candidates
+    analyzer.history = None
+    game = WordleHeadless('grace', table=table)
+    guess = analyzer.choose_guess()
+    while not game.is_over():
+        pattern = game.guess_word(guess)
+        if not game.won:
+            guess = analyzer.get_next_guess(guess, pattern)
+    assert game.won and game.guesses <= 2
+
+
+def test_decision_cache(tmp_path):
+    from core.WordleDecisions import DecisionCache
+    cache = DecisionCache(max_entries=2, max_depth=2)
+    cache.put((), 10)
+    cache.put(((10, 3),), 11)
+    cache.put(((10, 3), (11, 5), (12, 7)), 12)
+    assert len(cache) == 2
+    cache.get(())
+    cache.put(((10, 4),), 13)
+    assert cache.get(((10, 3),)) is None and cache.get(()) == 10
+    path = str(tmp_path / 'decisions.bin')
+    cache.save(path, b'x' * 20)
+    loaded = DecisionCache()
+    assert not loaded.load(path, b'y' * 20)
+    assert loaded.load(path, b'x' * 20)
+    assert loaded.get(((10, 4),)) == 13 and not loaded.take_new_decisions()
+
+
+def test_batch_engine_matches_games():
+    from core.WordleAnalyzer import WAEntropy
+    targets = get_answer_list()[:20]
+    dictionary = WAEntropy.get_dictionary()
+    table = get_feedback_table()
+    guess_counts, first_guesses = WAEntropy.simulate_batch(targets, 0, dictionary)
+    for word, guesses, first in zip(targets, guess_counts, first_guesses):
+        assert WAEntropy.study_target(word, 1, dictionary) == [(table.guesses[first], guesses)]
+
+
+def test_instrumentation():
+    from core.WordleProfiler import Instrumentation
+    profile = Instrumentation()
+    profile.add_time('feedback', 0.5)
+    profile.add_time('feedback', 0.25)
+    profile.count('games', 3)
+    other = Instrumentation()
+    other.merge(profile.take())
+    other.merge({'timers': {'feedback': [1.0, 2]}, 'counters': {'games': 1}})
+    assert other.timers['feedback'] == [1.75, 4] and other.counters['games'] == 4
+    assert profile.timers == {} and other.get_trace()['counters'] == {'games': 4}
+
+
+def test_study_log_resume(tmp_path):
+    from core.WordleStudyLog import StudyLog
+    directory = str(tmp_path / 'study')
+    log = StudyLog(directory)
+    assert log.open({'games': 1}) == 0
+    log.append([(1, 2, 3), (4, 5, 6)])
+    log.checkpoint(1)
+    log.append([(7, 8, 9)])
+    log.close()
+    log = StudyLog(directory)
+    with pytest.raises(ValueError):
+        log.open({'games': 2}, resume=True)
+    assert log.open({'games': 1}, resume=True) == 1
+    log.append([(10, 11, 12)])
+    log.checkpoint(2)
+    log.close()
+    assert list(StudyLog(directory).read()) == [(1, 2, 3), (4, 5, 6), (10, 11, 12)]
+
+
+class WARandomSlice(WARandomAnswer):
+    # Studied by worker processes, which look the class up by name, so it can't be made inside a test.
+    pass
+
+
+def test_seeded_study_processes(tmp_path, monkeypatch):
+    from core.WordleDictionary import WordleDictionary
+    from core.WordleStudyLog import StudyLog
+    from collections import Counter
+
+    class WordleTempDictionary(WordleDictionary):
+        def get_cache_path(self, kind):
+            return str(tmp_path / f'{self.name}-{kind}.bin')
+
+    monkeypatch.setattr(WARandomSlice, 'wordle_dictionary', WordleTempDictionary(get_answer_list()[:12], name='slice'))
+    for engine in ('game', 'batch'):
+        counts = []
+        for processes in (1, 2):
+            directory = str(tmp_path / f'{engine}-{processes}')
+            WARandomSlice.print_study(processes=processes, seed=7, engine=engine, log_directory=directory)
+            # The games come back in whatever order the workers finish them, so only the counts are compared.
+            counts.append(Counter((target, guesses) for target, _, guesses in StudyLog(directory).read()))
+        assert counts[0] == counts[1]
+        assert sum(counts[0].values()) == len(WARandomSlice.get_wordle_dictionary().answers) ** 2
+
+
+def test_study_stats():
+    from core.WordleStats import StudyStats
+    stats = StudyStats(['crane', 'slate'], ['soare', 'crane', 'slate'], bins=8)
+    for guesses in (3, 4, 5):
+        stats.add_game('crane', 'soare', guesses)
+    stats.add_game('slate', 'crane', 2, weight=4)
+    stats.add_game('slate', 'slate', 12)
+    assert stats.get_games() == 8
+    assert stats.targets.mean(0) == 4 and stats.targets.variance(0) == 1
+    assert stats.starts.ranked() == [1, 0, 2]
+    assert stats.starts.distribution(1) == [0, 0, 4, 0, 0, 0, 0, 0]
+    assert stats.starts.distribution(2)[-1] == 1
+    low, high = stats.targets.interval(0)
+    assert low < 4 < high and stats.starts.interval(1) == (2, 2)
+
+
+def test_optimal_solver(tmp_path):
+    from core.WordleAnalyzer import WADecisionTree
+    from core.WordleCrack import OptimalSolver, save_decision_tree
+    import pickle
+    table = get_feedback_table()
+    words = ['crane', 'crate', 'crave', 'grace', 'trace', 'brace', 'react', 'cater', 'grate', 'irate']
+    candidates = tuple(sorted(table.answer_index[word] for word in words))
+    guesses = [table.guess_index[word] for word in words + ['tubby', 'vigor', 'bight', 'gravy']]
+
+    def brute_force(remaining, depth):
+        if len(remaining) == 1:
+            return 1
+        if depth == 1:
+            return float('inf')
+        best = float('inf')
+        for guess in guesses:
+            buckets = {}
+            for answer in remaining:
+                buckets.setdefault(table.pattern(guess, answer), []).append(answer)
+            if len(buckets) == 1 and winning_pattern() not in buckets:
+                continue
+            best = min(best, len(remaining) + sum(brute_force(tuple(bucket), depth - 1)
+                                                  for pattern, bucket in buckets.items()
+                                                  if pattern != winning_pattern()))
+        return best
+
+    solver = OptimalSolver(table, guesses=guesses)
+    assert solver.solve(candidates, 6)[0] == brute_force(candidates, 6)
+    result = solver.solve_start('slate', candidates=candidates)
+    assert result['exact'] and result['answers'] == len(words)
+    # Workers have to solve with the solver's own words, not the config's.
+    small = FeedbackTable([table.guesses[guess] for guess in guesses], words)
+    assert OptimalSolver(small).solve_start('crane', processes=2) == OptimalSolver(small).solve_start('crane')
+    assert bytes(pickle.loads(pickle.dumps(small)).data) == bytes(small.data)
+
+    class WAReplay(WADecisionTree):
+        tree_path = str(tmp_path / 'tree.json')
+
+    save_decision_tree(WAReplay.tree_path, result)
+    guess_counts, first_guesses = WAReplay.simulate_batch(words, 0, WAReplay.get_dictionary())
+    assert sum(guess_counts) == result['total']
+    assert set(first_guesses) == {table.guess_index['slate']}
+
+
+def test_rank_start_words():
+    from core.WordleAnalyzer import WordleAnalyzer
+    table = get_feedback_table()
+    ranked = WordleAnalyzer.rank_start_words('worst_bucket')
+    assert len(ranked) == len(table.guesses)
+    score, guess = ranked[0]
+    assert score == max(table.partition(guess).values()) <= max(table.partition(table.guess_index['fuzzy']).values())
+    refined = WordleAnalyzer.rank_start_words('entropy', lookahead=2, lookahead_guesses=50)
+    assert all(1 <= score < 10 for score, _ in refined[:2]) and refined[2][0] < 0
+
+
+def test_service_session():
+    import asyncio
+    import json
+    from core.WordleAnalyzer import WAEntropy
+    from core.WordleService import WordleService
+
+    async def play():
+        service = WordleService(processes=0)
+        try:
+            session = (await service.handle({'id': 1, 'op': 'new'}))['session']
+            entered = await service.handle({'id': 2, 'op': 'enter', 'session': session,
+                                            'guess': 'slate', 'response': 'xxCxC'})
+            suggestions = await asyncio.gather(*(service.handle({'id': i, 'op': 'suggest', 'session': session})
+                                                 for i in range(3)))
+            words = await service.handle({'op': 'candidates', 'session': session, 'limit': 100})
+            error = await service.handle({'id': 9, 'op': 'enter', 'session': session,
+                                          'guess': 'qqqqq', 'response': 'xxxxx'})
+            malformed = [await service.handle({'op': 'candidates', 'session': session, 'limit': limit})
+                         for limit in (None, [1], '5', True)]
+            malformed += [await service.handle({'op': 'enter', 'session': session, 'guess': guess, 'response': 'xxxxx'})
+                          for guess in (None, 5)]
+            malformed.append(await service.handle({'op': 'enter', 'session': session, 'guess': 'slate', 'response': 5}))
+
+            # A request that fails some other way still gets an answer.
+            async def fail(_):
+                raise RuntimeError('worker died')
+            service.op_suggest = fail
+            reader = asyncio.StreamReader()
+            reader.feed_data(json.dumps({'id': 10, 'op': 'suggest', 'session': session}).encode() + b'\n')
+            reader.feed_eof()
+            written = []
+            writer = type('Writer', (), {'write': staticmethod(written.append)})
+            await service.serve(reader, writer)
+            return entered, suggestions, words, error, malformed, json.loads(written[0])
+        finally:
+            service.executor.shutdown()
+
+    entered, suggestions, words, error, malformed, failed = asyncio.run(play())
+    analyzer = WAEntropy(0)
+    analyzer.set_dictionary(WAEntropy.get_dictionary())
+    analyzer.narrow('slate', score_word('slate', 'crane'))
+    assert entered == {'id': 2, 'candidates': len(analyzer.get_candidates())}
+    assert {response['guess'] for response in suggestions} == {analyzer.choose_guess()}
+    assert 'crane' in words['words'] and error == {'id': 9, 'error': "'qqqqq' can't be guessed."}
+    assert all('error' in response for response in malformed)
+    assert failed['id'] == 10 and 'worker died' in failed['error']
+
+
+def test_custom_dictionary(tmp_path):
+    from core.WordleAnalyzer import WAEntropy, WARandomAnswer
+    from core.WordleDictionary import WordleDictionary
+
+    class WordleTempDictionary(WordleDictionary):
+        def get_cache_path(self, kind):
+            return str(tmp_path / f'{self.name}-{kind}.bin')
+
+    words = ['planet', 'plants', 'spline', 'splint', 'tinsel', 'listen', 'silent', 'enlist', 'inlets', 'tassel']
+    dictionary = WordleTempDictionary(words, name='six')
+    table = dictionary.get_feedback_table()
+    assert table.pattern_size == 2
+    assert all(table.score(guess, answer) == score_word(guess, answer) for guess in words for answer in words)
+    wordle = Wordle(word='listen', dictionary=dictionary)
+    wordle.play()
+    assert wordle.play('crane').game_state == WordleState.InvalidGuess
+    assert wordle.play('silent').game_state == WordleState.ValidGuess
+    assert wordle.play('listen').game_state == WordleState.GameWon
+    assert WordleHeadless('listen', table=table).guess_word('listen') == winning_pattern(6)
+
+    class WASix(WAEntropy):
+        wordle_dictionary = dictionary
+
+    class WARandomSix(WARandomAnswer):
+        wordle_dictionary = dictionary
+
+    guess_counts, _ = WASix.simulate_batch(words, 0, WASix.get_dictionary())
+    assert all(1 <= guesses <= 6 for guesses in guess_counts)
+    assert WARandomSix.run_game('tinsel', 0, WARandomSix.get_dictionary()).game_state == WordleState.GameWon
+    default_path = get_path('wordlist/top_initial_word_list.txt')
+    with open(default_path) as file:
+        default_words = file.read()
+    WASix.write_start_words(words)
+    assert dictionary.get_start_words_path() == str(tmp_path / 'six-start-words.txt')
+    with open(dictionary.get_start_words_path()) as file:
+        assert file.read().split() == words
+    with open(default_path) as file:
+        assert file.read() == default_words
+
+    with pytest.raises(ValueError):
+        WordleDictionary(words, words * (WordleDictionary.max_words // len(words) + 1))
+
+    accented = WordleTempDictionary(['señor', 'niñas', 'ñandú', 'dueña'], name='accented')
+    game = WordleHeadless('ñandú', table=accented.get_feedback_table())
+    assert game.guess_word('niñas') == score_word('niñas', 'ñandú') and not game.won
+
+
+def test_estimate_study(tmp_path):
+    from core.WordleAnalyzer import WARandomAnswer
+    from core.WordleDictionary import WordleDictionary
+    from core.WordleStats import RunningStats
+
+    stats = RunningStats(4)
+    for i, guesses in enumerate([2, 4, 4, 6]):
+        for _ in range(50):
+            stats.add(i, guesses - 1)
+            stats.add(i, guesses + 1)
+    assert stats.is_settled(1, tolerance=0.0)
+    assert sorted(stats.get_unsettled(2)) == [1, 2]
+
+    class WordleTempDictionary(WordleDictionary):
+        def get_cache_path(self, kind):
+            return str(tmp_path / f'{self.name}-{kind}.bin')
+
+    class WARandomSample(WARandomAnswer):
+        wordle_dictionary = WordleTempDictionary(['crane', 'slate', 'trace', 'crate', 'react', 'caret', 'cater',
+                                                  'stale', 'steal', 'least'], name='sample')
+
+    estimate, settled = WARandomSample.estimate_study(result_count=2, tolerance=10.0, min_games=10,
+                                                      max_games=10000, seed=1)
+    assert settled
+    assert all(count >= 10 for count in estimate.targets.counts)
+    estimate, settled = WARandomSample.estimate_study(result_count=2, tolerance=0.0, max_games=100, seed=1)
+    assert not settled and estimate.get_games() == 100
+
+
+def test_game_state():
+    from core.WordleAnalyzer import WAEntropy, WARandomAnswer
+    from core.WordleGameState import GameState
+    import pickle
+    table = get_feedback_table()
+    guess = table.guess_index
+    start = GameState.start(table)
+    crane = start.after(table, guess['crane'], table.score('crane', 'those'))
+    both = crane.after(table, guess['geese'], table.score('geese', 'those'))
+    assert start.get_guesses() == 0 and crane.get_words(table) == ['crane']
+    missed = start.after(table, guess['pudgy'], table.score('pudgy', 'those'))
+    assert missed.correct is start.correct and missed.min_counts is start.min_counts and missed.wrong
+    swapped = start.after(table, guess['geese'], table.score('geese', 'those'))
+    swapped = swapped.after(table, guess['crane'], table.score('crane', 'those'))
+    assert swapped == both and hash(swapped) == hash(both) and swapped != crane
+    assert swapped.get_history() != both.get_history()
+    with pytest.raises(AttributeError):
+        both.wrong = 0
+    assert pickle.loads(pickle.dumps(both)) == both
+    assert both.get_candidates(table) == [answer for answer in range(table.answer_count)
+                                          if table.score('crane', table.answers[answer]) == crane.get_history()[0][1]
+                                          and table.score('geese', table.answers[answer]) == both.get_history()[1][1]]
+
+    wordle = Wordle(word='those')
+    wordle.play()
+    wordle.play('crane')
+    response = wordle.play('geese')
+    assert response.snapshot == both and response.guessed_words == ['crane', 'geese']
+    assert response.min_letter_counts == {'e': 1, 's': 1}
+    wordle.play('those')
+    assert response.guessed_words == ['crane', 'geese'] and response.snapshot.get_guesses() == 2
+    branch = Wordle(word='those', snapshot=response.snapshot)
+    assert branch.play('those').game_state == WordleState.GameWon and branch.get_guesses() == 3
+    with pytest.raises(ValueError):
+        Wordle(word='crane', snapshot=response.snapshot)
+
+    candidates = set(both.get_candidates(table))
+    assert table.answer_index[WARandomAnswer.get_guess_for_state(both)] in candidates
+    played = WAEntropy(0)
+    played.set_dictionary(WAEntropy.get_dictionary())
+    first = played.get_next_guess(None, 0)
+    second = played.get_next_guess(first, table.score(first, 'those'))
+    state = start.after(table, guess[first], table.score(first, 'those'))
+    assert WAEntropy.get_guess_for_state(state) == second
+
+
+def test_wordle_variants():
+    from core.WordleAnalyzer import WAEntropy, WARandomAnswer
+    from core.WordleSubclasses import WordleAbsurd, WordleEndless, WordleHardMode
+    table = get_feedback_table()
+    hard = WordleHardMode(word='those')
+    hard.play()
+    hard.play('crane')
+    assert hard.play('pudgy').game_state == WordleState.InvalidGuess
+    assert hard.play('geese').game_state == WordleState.ValidGuess
+    assert hard.play('solve').game_state == WordleState.InvalidGuess
+    assert hard.play('those').game_state == WordleState.GameWon
+    game = WordleHeadless('those', table=table, hard_mode=True)
+    assert game.guess_word('geese') != -2 and game.guess_word('crane') == -2
+
+    absurd = WordleAbsurd()
+    absurd.play()
+    headless = WordleHeadless(table=table, adversarial=True)
+    for guess in ('crane', 'pudgy', 'those'):
+        response = absurd.play(guess)
+        assert headless.guess_word(guess) == encode_pattern(response.word_response)
+        assert response.final_word == '' or response.game_state == WordleState.GameLost
+    assert absurd.get_candidates() == headless.candidates
+
+    class WordleEndlessHard(WordleEndless, WordleHardMode):
+        pass
+
+    class WAEntropyHard(WAEntropy):
+        wordle_class = WordleEndlessHard
+
+    targets = get_answer_list()[:10]
+    guess_counts, first_guesses = WAEntropyHard.simulate_batch(targets, 0, WAEntropyHard.get_dictionary())
+    assert len(guess_counts) == 10 and WAEntropyHard.get_strategy_name().endswith('-hard')
+
+    class WordleEndlessAbsurd(WordleEndless, WordleAbsurd):
+        pass
+
+    class WARandomAbsurd(WARandomAnswer):
+        wordle_class = WordleEndlessAbsurd
+
+    guess_counts, _ = WARandomAbsurd.simulate_batch(targets[:2], 0, WARandomAbsurd.get_dictionary())
+    assert all(0 < guesses < 100 for guesses in guess_counts)
+
+
+def test_tournament(tmp_path, monkeypatch):
+    import core.WordleAnalyzer
+    from core.WordleAnalyzer import WAEntropy, WARandomAnswer, WARandomGuess
+    from core.WordleStats import PairedStats, StudyStats
+    from core.WordleTournament import WordleTournament
+    # Deterministic strategies save their decisions, which mustn't touch the real cache.
+    monkeypatch.setattr(core.WordleAnalyzer, '_decision_caches', {})
+    monkeypatch.setattr(WAEntropy, 'get_decision_cache_path', classmethod(lambda cls: str(tmp_path / 'decisions.bin')))
+    pair = PairedStats()
+    for difference in (-1, 0, 0, 2, -1):
+        pair.add(difference)
+    assert (pair.better, pair.worse, pair.get_ties()) == (2, 1, 2) and pair.mean() == 0 and pair.p_value() == 1.0
+
+    targets = get_answer_list()[:15]
+    tournament = WordleTournament([WARandomAnswer, WARandomGuess, WAEntropy], targets)
+    assert tournament.play(games=3, seed=5) == 5
+    table = get_feedback_table()
+    for cls, stats in zip(tournament.analyzer_classes, tournament.stats):
+        expected = StudyStats(table.answers, table.guesses)
+        for game_index in range(3):
+            for word, start_word, guesses in cls.study_game_index(targets, game_index, cls.get_dictionary(), seed=5):
+                expected.add_game(word, start_word, guesses)
+        assert stats.targets.sums == expected.targets.sums and stats.starts.counts == expected.starts.counts
+    answer_sums, guess_sums = tournament.stats[0].targets.sums, tournament.stats[1].targets.sums
+    assert tournament.pairs[0, 1].count == 45 and tournament.pairs[0, 1].sum == sum(answer_sums) - sum(guess_sums)
+
+    assert (tmp_path / 'decisions.bin').exists()
+
+    batches = []
+    simulate_batch = WAEntropy.simulate_batch
+    monkeypatch.setattr(WAEntropy, 'simulate_batch',
+                        classmethod(lambda cls, *args: batches.append(args[1]) or simulate_batch(*args)))
+    many = WordleTournament([WAEntropy], targets)
+    many.play(games=50, seed=5)
+    assert batches == [0] and sum(many.stats[0].targets.counts) == 50 * len(targets)
+
+    parallel = WordleTournament([WARandomAnswer, WARandomGuess, WAEntropy], targets)
+    parallel.play(games=3, processes=2, seed=5)
+    assert [stats.targets.sums for stats in parallel.stats] == [stats.targets.sums for stats in tournament.stats]
+    with pytest.raises(ValueError):
+        WordleTournament([WARandomAnswer, WARandomAnswer])
+
+
+def test_multi_board(capsys):
+    from core.WordleAnalyzer import WAMultiBoard, WordleAnalyzer
+    from core.WordleSubclasses import WordleDordle, WordleMulti, WordleMultiHeadless
+    table = get_feedback_table()
+    words = ['those', 'crane', 'pudgy', 'geese']
+    game = WordleMulti(words)
+    game.play()
+    assert game.play('xxxxx').game_state == WordleState.InvalidGuess
+    response = game.play('crane')
+    assert response.solved_boards == [False, True, False, False] and response.guesses == 1
+    response = game.play('those')
+    assert response.board_responses[1].game_state == WordleState.GameEnded and not response.final_words
+    headless = WordleMultiHeadless(words, table=table)
+    assert headless.guess_word('crane') == tuple(table.score('crane', word) for word in words)
+    assert headless.guess_word('those')[1] == -1 and headless.solved == 0b11
+    with pytest.raises(ValueError):
+        WordleDordle(words)
+
+    # Its games don't fit WordleAnalyzer's studies, so tournaments and studies can't pick it up.
+    assert not issubclass(WAMultiBoard, WordleAnalyzer)
+    analyzer = WAMultiBoard(0)
+    analyzer.set_dictionary(WAMultiBoard.get_dictionary())
+    first = analyzer.get_next_guess(None, ())
+    analyzer.get_next_guess(first, [table.score(first, word) for word in words])
+    index = get_default_dictionary().get_answer_index()
+    for board, word in enumerate(words):
+        expected = index.narrow(index.all, first, decode_pattern(table.score(first, word)))
+        assert analyzer.candidates[board] == list(bit_indices(expected))
+
+    sampler = random.Random(4)
+    answer_sets = [sampler.sample(get_answer_list(), 4) for _ in range(8)]
+    guess_counts, first_guesses = WAMultiBoard.simulate_boards(answer_sets)
+    for i, (answers, guesses) in enumerate(zip(answer_sets, guess_counts)):
+        final = WAMultiBoard.run_game(answers, i, WAMultiBoard.get_dictionary())
+        won = guesses <= WordleMulti.max_guesses
+        assert final.game_state == (WordleState.GameWon if won else WordleState.GameLost)
+        assert final.guesses == min(guesses, WordleMulti.max_guesses)
+        assert final.guessed_words[0] == table.guesses[first_guesses[i]] and final.final_words == answers
+
+    summaries = []
+    for processes in (1, 2):
+        WAMultiBoard.print_board_study(games=8, seed=4, processes=processes)
+        summaries.append([line for line in capsys.readouterr().out.splitlines() if 'average' in line])
+    assert summaries[0] == summaries[1] and summaries[0]
+
+
+def test_grid_inference():
+    from core.WordleInference import GridIndex
+    table = get_feedback_table()
+    index = GridIndex(table)
+    rows = [Wordle.response_to_characters(decode_pattern(table.score(guess, 'those')))
+            for guess in ('crane', 'pudgy', 'those')]
+    grid = '/'.join(rows)
+    patterns = index.read_grid(grid)
+    answers = index.infer(patterns)
+    assert answers >> table.answer_index['those'] & 1
+    assert all(any(table.pattern(guess, answer) == pattern for guess in range(len(table.guesses)))
+               for answer in list(bit_indices(answers))[:20] for pattern in patterns)
+    assert index.infer(patterns[::-1]) == 0
+    once, twice = index.infer(patterns[1:]), index.infer((patterns[1],) + patterns[1:])
+    assert twice & ~once == 0
+    for path, pattern in zip(index.get_guess_paths(table.answer_index['those'], patterns, 2), patterns):
+        assert path and all(table.score(guess, 'those') == pattern for guess in path)
+
+    results = index.infer_grids([grid + '\n', ' '.join(rows) + '\n', '\n', 'xxxxx,CCCCC\n'])
+    assert results[patterns] == (2, answers) and len(results) == 2
+    with pytest.raises(ValueError):
+        index.read_grid('xxCC/CCCCC')